@@ -11,6 +11,10 @@
                    2016/12/04: WebApi
                    2019/08/14: 集成Gunicorn启动方式
                    2020/06/23: 新增pop接口
+                   2026/10/18: get接口支持按延迟筛选
+                   2026/10/18: get接口支持按匿名度筛选, 新增echo接口
+                   2026/10/18: 新增source_status接口
+                   2026/10/18: get接口拒绝非正数的fastest
 -------------------------------------------------
 """
 __author__ = 'JHao'
@@ -21,12 +25,14 @@ from flask import Flask, jsonify, request
 
 from util.six import iteritems
 from handler.proxyHandler import ProxyHandler
+from handler.sourceHandler import SourceHandler
 from handler.configHandler import ConfigHandler
 from helper.proxy import Proxy
 
 app = Flask(__name__)
 conf = ConfigHandler()
 proxy_handler = ProxyHandler()
+source_handler = SourceHandler()
 
 
 class JsonResponse(Response):
@@ -42,11 +48,16 @@ app.response_class = JsonResponse
 
 api_list = {
     'get': u'get an useful proxy',
+    'get?max_latency=500': u'get an useful proxy whose latency <= 500ms',
+    'get?fastest=10': u'get an useful proxy from the 10 fastest',
+    'get?type=elite': u'get an useful proxy of type transparent/anonymous/elite',
     'pop': u'get and delete an useful proxy',
     # 'refresh': u'refresh proxy pool',
     'get_all': u'get all proxy from proxy pool',
     'delete?proxy=127.0.0.1:8080': u'delete an unable proxy',
-    'get_status': u'proxy number'
+    'get_status': u'proxy number',
+    'source_status': u'pages/fetched/unique/new/passed/removed count and survival time of each source',
+    'echo': u'echo the request origin and headers, used as ANONYMITY_URL'
 }
 
 
@@ -57,7 +68,12 @@ def index():
 
 @app.route('/get/')
 def get():
-    proxy = proxy_handler.get()
+    max_latency = request.args.get('max_latency', type=int)
+    fastest = request.args.get('fastest', type=int)
+    if fastest is not None and fastest <= 0:
+        return {"code": 0, "src": "fastest must be a positive integer"}, 400
+    proxy_type = request.args.get('type')
+    proxy = proxy_handler.get(max_latency=max_latency, fastest=fastest, proxy_type=proxy_type)
     return proxy.to_dict if proxy else {"code": 0, "src": "no proxy"}
 
 
@@ -89,9 +105,21 @@ def delete():
 @app.route('/get_status/')
 def getStatus():
     status = proxy_handler.getCount()
+    status['stats'] = proxy_handler.getStats()
     return status
 
 
+@app.route('/source_status/')
+def sourceStatus():
+    return source_handler.getAll()
+
+
+@app.route('/echo/')
+def echo():
+    # 与httpbin.org/get返回格式一致
+    return {"origin": request.remote_addr, "headers": dict(request.headers)}
+
+
 def runFlask():
     if platform.system() == "Windows":
         app.run(host=conf.serverHost, port=conf.serverPort)
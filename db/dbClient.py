@@ -25,20 +25,32 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 class DbClient(withMetaclass(Singleton)):
     """
-    DbClient DB工厂类 提供get/put/update/pop/delete/exists/getAll/clean/getCount/changeTable方法
+    DbClient DB工厂类 提供get/put/update/pop/delete/exists/putMany/deleteMany/existsMany/getDue/fillDue/getQuarantine/quarantineMany/deleteQuarantine/purgeQuarantine/getAll/clean/getCount/changeTable/updateStats/incrStats/getStats方法
 
 
     抽象方法定义：
-        get(): 随机返回一个proxy;
+        get(max_latency, fastest, proxy_type): 随机返回一个proxy, 可限定延迟上限、只在延迟最低的fastest个中选择或限定匿名度类型;
         put(proxy): 存入一个proxy;
         pop(): 顺序返回并删除一个proxy;
         update(proxy): 更新指定proxy信息;
         delete(proxy): 删除指定proxy;
         exists(proxy): 判断指定proxy是否存在;
+        putMany(proxies): 批量存入proxy;
+        deleteMany(proxies): 批量删除proxy;
+        existsMany(proxies): 批量判断proxy是否存在;
+        getDue(lease): 返回已到检测时间的proxy, 并将其检测时间顺延lease秒;
+        fillDue(): 为没有检测时间的proxy补充检测时间;
+        getQuarantine(proxies): 返回proxy的隔离记录;
+        quarantineMany(mapping): 批量写入proxy的隔离记录;
+        deleteQuarantine(proxies): 批量移除proxy的隔离记录;
+        purgeQuarantine(before): 清除过期的隔离记录;
         getAll(): 返回所有代理;
         clean(): 清除所有proxy信息;
         getCount(): 返回proxy统计信息;
         changeTable(name): 切换操作对象
+        updateStats(mapping): 更新运行统计信息;
+        incrStats(mapping): 累加运行统计信息;
+        getStats(): 返回运行统计信息;
 
 
         所有方法需要相应类去具体实现：
@@ -101,9 +113,36 @@ class DbClient(withMetaclass(Singleton)):
     def exists(self, key, **kwargs):
         return self.client.exists(key, **kwargs)
 
+    def putMany(self, keys, **kwargs):
+        return self.client.putMany(keys, **kwargs)
+
+    def deleteMany(self, keys, **kwargs):
+        return self.client.deleteMany(keys, **kwargs)
+
+    def existsMany(self, keys, **kwargs):
+        return self.client.existsMany(keys, **kwargs)
+
     def pop(self, **kwargs):
         return self.client.pop(**kwargs)
 
+    def getDue(self, lease):
+        return self.client.getDue(lease)
+
+    def fillDue(self):
+        return self.client.fillDue()
+
+    def getQuarantine(self, keys):
+        return self.client.getQuarantine(keys)
+
+    def quarantineMany(self, mapping):
+        return self.client.quarantineMany(mapping)
+
+    def deleteQuarantine(self, keys):
+        return self.client.deleteQuarantine(keys)
+
+    def purgeQuarantine(self, before):
+        return self.client.purgeQuarantine(before)
+
     def getAll(self):
         return self.client.getAll()
 
@@ -116,5 +155,14 @@ class DbClient(withMetaclass(Singleton)):
     def getCount(self):
         return self.client.getCount()
 
+    def updateStats(self, mapping):
+        return self.client.updateStats(mapping)
+
+    def incrStats(self, mapping):
+        return self.client.incrStats(mapping)
+
+    def getStats(self):
+        return self.client.getStats()
+
     def test(self):
         return self.client.test()
@@ -12,15 +12,20 @@
                    2017/09/22: PY3中 redis-py返回的数据是bytes型
                    2017/09/27: 修改pop()方法 返回{proxy:value}字典
                    2020/07/03: 2.1.0 优化代码结构
+                   2026/10/18: 新增代理延迟索引
+                   2026/10/18: 指定类型时先按类型过滤再取延迟最低的代理
 -------------------------------------------------
 """
 __author__ = 'JHao'
 from redis.exceptions import TimeoutError, ConnectionError, ResponseError
 from redis.connection import BlockingConnectionPool
 from handler.logHandler import LogHandler
-from random import choice
+from random import choice, randint
+from time import time
 from redis import Redis
 
+from helper.proxy import PROXY_TYPES
+
 
 class SsdbClient(object):
     """
@@ -28,6 +33,10 @@ class SsdbClient(object):
 
     SSDB中代理存放的结构为hash：
     key为代理的ip:por, value为代理属性的字典;
+    另以zset {name}_latency 按延迟(ms)索引代理;
+    另以zset {name}_due 按下次检测时间索引代理;
+    近期校验失败的代理隔离在zset {name}_quarantine(截止时间)及hash {name}_quarantine_fails(失败次数)中;
+    另以zset {name}_type_{type} 按匿名度类型索引代理;
     """
 
     def __init__(self, **kwargs):
@@ -39,18 +48,33 @@ class SsdbClient(object):
         :return:
         """
         self.name = ""
+        self.stats_name = "_stats"
+        self.latency_name = "_latency"
+        self.due_name = "_due"
+        self.quarantine_name = "_quarantine"
+        self.quarantine_fails_name = "_quarantine_fails"
         kwargs.pop("username")
         self.__conn = Redis(connection_pool=BlockingConnectionPool(decode_responses=True,
                                                                    timeout=5,
                                                                    socket_timeout=5,
                                                                    **kwargs))
 
-    def get(self):
+    def get(self, max_latency=None, fastest=None, proxy_type=None):
         """
         从hash中随机返回一个代理
+        :param max_latency: 只返回延迟不超过max_latency(ms)的代理
+        :param fastest: 只从延迟最低的fastest个代理中返回
+        :param proxy_type: 只返回该匿名度类型的代理
         :return:
         """
-        proxies = self.__conn.hkeys(self.name)
+        type_name = "%s_type_%s" % (self.name, proxy_type) if proxy_type else None
+        if max_latency is None and fastest is None:
+            if type_name:
+                proxy = self.__randomMember(type_name)
+                return self.__conn.hget(self.name, proxy) if proxy else None
+            proxies = self.__conn.hkeys(self.name)
+        else:
+            proxies = self.__fastestMembers(max_latency, fastest, type_name)
         proxy = choice(proxies) if proxies else None
         if proxy:
             return self.__conn.hget(self.name, proxy)
@@ -63,8 +87,9 @@ class SsdbClient(object):
         :param proxy_obj: Proxy obj
         :return:
         """
-        result = self.__conn.hset(self.name, proxy_obj.proxy, proxy_obj.to_json)
-        return result
+        pipe = self.__conn.pipeline(transaction=False)
+        self.__pipePut(pipe, proxy_obj)
+        return pipe.execute()[0]
 
     def pop(self):
         """
@@ -74,7 +99,7 @@ class SsdbClient(object):
         proxies = self.__conn.hkeys(self.name)
         for proxy in proxies:
             proxy_info = self.__conn.hget(self.name, proxy)
-            self.__conn.hdel(self.name, proxy)
+            self.delete(proxy)
             return proxy_info
         else:
             return None
@@ -85,7 +110,9 @@ class SsdbClient(object):
         :param proxy_str: proxy str
         :return:
         """
-        self.__conn.hdel(self.name, proxy_str)
+        pipe = self.__conn.pipeline(transaction=False)
+        self.__pipeDelete(pipe, proxy_str)
+        pipe.execute()
 
     def exists(self, proxy_str):
         """
@@ -95,13 +122,127 @@ class SsdbClient(object):
         """
         return self.__conn.hexists(self.name, proxy_str)
 
+    def putMany(self, proxy_objs):
+        """
+        批量放入代理, 通过pipeline一次提交
+        :param proxy_objs: Proxy obj list
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_obj in proxy_objs:
+            self.__pipePut(pipe, proxy_obj)
+        return pipe.execute()
+
+    def deleteMany(self, proxy_strs):
+        """
+        批量移除代理, 通过pipeline一次提交
+        :param proxy_strs: proxy str list
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_str in proxy_strs:
+            self.__pipeDelete(pipe, proxy_str)
+        return pipe.execute()
+
+    def existsMany(self, proxy_strs):
+        """
+        批量判断代理是否存在
+        :param proxy_strs: proxy str list
+        :return: bool list
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_str in proxy_strs:
+            pipe.hexists(self.name, proxy_str)
+        return pipe.execute()
+
     def update(self, proxy_obj):
         """
         更新 proxy 属性
         :param proxy_obj:
         :return:
         """
-        self.__conn.hset(self.name, proxy_obj.proxy, proxy_obj.to_json)
+        self.put(proxy_obj)
+
+    def getDue(self, lease):
+        """
+        返回所有已到检测时间的代理, 并将其下次检测时间顺延lease秒, 避免检测完成前被重复取出
+        :param lease: 顺延秒数
+        :return: 代理属性json list
+        """
+        now = time()
+        proxies = self.__conn.zrangebyscore(self.due_name, "-inf", now)
+        if not proxies:
+            return []
+        values = self.__conn.hmget(self.name, proxies)
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy, value in zip(proxies, values):
+            if value is None:
+                pipe.zrem(self.due_name, proxy)
+            else:
+                pipe.zadd(self.due_name, {proxy: now + lease})
+        pipe.execute()
+        return [value for value in values if value is not None]
+
+    def fillDue(self):
+        """
+        为没有检测时间的代理补充检测时间, 使其立即到期
+        :return: 补充的代理数量
+        """
+        missing = set(self.__conn.hkeys(self.name)) - set(self.__conn.zrange(self.due_name, 0, -1))
+        if missing:
+            self.__conn.zadd(self.due_name, dict((proxy, 0) for proxy in missing))
+        return len(missing)
+
+    def getQuarantine(self, proxy_strs):
+        """
+        返回代理的隔离记录
+        :param proxy_strs: proxy str list
+        :return: list of (失败次数, 隔离截止时间戳), 无记录为None
+        """
+        if not proxy_strs:
+            return []
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_str in proxy_strs:
+            pipe.zscore(self.quarantine_name, proxy_str)
+        pipe.hmget(self.quarantine_fails_name, proxy_strs)
+        result = pipe.execute()
+        return [None if until is None else (int(fails or 1), until)
+                for until, fails in zip(result[:-1], result[-1])]
+
+    def quarantineMany(self, mapping):
+        """
+        批量写入代理的隔离记录
+        :param mapping: dict {proxy_str: (失败次数, 隔离截止时间戳)}
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_str, (fails, until) in mapping.items():
+            pipe.zadd(self.quarantine_name, {proxy_str: until})
+            pipe.hset(self.quarantine_fails_name, proxy_str, fails)
+        return pipe.execute()
+
+    def deleteQuarantine(self, proxy_strs):
+        """
+        批量移除代理的隔离记录
+        :param proxy_strs: proxy str list
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for proxy_str in proxy_strs:
+            pipe.zrem(self.quarantine_name, proxy_str)
+            pipe.hdel(self.quarantine_fails_name, proxy_str)
+        return pipe.execute()
+
+    def purgeQuarantine(self, before):
+        """
+        清除隔离截止时间早于before的记录
+        :param before: 时间戳
+        :return: 清除的数量
+        """
+        expired = self.__conn.zrangebyscore(self.quarantine_name, "-inf", before)
+        if expired:
+            self.deleteQuarantine(expired)
+        return len(expired)
 
     def getAll(self):
         """
@@ -116,7 +257,8 @@ class SsdbClient(object):
         清空所有代理, 使用changeTable指定hash name
         :return:
         """
-        return self.__conn.delete(self.name)
+        type_names = ["%s_type_%s" % (self.name, proxy_type) for proxy_type in PROXY_TYPES]
+        return self.__conn.delete(self.name, self.latency_name, self.due_name, *type_names)
 
     def getCount(self):
         """
@@ -125,6 +267,86 @@ class SsdbClient(object):
         """
         return self.__conn.hlen(self.name)
 
+    def __pipePut(self, pipe, proxy_obj):
+        pipe.hset(self.name, proxy_obj.proxy, proxy_obj.to_json)
+        if proxy_obj.latency is not None:
+            pipe.zadd(self.latency_name, {proxy_obj.proxy: proxy_obj.latency})
+        pipe.zadd(self.due_name, {proxy_obj.proxy: proxy_obj.next_check or 0})
+        for proxy_type in PROXY_TYPES:
+            if proxy_type == proxy_obj.type:
+                pipe.zadd("%s_type_%s" % (self.name, proxy_type), {proxy_obj.proxy: 0})
+            else:
+                pipe.zrem("%s_type_%s" % (self.name, proxy_type), proxy_obj.proxy)
+
+    def __pipeDelete(self, pipe, proxy_str):
+        pipe.hdel(self.name, proxy_str)
+        pipe.zrem(self.latency_name, proxy_str)
+        pipe.zrem(self.due_name, proxy_str)
+        for proxy_type in PROXY_TYPES:
+            pipe.zrem("%s_type_%s" % (self.name, proxy_type), proxy_str)
+
+    def __fastestMembers(self, max_latency, fastest, type_name):
+        """
+        按延迟从低到高返回代理, 指定类型时先按类型过滤, 再取其中延迟最低的fastest个
+        :param max_latency: 延迟上限(ms), None表示不限
+        :param fastest: 数量, None表示不限
+        :param type_name: 类型索引zset, None表示不限
+        :return: proxy list
+        """
+        max_score = "+inf" if max_latency is None else max_latency
+        if not type_name:
+            return self.__conn.zrangebyscore(self.latency_name, "-inf", max_score,
+                                             start=0 if fastest else None, num=fastest)
+        proxies, start, page = list(), 0, max(fastest or 0, 500)
+        while True:
+            chunk = self.__conn.zrangebyscore(self.latency_name, "-inf", max_score, start=start, num=page)
+            if chunk:
+                pipe = self.__conn.pipeline(transaction=False)
+                for proxy in chunk:
+                    pipe.zscore(type_name, proxy)
+                proxies.extend(proxy for proxy, score in zip(chunk, pipe.execute()) if score is not None)
+            if len(chunk) < page or (fastest and len(proxies) >= fastest):
+                break
+            start += page
+        return proxies[:fastest] if fastest else proxies
+
+    def __randomMember(self, zset_name):
+        count = self.__conn.zcard(zset_name)
+        if not count:
+            return None
+        index = randint(0, count - 1)
+        members = self.__conn.zrange(zset_name, index, index)
+        return members[0] if members else None
+
+    def updateStats(self, mapping):
+        """
+        更新运行统计信息, 存放在 {name}_stats hash中
+        :param mapping: dict {field: value}
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for field, value in mapping.items():
+            pipe.hset(self.stats_name, field, value)
+        return pipe.execute()
+
+    def incrStats(self, mapping):
+        """
+        累加运行统计信息
+        :param mapping: dict {field: amount}
+        :return:
+        """
+        pipe = self.__conn.pipeline(transaction=False)
+        for field, amount in mapping.items():
+            pipe.hincrby(self.stats_name, field, amount)
+        return pipe.execute()
+
+    def getStats(self):
+        """
+        返回运行统计信息
+        :return: dict
+        """
+        return self.__conn.hgetall(self.stats_name)
+
     def changeTable(self, name):
         """
         切换操作对象
@@ -132,6 +354,11 @@ class SsdbClient(object):
         :return:
         """
         self.name = name
+        self.stats_name = "%s_stats" % name
+        self.latency_name = "%s_latency" % name
+        self.due_name = "%s_due" % name
+        self.quarantine_name = "%s_quarantine" % name
+        self.quarantine_fails_name = "%s_quarantine_fails" % name
 
     def test(self):
         log = LogHandler('ssdb_client')
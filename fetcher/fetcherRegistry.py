@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     fetcherRegistry
+   Description :   采集函数注册及加载
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 采集函数注册, 支持从外部模块加载
+                   2026/10/18: 加载PROXY_SOURCES中的声明式代理源
+                   2026/10/18: PROXY_SOURCES可覆盖内置代理源的定义
+                   2026/10/18: 配置只在refreshFetchers时读取, 找不到的名称在下次刷新前不再查找
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from importlib import import_module
+from threading import Lock
+
+from handler.logHandler import LogHandler
+from handler.configHandler import ConfigHandler
+
+# 外部包可在该entry point组下注册采集函数, 在PROXY_FETCHER中按entry point名称引用
+ENTRY_POINT_GROUP = "proxy_pool.fetchers"
+
+
+class FetcherSpec(object):
+    """
+    采集函数及其调度参数:
+        interval: 最短采集间隔(秒), 默认为FETCH_INTERVAL;
+        pages: 采集页数, 指定时以page_count参数传给采集函数;
+        timeout: 单次采集的最长执行时间(秒), 默认为FETCH_TIMEOUT;
+        concurrency: 同时执行的采集次数上限, 上一次采集未结束时超出上限的采集被跳过.
+    """
+
+    def __init__(self, name, func, interval=None, pages=None, timeout=None, concurrency=1):
+        self.name = name
+        self.func = func
+        self._interval = interval
+        self.pages = pages
+        self._timeout = timeout
+        self.concurrency = max(1, int(concurrency))
+        self._running = 0
+        self._lock = Lock()
+
+    @property
+    def interval(self):
+        return self._interval or ConfigHandler().fetchInterval
+
+    @property
+    def timeout(self):
+        return self._timeout or ConfigHandler().fetchTimeout
+
+    def acquire(self):
+        """
+        非阻塞获取执行名额
+        :return: True/False
+        """
+        with self._lock:
+            if self._running >= self.concurrency:
+                return False
+            self._running += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._running -= 1
+
+    def __call__(self):
+        if self.pages:
+            return self.func(page_count=self.pages)
+        return self.func()
+
+
+_registry = dict()
+_registry_lock = Lock()
+# 最近一次refreshFetchers读取的PROXY_SOURCES
+_source_definitions = None
+# 找不到的名称, 下次refreshFetchers前不再查找entry point等
+_missing = set()
+
+
+def fetcher(func=None, name=None, interval=None, pages=None, timeout=None, concurrency=1):
+    """
+    注册采集函数, 可直接用作装饰器, 也可指定参数 @fetcher(interval=600, pages=2);
+    ProxyFetcher中与@staticmethod同用时需写在@staticmethod之下
+    :param func: 采集函数, 以生成器形式返回 host:port
+    :param name: 注册名称, 默认为函数名
+    :param interval: 最短采集间隔(秒)
+    :param pages: 采集页数
+    :param timeout: 单次采集的最长执行时间(秒)
+    :param concurrency: 同时执行的采集次数上限
+    :return:
+    """
+
+    def decorator(f):
+        spec = FetcherSpec(name or f.__name__, f, interval, pages, timeout, concurrency)
+        with _registry_lock:
+            _registry[spec.name] = spec
+        return f
+
+    return decorator(func) if callable(func) else decorator
+
+
+def _entryPoint(name):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return None
+        return next((ep for ep in iter_entry_points(ENTRY_POINT_GROUP) if ep.name == name), None)
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    return next((ep for ep in eps if ep.name == name), None)
+
+
+def _importPath(path):
+    """
+    按 module:func 或 module.func 导入采集函数
+    :param path:
+    :return:
+    """
+    if ":" in path:
+        module_name, attr = path.split(":", 1)
+    else:
+        module_name, _, attr = path.rpartition(".")
+    if not module_name:
+        return None
+    obj = import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def refreshFetchers():
+    """
+    重新读取PROXY_FETCHER及PROXY_SOURCES并加载其中的采集函数, 每个采集周期开始时调用一次, 本周期内使用返回的结果
+    :return: [(name, FetcherSpec)], 按PROXY_FETCHER的顺序, 不存在的采集函数为None
+    """
+    global _source_definitions
+    conf = ConfigHandler()
+    names = [name.strip() for name in conf.fetchers]
+    definitions = list(conf.sources)
+    with _registry_lock:
+        _source_definitions = definitions
+        _missing.clear()
+    return [(name, loadFetcher(name)) for name in names]
+
+
+def loadFetcher(name):
+    """
+    按名称加载采集函数, 依次查找: PROXY_SOURCES中的声明式代理源(与内置代理源同名时覆盖其中的项)、已注册的采集函数、ProxyFetcher的静态方法、
+    entry point、module:func路径; PROXY_SOURCES使用最近一次refreshFetchers读取的配置
+    :param name: PROXY_FETCHER中的名称
+    :return: FetcherSpec, 不存在返回None
+    """
+    global _source_definitions
+    # 导入时注册内置采集函数
+    from fetcher.proxyFetcher import ProxyFetcher
+    name = name.strip()
+    if _source_definitions is None:
+        _source_definitions = list(ConfigHandler().sources)
+    definition = next((_ for _ in _source_definitions if _.get("name") == name), None)
+    if definition is not None:
+        from fetcher.sourceEngine import loadSource
+        try:
+            loadSource(definition)
+        except (ValueError, TypeError) as e:
+            LogHandler("fetcher", file=False).error("source %s: invalid definition: %s" % (name, e))
+            return None
+
+    with _registry_lock:
+        spec = _registry.get(name)
+        missing = name in _missing
+    if spec is not None or missing:
+        return spec
+
+    func = getattr(ProxyFetcher, name, None)
+    if func is None:
+        entry_point = _entryPoint(name)
+        if entry_point is not None:
+            func = entry_point.load()
+        elif "." in name or ":" in name:
+            try:
+                func = _importPath(name)
+            except (ImportError, AttributeError):
+                func = None
+    if not callable(func):
+        with _registry_lock:
+            _missing.add(name)
+        return None
+
+    with _registry_lock:
+        # 外部模块中用@fetcher注册过的函数沿用其声明的参数
+        spec = next((_ for _ in _registry.values() if _.func is func), None) or FetcherSpec(name, func)
+        _registry[name] = spec
+    return spec
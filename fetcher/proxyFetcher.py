@@ -8,14 +8,27 @@
 -------------------------------------------------
    Change Activity:
                    2016/11/25: proxyFetcher
+                   2026/10/18: 采集函数注册到fetcherRegistry, 可声明采集间隔及页数等参数
+                   2026/10/18: 支持页面回放
+                   2026/10/18: 按页面解析的代理源改为声明式定义
+                   2026/10/18: 分页代理源按新代理比例决定采集页数
+                   2026/10/18: freeProxy03支持录制回放
+                   2026/10/18: 保留声明式代理源的ProxyFetcher静态方法, freeProxy13默认采集2页
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
 import re
-from time import sleep
 
-from util.webRequest import WebRequest
+from util.webRequest import WebRequest, fixtures, mergePageStats, RECORD, REPLAY
+from fetcher.fetcherRegistry import fetcher, loadFetcher
+from fetcher.sourceEngine import registerSources
+
+
+def _builtinSource(name, page_count=None):
+    # 按当前注册的代理源(PROXY_SOURCES覆盖后的定义)采集
+    for proxy in loadFetcher(name).func(page_count=page_count):
+        yield proxy
 
 
 class ProxyFetcher(object):
@@ -24,6 +37,7 @@ class ProxyFetcher(object):
     """
 
     @staticmethod
+    @fetcher
     def freeProxy01():
         """
         米扑代理 https://proxy.mimvp.com/
@@ -49,34 +63,37 @@ class ProxyFetcher(object):
                     print(e)
 
     @staticmethod
-    def freeProxy02():
-        """
-        代理66 http://www.66ip.cn/
-        :return:
-        """
-        url = "http://www.66ip.cn/mo.php"
-
-        resp = WebRequest().get(url, timeout=10)
-        proxies = re.findall(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5})', resp.text)
-        for proxy in proxies:
-            yield proxy
-
-    @staticmethod
+    @fetcher
     def freeProxy03():
         """
         pzzqz https://pzzqz.com/
         """
         from requests import Session
         from lxml import etree
+        url = "https://pzzqz.com/"
+        # 使用独立Session发送POST请求, 录制回放时POST的响应以此为key
+        post_key = url + "#post"
+        mode = fixtures.mode
         session = Session()
         try:
-            index_resp = session.get("https://pzzqz.com/", timeout=20, verify=False).text
-            x_csrf_token = re.findall('X-CSRFToken": "(.*?)"', index_resp)
+            index_resp = fixtures.load(url) if mode == REPLAY else session.get(url, timeout=20, verify=False)
+            if index_resp is None:
+                return
+            mergePageStats(1, 0)
+            x_csrf_token = re.findall('X-CSRFToken": "(.*?)"', index_resp.text)
             if x_csrf_token:
                 data = {"http": "on", "ping": "3000", "country": "cn", "ports": ""}
-                proxy_resp = session.post("https://pzzqz.com/", verify=False,
-                                          headers={"X-CSRFToken": x_csrf_token[0]}, json=data).json()
-                tree = etree.HTML(proxy_resp["proxy_html"])
+                if mode == REPLAY:
+                    proxy_resp = fixtures.load(post_key)
+                else:
+                    proxy_resp = session.post(url, verify=False, headers={"X-CSRFToken": x_csrf_token[0]}, json=data)
+                if proxy_resp is None:
+                    return
+                mergePageStats(1, 0)
+                if mode == RECORD:
+                    fixtures.save(url, index_resp)
+                    fixtures.save(post_key, proxy_resp)
+                tree = etree.HTML(proxy_resp.json()["proxy_html"])
                 for tr in tree.xpath("//tr"):
                     ip = "".join(tr.xpath("./td[1]/text()"))
                     port = "".join(tr.xpath("./td[2]/text()"))
@@ -84,103 +101,70 @@ class ProxyFetcher(object):
         except Exception as e:
             print(e)
 
+    # 以下代理源已改为声明式定义(见BUILTIN_SOURCES), 保留静态方法供直接调用
+
+    @staticmethod
+    def freeProxy02():
+        """
+        代理66 http://www.66ip.cn/
+        """
+        return _builtinSource("freeProxy02")
+
     @staticmethod
     def freeProxy04():
         """
         神鸡代理 http://www.shenjidaili.com/
-        :return:
         """
-        url = "http://www.shenjidaili.com/product/open/"
-        tree = WebRequest().get(url).tree
-        for table in tree.xpath("//table[@class='table table-hover text-white text-center table-borderless']"):
-            for tr in table.xpath("./tr")[1:]:
-                proxy = ''.join(tr.xpath("./td[1]/text()"))
-                yield proxy.strip()
+        return _builtinSource("freeProxy04")
 
     @staticmethod
     def freeProxy05(page_count=1):
         """
         快代理 https://www.kuaidaili.com
         """
-        url_pattern = [
-            'https://www.kuaidaili.com/free/inha/{}/',
-            'https://www.kuaidaili.com/free/intr/{}/'
-        ]
-        url_list = []
-        for page_index in range(1, page_count + 1):
-            for pattern in url_pattern:
-                url_list.append(pattern.format(page_index))
-
-        for url in url_list:
-            tree = WebRequest().get(url).tree
-            proxy_list = tree.xpath('.//table//tr')
-            sleep(1)  # 必须sleep 不然第二条请求不到数据
-            for tr in proxy_list[1:]:
-                yield ':'.join(tr.xpath('./td/text()')[0:2])
+        return _builtinSource("freeProxy05", page_count)
 
     @staticmethod
     def freeProxy06():
         """
         代理盒子 https://proxy.coderbusy.com/
-        :return:
         """
-        urls = ['https://proxy.coderbusy.com/zh-hans/ops/country/cn.html']
-        for url in urls:
-            tree = WebRequest().get(url).tree
-            proxy_list = tree.xpath('.//table//tr')
-            for tr in proxy_list[1:]:
-                proxy = '{}:{}'.format("".join(tr.xpath("./td[1]/text()")).strip(),
-                                       "".join(tr.xpath("./td[2]//text()")).strip())
-                if proxy:
-                    yield proxy
+        return _builtinSource("freeProxy06")
 
     @staticmethod
     def freeProxy07():
         """
         云代理 http://www.ip3366.net/free/
-        :return:
         """
-        urls = ['http://www.ip3366.net/free/?stype=1',
-                "http://www.ip3366.net/free/?stype=2"]
-        for url in urls:
-            r = WebRequest().get(url, timeout=10)
-            proxies = re.findall(r'<td>(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})</td>[\s\S]*?<td>(\d+)</td>', r.text)
-            for proxy in proxies:
-                yield ":".join(proxy)
+        return _builtinSource("freeProxy07")
 
     @staticmethod
     def freeProxy08():
         """
         IP海 http://www.iphai.com/free/ng
-        :return:
         """
-        urls = [
-            'http://www.iphai.com/free/ng',
-            'http://www.iphai.com/free/np',
-            'http://www.iphai.com/free/wg',
-            'http://www.iphai.com/free/wp'
-        ]
-        for url in urls:
-            r = WebRequest().get(url, timeout=10)
-            proxies = re.findall(r'<td>\s*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s*?</td>[\s\S]*?<td>\s*?(\d+)\s*?</td>',
-                                 r.text)
-            for proxy in proxies:
-                yield ":".join(proxy)
+        return _builtinSource("freeProxy08")
 
     @staticmethod
     def freeProxy09(page_count=1):
         """
-        http://ip.jiangxianli.com/?page=
-        免费代理库
-        :return:
+        免费代理库 http://ip.jiangxianli.com/
         """
-        for i in range(1, page_count + 1):
-            url = 'http://ip.jiangxianli.com/?country=中国&page={}'.format(i)
-            html_tree = WebRequest().get(url).tree
-            for index, tr in enumerate(html_tree.xpath("//table//tr")):
-                if index == 0:
-                    continue
-                yield ":".join(tr.xpath("./td/text()")[0:2]).strip()
+        return _builtinSource("freeProxy09", page_count)
+
+    @staticmethod
+    def freeProxy13(page_count=2):
+        """
+        89免费代理 http://www.89ip.cn/index.html
+        """
+        return _builtinSource("freeProxy13", page_count)
+
+    @staticmethod
+    def freeProxy14():
+        """
+        西拉代理 http://www.xiladaili.com/
+        """
+        return _builtinSource("freeProxy14")
 
     # @staticmethod
     # def freeProxy10():
@@ -221,43 +205,85 @@ class ProxyFetcher(object):
     #         for proxy in proxies:
     #             yield ':'.join(proxy)
 
-    @staticmethod
-    def freeProxy13(max_page=2):
-        """
-        http://www.89ip.cn/index.html
-        89免费代理
-        :param max_page:
-        :return:
-        """
-        base_url = 'http://www.89ip.cn/index_{}.html'
-        for page in range(1, max_page + 1):
-            url = base_url.format(page)
-            r = WebRequest().get(url, timeout=10)
-            proxies = re.findall(
-                r'<td.*?>[\s\S]*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})[\s\S]*?</td>[\s\S]*?<td.*?>[\s\S]*?(\d+)[\s\S]*?</td>',
-                r.text)
-            for proxy in proxies:
-                yield ':'.join(proxy)
 
-    @staticmethod
-    def freeProxy14():
-        """
-        http://www.xiladaili.com/
-        西拉代理
-        :return:
-        """
-        urls = ['http://www.xiladaili.com/putong/',
-                "http://www.xiladaili.com/gaoni/",
-                "http://www.xiladaili.com/http/",
-                "http://www.xiladaili.com/https/"]
-        for url in urls:
-            r = WebRequest().get(url, timeout=10)
-            ips = re.findall(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5}", r.text)
-            for ip in ips:
-                yield ip.strip()
+# 声明式代理源, 由fetcher.sourceEngine编译后注册为同名采集函数, 定义格式见DeclarativeSource;
+# 需要多步请求或解码等无法声明的代理源写为上面ProxyFetcher的静态方法
+BUILTIN_SOURCES = [
+    {
+        # 代理66 http://www.66ip.cn/
+        "name": "freeProxy02",
+        "urls": "http://www.66ip.cn/mo.php",
+        "extract": {"regex": r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5}"},
+    },
+    {
+        # 神鸡代理 http://www.shenjidaili.com/
+        "name": "freeProxy04",
+        "urls": "http://www.shenjidaili.com/product/open/",
+        "extract": {"xpath": "//table[@class='table table-hover text-white text-center table-borderless']/tr[td]",
+                    "fields": ["./td[1]/text()"]},
+        "request_timeout": 5,
+    },
+    {
+        # 快代理 https://www.kuaidaili.com
+        "name": "freeProxy05",
+        "urls": ["https://www.kuaidaili.com/free/inha/{page}/", "https://www.kuaidaili.com/free/intr/{page}/"],
+        "extract": {"xpath": "//table//tr[td]", "fields": ["./td[1]/text()", "./td[2]/text()"]},
+        "pages": 1,
+        "max_pages": 5,
+        "rate_limit": 1,  # 请求间隔不足1秒时第二条请求不到数据
+        "workers": 1,
+        "request_timeout": 5,
+    },
+    {
+        # 代理盒子 https://proxy.coderbusy.com/
+        "name": "freeProxy06",
+        "urls": "https://proxy.coderbusy.com/zh-hans/ops/country/cn.html",
+        "extract": {"xpath": "//table//tr[td]", "fields": ["./td[1]/text()", "./td[2]//text()"]},
+        "request_timeout": 5,
+    },
+    {
+        # 云代理 http://www.ip3366.net/free/
+        "name": "freeProxy07",
+        "urls": ["http://www.ip3366.net/free/?stype=1", "http://www.ip3366.net/free/?stype=2"],
+        "extract": {"regex": r"<td>(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})</td>[\s\S]*?<td>(\d+)</td>"},
+    },
+    {
+        # IP海 http://www.iphai.com/free/ng
+        "name": "freeProxy08",
+        "urls": ["http://www.iphai.com/free/ng", "http://www.iphai.com/free/np",
+                 "http://www.iphai.com/free/wg", "http://www.iphai.com/free/wp"],
+        "extract": {"regex": r"<td>\s*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s*?</td>[\s\S]*?<td>\s*?(\d+)\s*?</td>"},
+    },
+    {
+        # 免费代理库 http://ip.jiangxianli.com/
+        "name": "freeProxy09",
+        "urls": "http://ip.jiangxianli.com/?country=中国&page={page}",
+        "extract": {"xpath": "//table//tr[td]", "fields": ["./td[1]/text()", "./td[2]/text()"]},
+        "pages": 1,
+        "max_pages": 5,
+        "request_timeout": 5,
+    },
+    {
+        # 89免费代理 http://www.89ip.cn/index.html
+        "name": "freeProxy13",
+        "urls": "http://www.89ip.cn/index_{page}.html",
+        "extract": {"regex": r"<td.*?>[\s\S]*?(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})[\s\S]*?</td>"
+                             r"[\s\S]*?<td.*?>[\s\S]*?(\d+)[\s\S]*?</td>"},
+        "pages": 2,
+        "max_pages": 10,
+    },
+    {
+        # 西拉代理 http://www.xiladaili.com/
+        "name": "freeProxy14",
+        "urls": ["http://www.xiladaili.com/putong/", "http://www.xiladaili.com/gaoni/",
+                 "http://www.xiladaili.com/http/", "http://www.xiladaili.com/https/"],
+        "extract": {"regex": r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5}"},
+    },
+]
+
+registerSources(BUILTIN_SOURCES)
 
 
 if __name__ == '__main__':
-    p = ProxyFetcher()
-    for _ in p.freeProxy04():
+    for _ in loadFetcher("freeProxy04")():
         print(_)
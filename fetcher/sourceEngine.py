@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     sourceEngine
+   Description :   声明式代理源: 提取规则预编译, 各页面并发请求, 逐页返回采集到的代理
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 声明式代理源
+                   2026/10/18: 按新代理比例决定分页采集深度
+                   2026/10/18: rate_limit改为从上一次请求结束起计算, 设置后请求依次执行
+                   2026/10/18: 已采集代理按packProxy压缩存储, 每代不超过SEEN_CAPACITY个
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import re
+import json
+from time import time, sleep
+from threading import Thread, Lock
+from collections import deque
+from contextlib import contextmanager
+
+from lxml import etree
+
+from util.six import Queue, Empty
+from util.proxyCodec import packProxy
+from util.webRequest import WebRequest, fixtures, resetPageStats, pageStats, mergePageStats, REPLAY
+from fetcher.fetcherRegistry import fetcher
+from handler.configHandler import ConfigHandler
+
+
+class RegexExtractor(object):
+    """ 正则提取: 有分组时各分组以:连接为代理, 没有分组时整个匹配即为代理 """
+
+    def __init__(self, pattern):
+        self.pattern = re.compile(pattern)
+
+    def __call__(self, request):
+        matches = self.pattern.findall(request.text)
+        if self.pattern.groups > 1:
+            return [":".join(match).strip() for match in matches]
+        return [match.strip() for match in matches]
+
+
+class XPathExtractor(object):
+    """ xpath提取: rows选出代理所在的行, fields为行内的相对xpath, 各字段文本以:连接为代理; 没有fields时行的文本即为代理 """
+
+    def __init__(self, rows, fields=None):
+        self.rows = etree.XPath(rows)
+        self.fields = [etree.XPath(field) for field in fields or []]
+
+    def __call__(self, request):
+        rows = self.rows(request.tree)
+        if self.fields:
+            return [":".join("".join(field(row)).strip() for field in self.fields) for row in rows]
+        return [(row.xpath("string()") if hasattr(row, "xpath") else row).strip() for row in rows]
+
+
+class JsonExtractor(object):
+    """ JSON提取: path为以.分隔的路径, 指向代理列表; fields为列表元素的字段名, 各字段以:连接为代理; 没有fields时元素即为代理 """
+
+    def __init__(self, path, fields=None):
+        self.path = [key for key in path.split(".") if key]
+        self.fields = list(fields or [])
+
+    def __call__(self, request):
+        if not request.text:
+            return []
+        data = json.loads(request.text)
+        for key in self.path:
+            data = data[int(key)] if isinstance(data, list) else data.get(key)
+            if data is None:
+                return []
+        if self.fields:
+            return [":".join(("%s" % item.get(field, "")).strip() for field in self.fields) for item in data]
+        return [("%s" % item).strip() for item in data]
+
+
+def compileExtractor(rule):
+    """
+    编译提取规则
+    :param rule: {"regex": pattern} 或 {"xpath": rows, "fields": [...]} 或 {"json": path, "fields": [...]}
+    :return: extractor, 以WebRequest为参数, 返回代理list; 规则不正确时抛出ValueError
+    """
+    rule = rule or dict()
+    try:
+        if "regex" in rule:
+            return RegexExtractor(rule["regex"])
+        if "xpath" in rule:
+            return XPathExtractor(rule["xpath"], rule.get("fields"))
+        if "json" in rule:
+            return JsonExtractor(rule["json"], rule.get("fields"))
+    except (re.error, etree.XPathError) as e:
+        raise ValueError("invalid extract rule %r: %s" % (rule, e))
+    raise ValueError("extract rule must be one of regex/xpath/json: %r" % (rule,))
+
+
+class DeclarativeSource(object):
+    """
+    声明式代理源, 定义为dict:
+        name: 名称, 在PROXY_FETCHER中引用;
+        urls: 页面url或url list, url中的{page}替换为页码, 没有{page}的url只请求一次;
+        extract: 提取规则, 见compileExtractor;
+        pages: 每次至少采集的页数, 默认为1;
+        max_pages: 最多采集的页数, 默认等于pages;
+        min_new_ratio: 继续采集下一页所需的新代理比例, 默认为0.2;
+        rate_limit: 上一次请求结束到下一次请求开始的最小间隔(秒), 默认为0; 设置后该代理源的请求依次执行, 不受workers影响;
+        request_timeout: 单个页面的请求超时(秒), 默认为10;
+        workers: 同时请求的页面数, 默认为4;
+        headers: 附加的请求头;
+        interval/timeout/concurrency: 同@fetcher的参数.
+    提取规则在定义加载时编译一次; 各页面由workers个线程并发请求, 每个页面解析完成后即返回其中的代理.
+    max_pages大于pages时按产出决定采集深度: 每个url先采集前pages页, 此后最后一页中近期(SEEN_TTL~2*SEEN_TTL秒内)
+    未被该代理源采集到的代理比例不低于min_new_ratio时继续采集下一页, 直到max_pages; 页面未变化时比例为0.
+    """
+
+    def __init__(self, name, urls, extract, pages=None, max_pages=None, min_new_ratio=0.2, rate_limit=0,
+                 request_timeout=10, workers=4, headers=None, interval=None, timeout=None, concurrency=1):
+        if not urls:
+            raise ValueError("source %s: urls is empty" % name)
+        self.name = name
+        self.urls = list(urls) if isinstance(urls, (list, tuple)) else [urls]
+        self.extractor = compileExtractor(extract)
+        self.pages = pages
+        self.max_pages = max_pages
+        self.min_new_ratio = min_new_ratio
+        self.rate_limit = rate_limit
+        self.request_timeout = request_timeout
+        self.workers = max(1, int(workers))
+        self.headers = headers
+        self.interval = interval
+        self.timeout = timeout
+        self.concurrency = concurrency
+        # 最近一次采集各url的页数
+        self.depth = dict()
+        # 近期采集到的代理(packProxy压缩), 每SEEN_TTL秒或满SEEN_CAPACITY个时轮换一次: 当前及上一周期
+        self._seen = set()
+        self._seen_previous = set()
+        self._seen_rotated = time()
+        self._next_request = 0
+        self._lock = Lock()
+        self._request_lock = Lock()
+
+    @contextmanager
+    def throttle(self):
+        """
+        同一代理源的请求(包括并发执行的多次采集)依次执行, 距上一次请求结束rate_limit秒后才开始下一次请求;
+        回放时不访问网络, 无需限制
+        """
+        if not self.rate_limit or fixtures.mode == REPLAY:
+            yield
+            return
+        with self._request_lock:
+            wait = self._next_request - time()
+            if wait > 0:
+                sleep(wait)
+            try:
+                yield
+            finally:
+                self._next_request = time() + self.rate_limit
+
+    def fetchPage(self, url):
+        """
+        请求并解析单个页面
+        :param url:
+        :return: 代理list
+        """
+        with self.throttle():
+            request = WebRequest().get(url, header=self.headers, timeout=self.request_timeout)
+        try:
+            return [proxy for proxy in self.extractor(request) if proxy and proxy != ":"]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            request.log.error("source %s: %s extract error: %s" % (self.name, url, str(e)))
+            return []
+
+    def newRatio(self, proxies):
+        """
+        近期未被该代理源采集到的代理比例, 并把这些代理记为已采集;
+        代理按packProxy压缩后存储(无法解析的保留原字符串), 每代最多SEEN_CAPACITY个, 超出时提前轮换
+        :param proxies: 一个页面中的代理list
+        :return: float
+        """
+        if not proxies:
+            return 0.0
+        new = 0
+        conf = ConfigHandler()
+        with self._lock:
+            for proxy in proxies:
+                if len(self._seen) >= conf.seenCapacity or time() - self._seen_rotated > conf.seenTtl:
+                    self._seen_previous, self._seen = self._seen, set()
+                    self._seen_rotated = time()
+                packed = packProxy(proxy)
+                key = proxy if packed is None else packed
+                if key not in self._seen:
+                    self._seen.add(key)
+                    if key not in self._seen_previous:
+                        new += 1
+        return float(new) / len(proxies)
+
+    def __call__(self, page_count=None):
+        min_pages = page_count or self.pages or 1
+        max_pages = max(min_pages, self.max_pages or min_pages)
+        adaptive = max_pages > min_pages
+        depth = dict((url, min_pages) for url in self.urls if "{page}" in url)
+        tasks = [(url, None) for url in self.urls if url not in depth]
+        tasks += [(url, page) for page in range(1, min_pages + 1) for url in self.urls if url in depth]
+
+        def follow(url, page, proxies):
+            # 页面完成后, 按该url已采集的最后一页的产出决定是否采集下一页
+            if not adaptive or page is None:
+                return None
+            ratio = self.newRatio(proxies)
+            if page == depth[url] < max_pages and ratio >= self.min_new_ratio:
+                depth[url] = page + 1
+                return url, page + 1
+            return None
+
+        for proxy in self.__crawl(tasks, follow):
+            yield proxy
+        self.depth = depth
+
+    def __crawl(self, tasks, follow):
+        """
+        请求tasks中的页面, 每个页面完成后由follow返回需要追加的页面
+        :param tasks: [(url, page)]
+        :param follow: func(url, page, proxies) -> (url, page) 或 None
+        :return: 代理生成器
+        """
+        workers = min(self.workers, len(tasks))
+        if workers == 1:
+            tasks = deque(tasks)
+            while tasks:
+                url, page = tasks.popleft()
+                proxies = self.fetchPage(url.format(page=page) if page else url)
+                task = follow(url, page, proxies)
+                if task:
+                    tasks.append(task)
+                for proxy in proxies:
+                    yield proxy
+            return
+
+        pending, results = Queue(), Queue()
+        for task in tasks:
+            pending.put(task)
+
+        def work():
+            while True:
+                task = pending.get()
+                if task is None:
+                    break
+                url, page = task
+                resetPageStats()
+                proxies = list()
+                try:
+                    proxies = self.fetchPage(url.format(page=page) if page else url)
+                except Exception as e:
+                    WebRequest.log.error("source %s: %s error: %s" % (self.name, url, str(e)))
+                results.put((task, pageStats(), proxies))
+
+        for _ in range(workers):
+            thread = Thread(target=work)
+            thread.daemon = True
+            thread.start()
+        try:
+            outstanding = len(tasks)
+            while outstanding:
+                (url, page), stats, proxies = results.get()
+                outstanding -= 1
+                # 页面请求计数记在调用方线程, FetchWorker据此判断代理源有无新数据
+                mergePageStats(*stats)
+                task = follow(url, page, proxies)
+                if task:
+                    pending.put(task)
+                    outstanding += 1
+                for proxy in proxies:
+                    yield proxy
+        finally:
+            # 提前结束时丢弃未开始的页面
+            while True:
+                try:
+                    pending.get_nowait()
+                except Empty:
+                    break
+            for _ in range(workers):
+                pending.put(None)
+
+
+_sources = dict()
+_builtin_definitions = dict()
+
+
+def registerSource(definition):
+    """
+    编译声明式代理源并注册为同名采集函数
+    :param definition: dict, 见DeclarativeSource
+    :return: DeclarativeSource
+    """
+    source = DeclarativeSource(**definition)
+    source.definition = definition
+    fetcher(source, name=source.name, interval=source.interval, pages=source.pages, timeout=source.timeout,
+            concurrency=source.concurrency)
+    _sources[source.name] = source
+    return source
+
+
+def registerSources(definitions):
+    """
+    注册内置代理源
+    :param definitions: 声明式代理源定义list
+    :return:
+    """
+    for definition in definitions:
+        _builtin_definitions[definition["name"]] = definition
+        registerSource(definition)
+
+
+def loadSource(definition):
+    """
+    加载PROXY_SOURCES中的定义: 与内置代理源同名时只覆盖定义中给出的项(如 {"name": "freeProxy13", "max_pages": 10});
+    定义未变化时沿用已注册的代理源
+    :param definition: dict
+    :return: DeclarativeSource
+    """
+    definition = dict(_builtin_definitions.get(definition.get("name"), dict()), **definition)
+    source = _sources.get(definition["name"])
+    if source is not None and source.definition == definition:
+        return source
+    return registerSource(definition)
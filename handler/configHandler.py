@@ -45,29 +45,154 @@ class ConfigHandler(withMetaclass(Singleton)):
         reload_six(setting)
         return setting.PROXY_FETCHER
 
+    @property
+    def sources(self):
+        reload_six(setting)
+        return setting.PROXY_SOURCES
+
+    @LazyProperty
+    def fetchInterval(self):
+        return int(os.getenv("FETCH_INTERVAL", setting.FETCH_INTERVAL))
+
+    @LazyProperty
+    def fetchTimeout(self):
+        return int(os.getenv("FETCH_TIMEOUT", setting.FETCH_TIMEOUT))
+
+    @LazyProperty
+    def fetchCacheTtl(self):
+        return int(os.getenv("FETCH_CACHE_TTL", setting.FETCH_CACHE_TTL))
+
+    @LazyProperty
+    def fetchFixtureMode(self):
+        return os.getenv("FETCH_FIXTURE_MODE", setting.FETCH_FIXTURE_MODE)
+
+    @LazyProperty
+    def fetchFixtureDir(self):
+        return os.getenv("FETCH_FIXTURE_DIR", setting.FETCH_FIXTURE_DIR)
+
+    @LazyProperty
+    def breakerThreshold(self):
+        return int(os.getenv("BREAKER_THRESHOLD", setting.BREAKER_THRESHOLD))
+
+    @LazyProperty
+    def breakerCooldown(self):
+        return int(os.getenv("BREAKER_COOLDOWN", setting.BREAKER_COOLDOWN))
+
+    @LazyProperty
+    def breakerCooldownMax(self):
+        return int(os.getenv("BREAKER_COOLDOWN_MAX", setting.BREAKER_COOLDOWN_MAX))
+
+    @LazyProperty
+    def seenTtl(self):
+        return int(os.getenv("SEEN_TTL", setting.SEEN_TTL))
+
+    @LazyProperty
+    def seenCapacity(self):
+        return int(os.getenv("SEEN_CAPACITY", setting.SEEN_CAPACITY))
+
+    @LazyProperty
+    def sourceIntervalMax(self):
+        return int(os.getenv("SOURCE_INTERVAL_MAX", setting.SOURCE_INTERVAL_MAX))
+
     @LazyProperty
     def verifyUrl(self):
         return os.getenv("VERIFY_URL", setting.VERIFY_URL)
 
     @LazyProperty
     def verifyTimeout(self):
-        return os.getenv("VERIFY_TIMEOUT", setting.VERIFY_TIMEOUT)
+        return int(os.getenv("VERIFY_TIMEOUT", setting.VERIFY_TIMEOUT))
+
+    @LazyProperty
+    def preCheckTimeout(self):
+        return float(os.getenv("PRE_CHECK_TIMEOUT", setting.PRE_CHECK_TIMEOUT))
+
+    @LazyProperty
+    def preCheckConcurrency(self):
+        return int(os.getenv("PRE_CHECK_CONCURRENCY", setting.PRE_CHECK_CONCURRENCY))
+
+    @LazyProperty
+    def latencySmoothing(self):
+        return float(os.getenv("LATENCY_SMOOTHING", setting.LATENCY_SMOOTHING))
 
     @LazyProperty
     def proxyCheckCount(self):
-        return os.getenv("PROXY_CHECK_COUNT", setting.PROXY_CHECK_COUNT)
+        return int(os.getenv("PROXY_CHECK_COUNT", setting.PROXY_CHECK_COUNT))
 
     @LazyProperty
     def maxFailCount(self):
-        return os.getenv("MAX_FAIL_COUNT", setting.MAX_FAIL_COUNT)
+        return int(os.getenv("MAX_FAIL_COUNT", setting.MAX_FAIL_COUNT))
 
     @LazyProperty
     def maxFailRate(self):
-        return os.getenv("MAX_FAIL_RATE", setting.MAX_FAIL_RATE)
+        return float(os.getenv("MAX_FAIL_RATE", setting.MAX_FAIL_RATE))
 
     @LazyProperty
     def poolSizeMin(self):
-        return os.getenv("POOL_SIZE_MIN", setting.POOL_SIZE_MIN)
+        return int(os.getenv("POOL_SIZE_MIN", setting.POOL_SIZE_MIN))
+
+    @LazyProperty
+    def dbBatchSize(self):
+        return int(os.getenv("DB_BATCH_SIZE", setting.DB_BATCH_SIZE))
+
+    @LazyProperty
+    def dbFlushInterval(self):
+        return float(os.getenv("DB_FLUSH_INTERVAL", setting.DB_FLUSH_INTERVAL))
+
+    @LazyProperty
+    def checkMode(self):
+        return os.getenv("CHECK_MODE", setting.CHECK_MODE).lower()
+
+    @LazyProperty
+    def checkConcurrencyMin(self):
+        return int(os.getenv("CHECK_CONCURRENCY_MIN", setting.CHECK_CONCURRENCY_MIN))
+
+    @LazyProperty
+    def checkConcurrencyMax(self):
+        return int(os.getenv("CHECK_CONCURRENCY_MAX", setting.CHECK_CONCURRENCY_MAX))
+
+    @LazyProperty
+    def asyncExecutorWorkers(self):
+        return int(os.getenv("ASYNC_EXECUTOR_WORKERS", setting.ASYNC_EXECUTOR_WORKERS))
+
+    @LazyProperty
+    def checkProcesses(self):
+        return int(os.getenv("CHECK_PROCESSES", setting.CHECK_PROCESSES))
+
+    @LazyProperty
+    def checkIntervalMin(self):
+        return int(os.getenv("CHECK_INTERVAL_MIN", setting.CHECK_INTERVAL_MIN))
+
+    @LazyProperty
+    def checkIntervalMax(self):
+        return int(os.getenv("CHECK_INTERVAL_MAX", setting.CHECK_INTERVAL_MAX))
+
+    @LazyProperty
+    def quarantineTtlMin(self):
+        return int(os.getenv("QUARANTINE_TTL_MIN", setting.QUARANTINE_TTL_MIN))
+
+    @LazyProperty
+    def quarantineTtlMax(self):
+        return int(os.getenv("QUARANTINE_TTL_MAX", setting.QUARANTINE_TTL_MAX))
+
+    @LazyProperty
+    def anonymityUrl(self):
+        return os.getenv("ANONYMITY_URL", setting.ANONYMITY_URL)
+
+    @LazyProperty
+    def realIpUrl(self):
+        return os.getenv("REAL_IP_URL", setting.REAL_IP_URL)
+
+    @LazyProperty
+    def regionDb(self):
+        return os.getenv("REGION_DB", setting.REGION_DB)
+
+    @LazyProperty
+    def httpPoolSize(self):
+        return int(os.getenv("HTTP_POOL_SIZE", setting.HTTP_POOL_SIZE))
+
+    @LazyProperty
+    def dnsCacheTtl(self):
+        return int(os.getenv("DNS_CACHE_TTL", setting.DNS_CACHE_TTL))
 
     @LazyProperty
     def timezone(self):
@@ -25,12 +25,15 @@ class ProxyHandler(object):
         self.db = DbClient(self.conf.dbConn)
         self.db.changeTable(self.conf.tableName)
 
-    def get(self):
+    def get(self, max_latency=None, fastest=None, proxy_type=None):
         """
         return a useful proxy
+        :param max_latency: only proxy whose latency(ms) <= max_latency
+        :param fastest: choose from the fastest N proxies
+        :param proxy_type: only proxy of this anonymity type, see PROXY_TYPES
         :return:
         """
-        proxy = self.db.get()
+        proxy = self.db.get(max_latency=max_latency, fastest=fastest, proxy_type=proxy_type)
         if proxy:
             return Proxy.createFromJson(proxy)
         return None
@@ -60,6 +63,30 @@ class ProxyHandler(object):
         """
         return self.db.delete(proxy.proxy)
 
+    def putMany(self, proxies):
+        """
+        put proxies into use proxy in one batch
+        :param proxies: Proxy list
+        :return:
+        """
+        return self.db.putMany(proxies)
+
+    def deleteMany(self, proxies):
+        """
+        delete proxies in one batch
+        :param proxies: Proxy list
+        :return:
+        """
+        return self.db.deleteMany([proxy.proxy for proxy in proxies])
+
+    def existsMany(self, proxies):
+        """
+        check proxies exist in one batch
+        :param proxies: Proxy list
+        :return: bool list
+        """
+        return self.db.existsMany([proxy.proxy for proxy in proxies])
+
     def getAll(self):
         """
         get all proxy from pool as Proxy list
@@ -68,6 +95,20 @@ class ProxyHandler(object):
         proxies_dict = self.db.getAll()
         return [Proxy.createFromJson(value) for _, value in proxies_dict.items()]
 
+    def getDue(self):
+        """
+        get proxies due for check as Proxy list
+        :return:
+        """
+        return [Proxy.createFromJson(value) for value in self.db.getDue(self.conf.checkIntervalMin)]
+
+    def fillDue(self):
+        """
+        schedule proxies without next check time
+        :return:
+        """
+        return self.db.fillDue()
+
     def exists(self, proxy):
         """
         check proxy exists
@@ -76,6 +117,29 @@ class ProxyHandler(object):
         """
         return self.db.exists(proxy.proxy)
 
+    def updateStats(self, mapping):
+        """
+        update running stats
+        :param mapping: dict
+        :return:
+        """
+        return self.db.updateStats(mapping)
+
+    def incrStats(self, mapping):
+        """
+        increase running stats
+        :param mapping: dict
+        :return:
+        """
+        return self.db.incrStats(mapping)
+
+    def getStats(self):
+        """
+        return running stats
+        :return:
+        """
+        return self.db.getStats()
+
     def getCount(self):
         """
         return raw_proxy and use_proxy count
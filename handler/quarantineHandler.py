@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     quarantineHandler
+   Description :   近期校验失败代理的隔离区
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from time import time
+
+from db.dbClient import DbClient
+from handler.configHandler import ConfigHandler
+
+
+class QuarantineHandler(object):
+    """
+    Quarantine operator
+    校验失败的代理按 ip:port 记录失败次数和隔离截止时间, 隔离时长随失败次数指数增长
+    """
+
+    def __init__(self):
+        self.conf = ConfigHandler()
+        self.db = DbClient(self.conf.dbConn)
+        self.db.changeTable(self.conf.tableName)
+
+    def filter(self, proxies):
+        """
+        过滤掉仍在隔离期内的代理, 并累计命中/未命中数
+        :param proxies: proxy str list
+        :return: 不在隔离期内的proxy str list
+        """
+        if not proxies:
+            return []
+        now = time()
+        records = self.db.getQuarantine(proxies)
+        allowed = [proxy for proxy, record in zip(proxies, records) if record is None or record[1] <= now]
+        self.db.incrStats({"quarantine_hit": len(proxies) - len(allowed), "quarantine_miss": len(allowed)})
+        return allowed
+
+    def reject(self, proxies):
+        """
+        隔离校验失败的代理, 隔离时长 QUARANTINE_TTL_MIN * 2^(失败次数-1), 不超过QUARANTINE_TTL_MAX
+        :param proxies: proxy str list
+        :return:
+        """
+        if not proxies:
+            return
+        now = time()
+        mapping = dict()
+        for proxy, record in zip(proxies, self.db.getQuarantine(proxies)):
+            fails = record[0] + 1 if record else 1
+            ttl = min(self.conf.quarantineTtlMin * 2 ** min(fails - 1, 32), self.conf.quarantineTtlMax)
+            mapping[proxy] = (fails, int(now + ttl))
+        self.db.quarantineMany(mapping)
+
+    def release(self, proxies):
+        """
+        校验通过的代理移出隔离区
+        :param proxies: proxy str list
+        :return:
+        """
+        if proxies:
+            self.db.deleteQuarantine(proxies)
+
+    def purge(self):
+        """
+        清除隔离期结束超过QUARANTINE_TTL_MAX的记录, 此后再失败从最短隔离时长重新计算
+        :return: 清除的数量
+        """
+        return self.db.purgeQuarantine(time() - self.conf.quarantineTtlMax)
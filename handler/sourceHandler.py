@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     sourceHandler
+   Description :   代理源统计及采集频率
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+                   2026/10/18: 统计各代理源请求页面数
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from time import time
+
+from db.dbClient import DbClient
+from handler.configHandler import ConfigHandler
+
+# 各代理源累计计数: 请求页面数/采集数/去重后数/不在池中的数/校验通过入库数/被剔除数/被剔除代理的在池总时长(秒)
+SOURCE_COUNTERS = ("pages", "fetched", "unique", "new", "passed", "removed", "survival")
+
+
+class SourceHandler(object):
+    """
+    Source operator
+    各代理源的计数存放在运行统计 source_{name}_{field} 中, 多进程校验时也可直接累加;
+    每次采集后按本次新增的可用代理数调整该代理源的采集间隔:
+        有新增时恢复为采集函数声明的最短间隔, 无新增时间隔加倍, 不超过SOURCE_INTERVAL_MAX.
+    """
+
+    prefix = "source_"
+    # 采集任务执行时间有先后, 下次采集时间前schedule_slack秒内即视为到期
+    schedule_slack = 30
+
+    def __init__(self):
+        self.conf = ConfigHandler()
+        self.db = DbClient(self.conf.dbConn)
+        self.db.changeTable(self.conf.tableName)
+
+    def incr(self, source, mapping):
+        """
+        累加代理源计数
+        :param source: 代理源名称
+        :param mapping: {field: amount}
+        :return:
+        """
+        mapping = dict(("%s%s_%s" % (self.prefix, source, field), amount)
+                       for field, amount in mapping.items() if amount)
+        if source and mapping:
+            self.db.incrStats(mapping)
+
+    def incrMany(self, counts):
+        """
+        累加多个代理源的计数
+        :param counts: {source: {field: amount}}
+        :return:
+        """
+        mapping = dict()
+        for source, fields in counts.items():
+            for field, amount in fields.items():
+                if source and amount:
+                    mapping["%s%s_%s" % (self.prefix, source, field)] = amount
+        if mapping:
+            self.db.incrStats(mapping)
+
+    def getAll(self):
+        """
+        各代理源的统计信息, 附带平均存活时长 avg_survival(秒)
+        :return: {source: {field: value}}
+        """
+        sources = dict()
+        for key, value in self.db.getStats().items():
+            if not key.startswith(self.prefix):
+                continue
+            source, field = key[len(self.prefix):].rsplit("_", 1)
+            sources.setdefault(source, dict((counter, 0) for counter in SOURCE_COUNTERS))[field] = int(value)
+        for source in sources.values():
+            source["avg_survival"] = source["survival"] // source["removed"] if source["removed"] else None
+        return sources
+
+    def due(self, sources):
+        """
+        到达采集时间的代理源
+        :param sources: 代理源名称list
+        :return: 代理源名称list
+        """
+        now = time() + self.schedule_slack
+        stats = self.getAll()
+        return [source for source in sources if stats.get(source, dict()).get("next", 0) <= now]
+
+    def schedule(self, min_intervals, start):
+        """
+        按当前采集间隔排定下次采集时间, 在采集开始时调用, 避免采集结果校验期间被重复采集
+        :param min_intervals: {source: 最短采集间隔(秒)}
+        :param start: 本次采集开始时间
+        :return:
+        """
+        stats = self.getAll()
+        mapping = dict()
+        for source, min_interval in min_intervals.items():
+            interval = max(stats.get(source, dict()).get("interval") or 0, min_interval)
+            mapping["%s%s_next" % (self.prefix, source)] = int(start + interval)
+        if mapping:
+            self.db.updateStats(mapping)
+
+    def tune(self, passed, min_intervals, start):
+        """
+        按本次采集新增的可用代理数调整采集间隔, 下次采集时间从本次采集开始时间计算
+        :param passed: {source: 本次新增的可用代理数}
+        :param min_intervals: {source: 最短采集间隔(秒)}
+        :param start: 本次采集开始时间
+        :return: {source: 新的采集间隔}
+        """
+        stats = self.getAll()
+        mapping, intervals = dict(), dict()
+        for source, count in passed.items():
+            min_interval = min_intervals[source]
+            interval = max(stats.get(source, dict()).get("interval") or 0, min_interval)
+            if count > 0:
+                interval = min_interval
+            else:
+                interval = min(interval * 2, max(min_interval, self.conf.sourceIntervalMax))
+            intervals[source] = interval
+            mapping["%s%s_interval" % (self.prefix, source)] = interval
+            mapping["%s%s_next" % (self.prefix, source)] = int(start + interval)
+        if mapping:
+            self.db.updateStats(mapping)
+        return intervals
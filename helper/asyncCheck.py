@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     asyncCheck
+   Description :   基于asyncio的代理检测(需Python3)
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: async校验模式
+                   2026/10/18: 校验并发数自适应调整
+                   2026/10/18: 完整校验前进行TCP连接预检
+                   2026/10/18: 支持边采集边校验
+                   2026/10/18: 校验结果批量写入
+                   2026/10/18: validator结果缓存及计数
+                   2026/10/18: 支持IPv6代理
+                   2026/10/18: 共用的并发控制器名额由其他校验归还时定时重试获取
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import util.asyncValidators  # noqa 注册validator的asyncio实现
+from util.six import Empty
+from util.proxyCodec import splitProxy
+from helper.proxy import Proxy
+from util.validators import validators, recorder
+from handler.logHandler import LogHandler
+from handler.proxyHandler import ProxyHandler
+from handler.configHandler import ConfigHandler
+from helper.preCheck import preCheckConcurrency
+from helper.check import updateProxyStatus, reportConcurrency
+
+
+async def asyncProxyCheck(proxy_obj):
+    """
+    检测代理是否可用, 异步validator直接await, 同步validator在线程池中执行
+    :param proxy_obj: Proxy object
+    :return: Proxy object
+    """
+    loop = asyncio.get_event_loop()
+    status = True
+    metrics = dict()
+    for func in validators:
+        result = recorder.lookup(func, proxy_obj.proxy)
+        if result is recorder.MISS:
+            start = loop.time()
+            impl = getattr(func, "async_func", func)
+            if asyncio.iscoroutinefunction(impl):
+                result = await impl(proxy_obj.proxy)
+            else:
+                result = await loop.run_in_executor(None, impl, proxy_obj.proxy)
+            recorder.record(func, proxy_obj.proxy, result, loop.time() - start)
+        if not result:
+            status = False
+            break
+        if isinstance(result, dict):
+            metrics.update(result)
+    return updateProxyStatus(proxy_obj, status, metrics)
+
+
+async def tcpPreCheck(proxy_obj, timeout):
+    """
+    TCP连接预检
+    :param proxy_obj: Proxy object
+    :param timeout: 连接超时时间
+    :return: 连接成功返回True, 并记录connect_time
+    """
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    try:
+        host, port = splitProxy(proxy_obj.proxy)
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+        writer.close()
+    except Exception as e:
+        return False
+    proxy_obj.connect_time = int((loop.time() - start) * 1000)
+    return True
+
+
+class AsyncChecker(object):
+    """
+    单个event loop内并发检测代理是否可用:
+        预检阶段以较高并发做TCP连接, 失败的代理直接按校验失败处理;
+        通过预检的代理进入有界队列, 由controller控制并发进行完整校验.
+    """
+    name = "async"
+
+    def __init__(self, check_type, queue, writer, controller, producer=None):
+        self.type = check_type
+        self.writer = writer
+        self.controller = controller
+        self.producer = producer
+        self.log = LogHandler("checker")
+        self.proxy_handler = ProxyHandler()
+        self.queue = queue
+        self.conf = ConfigHandler()
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=self.conf.asyncExecutorWorkers)
+        loop.set_default_executor(executor)
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self.__run())
+        finally:
+            executor.shutdown(wait=True)
+            loop.close()
+
+    async def __run(self):
+        self.log.info("ProxyCheck - {}  : start".format(self.name))
+        check_queue = asyncio.Queue(maxsize=self.conf.checkConcurrencyMax * 2)
+        await asyncio.gather(self.__preCheckStage(check_queue), self.__checkStage(check_queue))
+        self.log.info("ProxyCheck - {}  : complete".format(self.name))
+
+    async def __preCheckStage(self, check_queue):
+        semaphore = asyncio.Semaphore(preCheckConcurrency())
+        tasks = set()
+        while True:
+            try:
+                proxy_json = self.queue.get(block=False)
+            except Empty:
+                if self.producer is not None and self.producer.is_alive():
+                    await asyncio.sleep(0.1)
+                    continue
+                # producer结束后不会再有新代理入队
+                if self.queue.empty():
+                    break
+                continue
+            await semaphore.acquire()
+            task = asyncio.ensure_future(self.__preCheck(proxy_json, semaphore, check_queue))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+        # 通知校验阶段预检已全部完成
+        await check_queue.put(None)
+
+    async def __preCheck(self, proxy_json, semaphore, check_queue):
+        try:
+            proxy = Proxy.createFromJson(proxy_json)
+            if await tcpPreCheck(proxy, self.conf.preCheckTimeout):
+                await check_queue.put(proxy)
+            else:
+                self.writer.add(updateProxyStatus(proxy, False), self.name)
+        except Exception as e:
+            self.log.error("ProxyCheck - {}  : {} error: {}".format(self.name, proxy_json, e))
+        finally:
+            semaphore.release()
+            self.queue.task_done()
+
+    async def __checkStage(self, check_queue):
+        slot_released = asyncio.Event()
+        tasks = set()
+        while True:
+            proxy = await check_queue.get()
+            if proxy is None:
+                break
+            while not self.controller.tryAcquire():
+                slot_released.clear()
+                # controller由进程内的各次校验共用, 其他校验归还的名额不会通知本事件, 定时重试
+                try:
+                    await asyncio.wait_for(slot_released.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    pass
+            task = asyncio.ensure_future(self.__check(proxy, slot_released))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def __check(self, proxy, slot_released):
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        released = False
+        try:
+            proxy = await asyncProxyCheck(proxy)
+            limit = self.controller.release(loop.time() - start, proxy.last_status)
+            released = True
+            slot_released.set()
+            self.writer.add(proxy, self.name)
+            if limit is not None:
+                # db操作为阻塞调用, 放到线程池中执行
+                await loop.run_in_executor(None, reportConcurrency, limit, self.proxy_handler, self.log)
+        except Exception as e:
+            self.log.error("ProxyCheck - {}  : {} error: {}".format(self.name, proxy.proxy, e))
+        finally:
+            if not released:
+                self.controller.release()
+                slot_released.set()
+
+
+def runAsyncChecker(tp, queue, writer, controller, producer=None):
+    """
+    run AsyncChecker
+    :param tp: raw/use
+    :param queue: Proxy Queue
+    :param writer: ResultWriter
+    :param controller: ConcurrencyController
+    :param producer: 仍在向queue放入代理的线程
+    :return:
+    """
+    AsyncChecker(tp, queue, writer, controller, producer).run()
@@ -8,19 +8,106 @@
 -------------------------------------------------
    Change Activity:
                    2019/08/06:
+                   2026/10/18: 新增async校验模式
+                   2026/10/18: 校验并发数自适应调整
+                   2026/10/18: 记录代理延迟
+                   2026/10/18: 完整校验前进行TCP连接预检
+                   2026/10/18: 支持边采集边校验
+                   2026/10/18: 校验结果批量写入
+                   2026/10/18: 按检测结果调整检测间隔
+                   2026/10/18: 校验失败的代理进入隔离区
+                   2026/10/18: 支持多进程校验
+                   2026/10/18: validator结果缓存及计数
+                   2026/10/18: 代理入库时标注地区
+                   2026/10/18: 按最近PROXY_CHECK_COUNT次检测的失败次数及失败率剔除代理
+                   2026/10/18: 统计各代理源的入库数及存活时长
+                   2026/10/18: 结果分步写入, 失败时只重试未完成的步骤, close失败时保留writer
+                   2026/10/18: 同一进程内的校验共用一个并发控制器
+                   2026/10/18: close失败的writer保留强引用, 直到写入成功
+                   2026/10/18: 校验异常时归还并发名额并标记任务完成
+                   2026/10/18: 只记录validator返回的已知检测数据
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
-from util.six import Empty
-from threading import Thread
+import atexit
+from weakref import WeakSet
+from collections import deque
+from multiprocessing import cpu_count
+from util.six import Empty, Queue, PY2, iscoroutinefunction
+from threading import Thread, Event, Lock, local
+from random import uniform
 from datetime import datetime
+from time import sleep, time
 
 from helper.proxy import Proxy
-from util.validators import validators
+from util.validators import validators, recorder
+from util.regionLookup import lookupRegion
+from util.concurrencyController import ConcurrencyController
 from handler.logHandler import LogHandler
 from handler.proxyHandler import ProxyHandler
+from handler.sourceHandler import SourceHandler
 from handler.configHandler import ConfigHandler
+from handler.quarantineHandler import QuarantineHandler
+
+
+_thread_local = local()
+
+# validator可写回Proxy的检测数据, 其余返回值忽略
+METRIC_ATTRS = ("ttfb", "type")
+
+
+def _runCoroutine(coro):
+    """
+    thread模式下运行异步validator, 每个线程复用自己的event loop
+    :param coro:
+    :return:
+    """
+    import asyncio
+    loop = getattr(_thread_local, "loop", None)
+    if loop is None:
+        loop = _thread_local.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+def updateProxyStatus(proxy_obj, status, metrics=None):
+    """
+    根据检测结果更新proxy属性
+    :param proxy_obj: Proxy object
+    :param status: 检测结果 True/False
+    :param metrics: validator返回的检测数据 dict
+    :return: Proxy object
+    """
+    conf = ConfigHandler()
+    proxy_obj.check_count += 1
+    proxy_obj.last_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # 稳定的代理逐渐拉长检测间隔, 失败的代理尽快复检
+    if status and proxy_obj.check_interval:
+        proxy_obj.check_interval = min(proxy_obj.check_interval * 2, conf.checkIntervalMax)
+    else:
+        proxy_obj.check_interval = conf.checkIntervalMin
+    # 加入随机抖动, 避免同一批入库的代理同时到期
+    proxy_obj.next_check = int(time() + proxy_obj.check_interval * uniform(0.9, 1.1))
+    proxy_obj.record(status, (metrics or dict()).get("ttfb") if status else None, conf.proxyCheckCount)
+    if status:
+        proxy_obj.last_status = 1
+        if proxy_obj.fail_count > 0:
+            proxy_obj.fail_count -= 1
+        metrics = metrics or dict()
+        for key in METRIC_ATTRS:
+            if key in metrics:
+                setattr(proxy_obj, key, metrics[key])
+        if metrics.get("ttfb") is not None:
+            # 以首字节耗时作为延迟样本, 指数平滑
+            if proxy_obj.latency is None:
+                proxy_obj.latency = metrics["ttfb"]
+            else:
+                alpha = conf.latencySmoothing
+                proxy_obj.latency = int(alpha * metrics["ttfb"] + (1 - alpha) * proxy_obj.latency)
+    else:
+        proxy_obj.last_status = 0
+        proxy_obj.fail_count += 1
+    return proxy_obj
 
 
 def proxyCheck(proxy_obj):
@@ -30,26 +117,264 @@ def proxyCheck(proxy_obj):
     :return: Proxy object, status
     """
 
+    metrics = dict()
+
     def __proxyCheck(proxy):
         for func in validators:
-            if not func(proxy):
+            result = recorder.lookup(func, proxy)
+            if result is recorder.MISS:
+                start = time()
+                if iscoroutinefunction(func):
+                    result = _runCoroutine(func(proxy))
+                else:
+                    result = func(proxy)
+                recorder.record(func, proxy, result, time() - start)
+            if not result:
                 return False
+            if isinstance(result, dict):
+                metrics.update(result)
         return True
 
-    if __proxyCheck(proxy_obj.proxy):
-        # 检测通过 更新proxy属性
-        proxy_obj.check_count += 1
-        proxy_obj.last_status = 1
-        proxy_obj.last_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        if proxy_obj.fail_count > 0:
-            proxy_obj.fail_count -= 1
-        return proxy_obj
-    else:
-        proxy_obj.check_count += 1
-        proxy_obj.last_status = 0
-        proxy_obj.last_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        proxy_obj.fail_count += 1
-        return proxy_obj
+    return updateProxyStatus(proxy_obj, __proxyCheck(proxy_obj.proxy), metrics)
+
+
+class ResultWriter(object):
+    """
+    校验结果批量写入:
+        raw代理通过后批量判断是否已存在, 不存在则标注地区后入库;
+        use代理通过则更新, 最近PROXY_CHECK_COUNT次检测中失败次数超过MAX_FAIL_COUNT或失败率超过MAX_FAIL_RATE则删除, 否则更新;
+        校验失败的raw代理和被删除的use代理进入隔离区, 校验通过的raw代理移出隔离区;
+        结果累计到DB_BATCH_SIZE条或每隔DB_FLUSH_INTERVAL秒, 由后台线程通过pipeline写入;
+        close()时写入剩余结果, 进程退出时也会写入未关闭writer中的结果;
+        写入时一并累加validator计数, 以及各代理源的入库数、被剔除数和存活时长到运行统计.
+    每批结果拆为依次执行的写入步骤, 某一步失败时保留该步及之后的步骤, 下次写入时从失败的步骤继续, 已完成的步骤不会重复执行;
+    close()写入失败时按close_backoff秒起翻倍间隔重试close_retries次, 仍失败则记录未写入的代理, writer记入_unflushed保留,
+    之后其他writer成功close时及进程退出时再次写入.
+    """
+
+    _writers = WeakSet()
+    # close后仍有未写入结果的writer, 后台线程已退出, 由此保留强引用
+    _unflushed = set()
+    _unflushed_lock = Lock()
+    close_retries = 3
+    close_backoff = 1
+
+    def __init__(self, check_type):
+        self.type = check_type
+        self.log = LogHandler("checker")
+        self.proxy_handler = ProxyHandler()
+        self.quarantine = QuarantineHandler()
+        self.source_handler = SourceHandler()
+        self.conf = ConfigHandler()
+        self._batch = list()
+        # 未完成的写入步骤: (名称, 函数, 参数)
+        self._steps = deque()
+        self.passed, self.failed = 0, 0
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._wakeup = Event()
+        self._closed = False
+        self._flusher = Thread(target=self.__run, name="result_writer")
+        self._flusher.daemon = True
+        self._flusher.start()
+        self._writers.add(self)
+
+    def add(self, proxy, name):
+        """
+        添加一条校验结果, 不直接访问数据库
+        :param proxy: 检测后的Proxy object
+        :param name: 日志中的检测器名称
+        :return:
+        """
+        with self._lock:
+            self._batch.append((proxy, name))
+            if proxy.last_status:
+                self.passed += 1
+            else:
+                self.failed += 1
+            full = len(self._batch) >= self.conf.dbBatchSize
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        写入已累计的校验结果, 先继续上次未完成的写入步骤
+        :return: 全部写入返回True
+        """
+        with self._flush_lock:
+            if not self.__runSteps():
+                return False
+            with self._lock:
+                batch, self._batch = self._batch, list()
+            if not batch:
+                return True
+            try:
+                self._steps.extend(self.__prepare(batch))
+            except Exception as e:
+                self.log.error("ProxyCheck - writer  : prepare {} results error: {}".format(len(batch), e))
+                with self._lock:
+                    self._batch = batch + self._batch
+                return False
+            return self.__runSteps()
+
+    def close(self):
+        """
+        停止后台写入线程并写入剩余结果, 失败时重试, 仍失败则保留writer, 进程退出时再次写入
+        :return: 全部写入返回True
+        """
+        self._closed = True
+        self._wakeup.set()
+        delay = self.close_backoff
+        for retry in range(self.close_retries + 1):
+            if self.flush():
+                self._writers.discard(self)
+                with self._unflushed_lock:
+                    self._unflushed.discard(self)
+                self.flushUnflushed()
+                return True
+            if retry < self.close_retries:
+                sleep(delay)
+                delay *= 2
+        with self._unflushed_lock:
+            self._unflushed.add(self)
+        self.log.error("ProxyCheck - writer  : close with unwritten results: {}".format(self.unwritten()))
+        return False
+
+    @classmethod
+    def flushUnflushed(cls):
+        """
+        再次写入此前close失败的writer中的结果, 不重试
+        :return:
+        """
+        with cls._unflushed_lock:
+            writers = list(cls._unflushed)
+        for writer in writers:
+            if writer.flush():
+                with cls._unflushed_lock:
+                    cls._unflushed.discard(writer)
+                writer.log.info("ProxyCheck - writer  : unwritten results flushed")
+
+    def unwritten(self):
+        """
+        未写入的结果
+        :return: {步骤名称: 代理list}, 未开始写入的结果记在batch下
+        """
+        with self._lock:
+            unwritten = {"batch": [proxy.proxy for proxy, _ in self._batch]} if self._batch else dict()
+        for name, _, arg in list(self._steps):
+            if isinstance(arg, list):
+                unwritten[name] = [getattr(item, "proxy", item) for item in arg]
+            else:
+                unwritten[name] = arg
+        return unwritten
+
+    def __runSteps(self):
+        while self._steps:
+            name, func, arg = self._steps[0]
+            try:
+                func(arg)
+            except Exception as e:
+                self.log.error("ProxyCheck - writer  : {} error: {}, {} steps left".format(name, e, len(self._steps)))
+                return False
+            self._steps.popleft()
+        return True
+
+    def __run(self):
+        while not self._closed:
+            self._wakeup.wait(self.conf.dbFlushInterval)
+            self._wakeup.clear()
+            self.flush()
+
+    def __prepare(self, batch):
+        """
+        整理一批结果的写入步骤, raw代理在此查询是否已存在
+        :param batch: [(proxy, name)]
+        :return: [(名称, 函数, 参数)]
+        """
+        put_list, delete_list = list(), list()
+        reject_list, release_list = list(), list()
+        source_stats = dict()
+        now = int(time())
+        if self.type == "raw":
+            passed = [_ for _ in batch if _[0].last_status]
+            exists = self.proxy_handler.existsMany([proxy for proxy, _ in passed]) if passed else []
+            for (proxy, name), exist in zip(passed, exists):
+                release_list.append(proxy.proxy)
+                if exist:
+                    self.log.info('ProxyCheck - {}  : {} exists'.format(name, proxy.proxy.ljust(23)))
+                else:
+                    self.log.info('ProxyCheck - {}  : {} success'.format(name, proxy.proxy.ljust(23)))
+                    if not proxy.region:
+                        proxy.region = lookupRegion(proxy.proxy)
+                    proxy.add_time = now
+                    put_list.append(proxy)
+                    stats = source_stats.setdefault(proxy.source, {"passed": 0})
+                    stats["passed"] += 1
+            for proxy, name in batch:
+                if not proxy.last_status:
+                    self.log.info('ProxyCheck - {}  : {} fail'.format(name, proxy.proxy.ljust(23)))
+                    reject_list.append(proxy.proxy)
+        else:
+            for proxy, name in batch:
+                if proxy.last_status:
+                    self.log.info('ProxyCheck - {}  : {} pass'.format(name, proxy.proxy.ljust(23)))
+                    put_list.append(proxy)
+                elif proxy.window_fail_count > self.conf.maxFailCount or proxy.fail_rate > self.conf.maxFailRate:
+                    self.log.info('ProxyCheck - {}  : {} fail, {}/{} delete'.format(name,
+                                                                                   proxy.proxy.ljust(23),
+                                                                                   proxy.window_fail_count,
+                                                                                   proxy.history_size))
+                    delete_list.append(proxy)
+                    reject_list.append(proxy.proxy)
+                    stats = source_stats.setdefault(proxy.source, {"removed": 0, "survival": 0})
+                    stats["removed"] += 1
+                    stats["survival"] += now - proxy.add_time if proxy.add_time else 0
+                else:
+                    self.log.info('ProxyCheck - {}  : {} fail, {}/{} keep'.format(name,
+                                                                                 proxy.proxy.ljust(23),
+                                                                                 proxy.window_fail_count,
+                                                                                 proxy.history_size))
+                    put_list.append(proxy)
+        steps = list()
+        if put_list:
+            steps.append(("put", self.proxy_handler.putMany, put_list))
+        if delete_list:
+            steps.append(("delete", self.proxy_handler.deleteMany, delete_list))
+        if reject_list:
+            steps.append(("reject", self.quarantine.reject, reject_list))
+        if release_list:
+            steps.append(("release", self.quarantine.release, release_list))
+        if source_stats:
+            steps.append(("source_stats", self.source_handler.incrMany, source_stats))
+        # 取出的validator计数随步骤保留, 写入失败时不会丢失
+        validator_stats = recorder.drain()
+        if validator_stats:
+            steps.append(("validator_stats", self.proxy_handler.incrStats, validator_stats))
+        return steps
+
+    @classmethod
+    def closeAll(cls):
+        with cls._unflushed_lock:
+            writers = set(cls._writers) | cls._unflushed
+        for writer in writers:
+            writer.close()
+
+
+atexit.register(ResultWriter.closeAll)
+
+
+def reportConcurrency(limit, proxy_handler, log):
+    """
+    记录校验并发数变化
+    :param limit: 新的并发数, None表示未变化
+    :param proxy_handler: ProxyHandler
+    :param log: LogHandler
+    :return:
+    """
+    if limit is None:
+        return
+    log.info("ProxyCheck - concurrency : {}".format(limit))
+    proxy_handler.updateStats({"check_concurrency": limit})
 
 
 class Checker(Thread):
@@ -57,65 +382,133 @@ class Checker(Thread):
     多线程检测代理是否可用
     """
 
-    def __init__(self, check_type, queue, thread_name):
+    def __init__(self, check_type, queue, thread_name, writer, controller=None, producer=None):
         Thread.__init__(self, name=thread_name)
         self.type = check_type
         self.log = LogHandler("checker")
         self.proxy_handler = ProxyHandler()
         self.queue = queue
         self.conf = ConfigHandler()
+        self.writer = writer
+        self.controller = controller
+        self.producer = producer
 
     def run(self):
         self.log.info("ProxyCheck - {}  : start".format(self.name))
         while True:
             try:
-                proxy_json = self.queue.get(block=False)
+                proxy_json = self.queue.get(block=self.__producerAlive(), timeout=1)
             except Empty:
+                # producer结束后不会再有新代理入队, 此时队列为空才可退出
+                if self.__producerAlive() or not self.queue.empty():
+                    continue
                 self.log.info("ProxyCheck - {}  : complete".format(self.name))
                 break
 
-            proxy = Proxy.createFromJson(proxy_json)
-            proxy = proxyCheck(proxy)
-            if self.type == "raw":
-                if proxy.last_status:
-                    if self.proxy_handler.exists(proxy):
-                        self.log.info('ProxyCheck - {}  : {} exists'.format(self.name, proxy.proxy.ljust(23)))
-                    else:
-                        self.log.info('ProxyCheck - {}  : {} success'.format(self.name, proxy.proxy.ljust(23)))
-                        self.proxy_handler.put(proxy)
-                else:
-                    self.log.info('ProxyCheck - {}  : {} fail'.format(self.name, proxy.proxy.ljust(23)))
-            else:
-                if proxy.last_status:
-                    self.log.info('ProxyCheck - {}  : {} pass'.format(self.name, proxy.proxy.ljust(23)))
-                    self.proxy_handler.put(proxy)
-                else:
-                    if proxy.fail_count > self.conf.maxFailCount:
-                        self.log.info('ProxyCheck - {}  : {} fail, count {} delete'.format(self.name,
-                                                                                           proxy.proxy.ljust(23),
-                                                                                           proxy.fail_count))
-                        self.proxy_handler.delete(proxy)
-                    else:
-                        self.log.info('ProxyCheck - {}  : {} fail, count {} keep'.format(self.name,
-                                                                                         proxy.proxy.ljust(23),
-                                                                                         proxy.fail_count))
-                        self.proxy_handler.put(proxy)
-            self.queue.task_done()
+            # 取到代理后再获取名额, 等待代理的空闲线程不占用共用controller的名额
+            if self.controller:
+                self.controller.acquire()
+            start = time()
+            released, limit = False, None
+            try:
+                proxy = proxyCheck(Proxy.createFromJson(proxy_json))
+                if self.controller:
+                    limit = self.controller.release(time() - start, proxy.last_status)
+                    released = True
+                self.writer.add(proxy, self.name)
+                reportConcurrency(limit, self.proxy_handler, self.log)
+            except Exception as e:
+                self.log.error("ProxyCheck - {}  : {} error: {}".format(self.name, proxy_json, e))
+            finally:
+                # 异常时同样归还名额, controller为进程内共用, 泄漏的名额会降低之后所有校验的并发数
+                if self.controller and not released:
+                    self.controller.release()
+                self.queue.task_done()
 
+    def __producerAlive(self):
+        return self.producer is not None and self.producer.is_alive()
 
-def runChecker(tp, queue):
+
+def runChecker(tp, queue, producer=None):
     """
     run Checker
     :param tp: raw/use
     :param queue: Proxy Queue
+    :param producer: 仍在向queue放入代理的线程, 为None时queue已包含全部代理
     :return:
     """
-    thread_list = list()
-    for index in range(20):
-        thread_list.append(Checker(tp, queue, "thread_%s" % str(index).zfill(2)))
+    processes = ConfigHandler().checkProcesses
+    if processes <= 0:
+        processes = cpu_count()
+    if processes > 1:
+        from helper.processCheck import runShardedChecker
+        return runShardedChecker(tp, queue, producer, processes)
+    return runLocalChecker(tp, queue, producer)
 
-    for thread in thread_list:
-        thread.start()
+
+def runLocalChecker(tp, queue, producer=None):
+    """
+    在当前进程内校验
+    :param tp: raw/use
+    :param queue: Proxy Queue
+    :param producer: 仍在向queue放入代理的线程, 为None时queue已包含全部代理
+    :return: (通过数, 失败数)
+    """
+    writer = ResultWriter(tp)
+    try:
+        __runChecker(tp, queue, producer, writer)
+    finally:
+        writer.close()
+    return writer.passed, writer.failed
+
+
+_controller = None
+_controller_lock = Lock()
+
+
+def sharedController():
+    """
+    进程内共用的并发控制器, 同时进行的多次校验(如重叠的采集周期与检测周期)合计并发数不超过CHECK_CONCURRENCY_MAX
+    :return: ConcurrencyController
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            conf = ConfigHandler()
+            _controller = ConcurrencyController(conf.checkConcurrencyMin, conf.checkConcurrencyMax, conf.verifyTimeout)
+        return _controller
+
+
+def __runChecker(tp, queue, producer, writer):
+    conf = ConfigHandler()
+    controller = sharedController()
+    if conf.checkMode == "async":
+        if PY2:
+            LogHandler("checker").warning("ProxyCheck - async mode requires Python3, fallback to thread mode")
+        else:
+            from helper.asyncCheck import runAsyncChecker
+            return runAsyncChecker(tp, queue, writer, controller, producer)
+
+    from helper.preCheck import TcpPreChecker, selectors
+    if selectors is None:
+        pre_checker, check_queue = producer, queue
+    else:
+        # 预检通过的代理进入check_queue, 队列有界以免预检远快于完整校验时积压
+        check_queue = Queue(maxsize=conf.checkConcurrencyMax * 2)
+        pre_checker = TcpPreChecker(tp, queue, check_queue, writer, producer)
+        pre_checker.start()
+
+    # 线程数随并发数增长补充, 并发数下降时多余线程阻塞在controller.acquire
+    thread_list = list()
+    while (pre_checker and pre_checker.is_alive()) or not check_queue.empty():
+        while len(thread_list) < controller.limit:
+            thread = Checker(tp, check_queue, "thread_%s" % str(len(thread_list)).zfill(2), writer,
+                             controller, pre_checker)
+            thread.start()
+            thread_list.append(thread)
+        sleep(1)
 
     for thread in thread_list:
         thread.join()
+    if pre_checker and pre_checker is not producer:
+        pre_checker.join()
@@ -8,14 +8,80 @@
 -------------------------------------------------
    Change Activity:
                    2019/08/06:
+                   2026/10/18: 新增FetchProducer, 边采集边校验
+                   2026/10/18: 跳过隔离期内的代理
+                   2026/10/18: 各采集函数并行执行, 单个采集函数限时
+                   2026/10/18: 代理源页面均未变化时记为无新数据
+                   2026/10/18: 记录代理源熔断状态
+                   2026/10/18: 代理标注来源, 统计各代理源产出并按产出调整采集频率
+                   2026/10/18: 采集函数从fetcherRegistry加载, 按各自声明的间隔、超时及并发数执行
+                   2026/10/18: 跨周期的已见代理集合, 校验前跳过已在池中及近期已校验的代理
+                   2026/10/18: 采集到的代理解析为紧凑表示后去重, 写库前再转为字符串
+                   2026/10/18: 统计各代理源请求页面数
+                   2026/10/18: 每个采集周期只读取一次采集函数配置
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
+from time import time
+from threading import Thread, Lock
+
+from util.six import Queue, Empty
+from util.bloomFilter import RotatingBloomFilter
+from util.proxyCodec import packProxy, unpackProxy
+from helper.proxy import Proxy
 from handler.logHandler import LogHandler
 from handler.proxyHandler import ProxyHandler
-from fetcher.proxyFetcher import ProxyFetcher
+from util.webRequest import resetPageStats, pageStats
+from util.circuitBreaker import breakers, CLOSED
+from fetcher.fetcherRegistry import loadFetcher, refreshFetchers
+from handler.sourceHandler import SourceHandler
 from handler.configHandler import ConfigHandler
+from handler.quarantineHandler import QuarantineHandler
+
+
+class FetchWorker(Thread):
+    """
+    在单独线程中执行一个采集函数, 采集到的代理放入queue, 结束时放入 (name, None);
+    超过采集函数声明的timeout或被cancel后不再继续采集, 已采集到的代理保留;
+    采集函数的执行名额需在启动前获取, 线程结束时归还
+    """
+
+    def __init__(self, name, spec, queue):
+        Thread.__init__(self, name="fetch_%s" % name)
+        self.daemon = True
+        self.fetch_name = name
+        self.spec = spec
+        self.queue = queue
+        self.deadline = time() + spec.timeout
+        self.cancelled = False
+        self.count = 0
+        self.pages = 0
+        self.unchanged = 0
+        self.error = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def no_new_data(self):
+        """ 请求的页面均与上次相同 """
+        return self.pages > 0 and self.unchanged == self.pages
+
+    def run(self):
+        resetPageStats()
+        try:
+            for proxy in self.spec():
+                if self.cancelled or time() > self.deadline:
+                    break
+                self.queue.put((self.fetch_name, proxy))
+                self.count += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.pages, self.unchanged = pageStats()
+            self.spec.release()
+            self.queue.put((self.fetch_name, None))
 
 
 class Fetcher(object):
@@ -25,38 +91,244 @@ class Fetcher(object):
         self.log = LogHandler(self.name)
         self.conf = ConfigHandler()
         self.proxy_handler = ProxyHandler()
+        # 本次实际执行的采集函数
+        self.started = list()
 
     def fetch(self):
         """
         fetch proxy into db with proxyFetcher
         :return:
         """
+        return set(unpackProxy(packed) for _, packed in self.iterFetch())
+
+    def iterFetch(self, fetchers=None, specs=None):
+        """
+        并行执行各采集函数, 逐个返回采集到的代理及其来源, 代理为packProxy的紧凑表示, 格式不正确及已返回过的代理不再返回;
+        单个采集函数超过其timeout未结束时放弃, 只保留已采集到的代理;
+        采集函数正在执行的次数已达其concurrency时跳过;
+        结束时累加各代理源的请求页面数、采集数及去重后数
+        :param fetchers: 采集函数名称list, 默认为PROXY_FETCHER
+        :param specs: 本周期已加载的采集函数 {name: FetcherSpec}, 默认由refreshFetchers加载
+        :return: (fetch_name, packed proxy)
+        """
         proxy_set = set()
+        queue = Queue()
+        workers = dict()
+        counts = dict()
         self.log.info("ProxyFetch : start")
-        for fetch_name in self.conf.fetchers:
-            self.log.info("ProxyFetch - {func}: start".format(func=fetch_name))
-            fetcher = getattr(ProxyFetcher, fetch_name, None)
-            if not fetcher:
-                self.log.error("ProxyFetch - {func}: class method not exists!")
+        if specs is None:
+            loaded = refreshFetchers()
+            specs = dict(loaded)
+            if fetchers is None:
+                fetchers = [name for name, _ in loaded]
+        for fetch_name in fetchers if fetchers is not None else list(specs):
+            spec = specs[fetch_name] if fetch_name in specs else loadFetcher(fetch_name)
+            if spec is None:
+                self.log.error("ProxyFetch - {func}: fetcher not exists!".format(func=fetch_name))
                 continue
-            if not callable(fetcher):
-                self.log.error("ProxyFetch - {func}: must be class method")
+            if not spec.acquire():
+                self.log.warning("ProxyFetch - {func}: {count} running, skip".format(func=fetch_name,
+                                                                                   count=spec.concurrency))
                 continue
+            self.log.info("ProxyFetch - {func}: start".format(func=fetch_name))
+            workers[fetch_name] = FetchWorker(fetch_name, spec, queue)
+            workers[fetch_name].start()
+            self.started.append(fetch_name)
+            counts[fetch_name] = {"pages": 0, "fetched": 0, "unique": 0}
 
+        while workers:
+            timeout = min(worker.deadline for worker in workers.values()) - time()
             try:
-                for proxy in fetcher():
-                    if proxy in proxy_set:
-                        self.log.info('ProxyFetch - %s: %s exist' % (fetch_name, proxy.ljust(23)))
-                        continue
-                    else:
-                        self.log.info('ProxyFetch - %s: %s success' % (fetch_name, proxy.ljust(23)))
-                    if proxy.strip():
-                        proxy_set.add(proxy)
-            except Exception as e:
-                self.log.error("ProxyFetch - {func}: error".format(func=fetch_name))
-                self.log.error(str(e))
+                fetch_name, proxy = queue.get(timeout=max(timeout, 0.01))
+            except Empty:
+                for fetch_name, worker in list(workers.items()):
+                    if worker.deadline <= time():
+                        worker.cancel()
+                        del workers[fetch_name]
+                        counts[fetch_name]["fetched"] = worker.count
+                        self.log.error("ProxyFetch - {func}: timeout, keep {count} proxies".format(
+                            func=fetch_name, count=worker.count))
+                continue
+            # 已超时放弃的采集函数
+            if fetch_name not in workers:
+                continue
+            if proxy is None:
+                worker = workers.pop(fetch_name)
+                counts[fetch_name]["fetched"] = worker.count
+                counts[fetch_name]["pages"] = worker.pages
+                if worker.error is not None:
+                    self.log.error("ProxyFetch - {func}: error".format(func=fetch_name))
+                    self.log.error(str(worker.error))
+                elif worker.no_new_data:
+                    self.log.info("ProxyFetch - {func}: no new data, {pages} pages not modified".format(
+                        func=fetch_name, pages=worker.pages))
+                else:
+                    self.log.info("ProxyFetch - {func}: complete, {count} proxies".format(func=fetch_name,
+                                                                                         count=worker.count))
+                continue
+            packed = packProxy(proxy.strip())
+            if packed is None:
+                self.log.info('ProxyFetch - %s: %s invalid' % (fetch_name, proxy.ljust(23)))
+                continue
+            if packed in proxy_set:
+                self.log.info('ProxyFetch - %s: %s exist' % (fetch_name, proxy.ljust(23)))
+                continue
+            self.log.info('ProxyFetch - %s: %s success' % (fetch_name, proxy.ljust(23)))
+            proxy_set.add(packed)
+            counts[fetch_name]["unique"] += 1
+            yield fetch_name, packed
+        SourceHandler().incrMany(counts)
+        self.__reportBreakers()
         self.log.info("ProxyFetch - all complete!")
-        return proxy_set
+
+    def __reportBreakers(self):
+        """
+        熔断器状态记录到运行统计 breaker_{host} 中
+        :return:
+        """
+        status = breakers.status()
+        for host, breaker in status.items():
+            if breaker["state"] != CLOSED:
+                self.log.warning("ProxyFetch - {host}: circuit {state} until {until}, {failures} failures".format(
+                    host=host, state=breaker["state"], until=breaker["open_until"], failures=breaker["failures"]))
+        if status:
+            self.proxy_handler.updateStats(dict(("breaker_%s" % host, breaker["state"])
+                                                for host, breaker in status.items()))
+
+
+_seen = None
+_seen_lock = Lock()
+
+
+def _seedPooled(bloom):
+    for proxy in ProxyHandler().getAll():
+        bloom.add(packProxy(proxy.proxy) or proxy.proxy)
+
+
+def seenProxies():
+    """
+    跨采集周期的已见代理集合, 元素为packProxy的紧凑表示: 放入过校验队列的代理在SEEN_TTL~2*SEEN_TTL秒内可查到,
+    每次轮换后重新加入池中的全部代理, 因此不在集合中的代理一定不在池中
+    :return: RotatingBloomFilter
+    """
+    global _seen
+    if _seen is None:
+        with _seen_lock:
+            if _seen is None:
+                conf = ConfigHandler()
+                _seen = RotatingBloomFilter(conf.seenCapacity, conf.seenTtl, on_rotate=_seedPooled)
+    return _seen
+
+
+class FetchProducer(Thread):
+    """
+    采集线程, 采集到的代理标注来源后即时放入校验队列, 队列满时阻塞等待校验消费;
+    每攒够batch_size个代理按已见代理集合分为三类, 只有新代理进行校验:
+        new: 不在已见代理集合中, 跳过仍在隔离期内的代理后放入校验队列, 计入代理源的新代理数;
+        pooled: 在集合中且已在池中, 由use代理的定期检测负责, 不再校验;
+        recent: 在集合中但不在池中, 近期已校验过(未通过的已进入隔离区), 不再校验;
+    默认只采集已到采集时间的代理源, 开始时即按当前采集间隔排定其下次采集时间,
+    校验结束后调用tune按各代理源新增的可用代理数调整其采集间隔
+    """
+
+    batch_size = 50
+
+    def __init__(self, queue, force=False):
+        """
+        :param queue: 校验队列
+        :param force: 为True时忽略采集间隔, 采集全部代理源
+        """
+        Thread.__init__(self, name="fetch_producer")
+        self.queue = queue
+        self.force = force
+        self.count = 0
+        self.sources = list()
+        self.specs = dict()
+        self.log = LogHandler("fetcher")
+        self.conf = ConfigHandler()
+        self.proxy_handler = ProxyHandler()
+        self.quarantine = QuarantineHandler()
+        self.source_handler = SourceHandler()
+        self._start = time()
+        self._passed = dict()
+
+    def run(self):
+        self._start = time()
+        self.quarantine.purge()
+        stats = self.source_handler.getAll()
+        self._passed = dict((source, stat["passed"]) for source, stat in stats.items())
+        # 本周期只读取一次配置
+        loaded = refreshFetchers()
+        self.specs = dict(loaded)
+        intervals = self.__intervals([name for name, _ in loaded])
+        sources = list(intervals) if self.force else self.source_handler.due(list(intervals))
+        if not sources:
+            return
+        self.source_handler.schedule(dict((source, intervals[source]) for source in sources), self._start)
+        fetcher = Fetcher()
+        batch, counts = list(), {"new": 0, "pooled": 0, "recent": 0, "quarantined": 0}
+        for source, packed in fetcher.iterFetch(sources, self.specs):
+            batch.append((source, packed))
+            if len(batch) >= self.batch_size:
+                self.__put(batch, counts)
+                batch = list()
+        self.__put(batch, counts)
+        self.sources = fetcher.started
+        self.log.info("ProxyFetch - candidates: {new} new, skip {pooled} pooled, {recent} recently seen, "
+                      "{quarantined} quarantined".format(**counts))
+        self.proxy_handler.incrStats(dict(("candidate_%s" % key, value) for key, value in counts.items()))
+
+    def __intervals(self, names):
+        intervals = dict()
+        for name in names:
+            spec = self.specs.get(name)
+            if spec is None:
+                self.log.error("ProxyFetch - {func}: fetcher not exists!".format(func=name))
+            else:
+                intervals[name] = spec.interval
+        return intervals
+
+    def __put(self, batch, counts):
+        if not batch:
+            return
+        seen = seenProxies()
+        fresh, recent = list(), list()
+        for source, packed in batch:
+            (recent if packed in seen else fresh).append((source, packed))
+        # 访问数据库时转为字符串
+        if recent:
+            exists = self.proxy_handler.existsMany([Proxy(unpackProxy(packed)) for _, packed in recent])
+            pooled = sum(1 for exist in exists if exist)
+            counts["pooled"] += pooled
+            counts["recent"] += len(recent) - pooled
+        fresh = [(source, packed, unpackProxy(packed)) for source, packed in fresh]
+        allowed = set(self.quarantine.filter([proxy for _, _, proxy in fresh]))
+        counts["quarantined"] += len(fresh) - len(allowed)
+        source_counts = dict()
+        for source, packed, proxy in fresh:
+            if proxy not in allowed:
+                continue
+            seen.add(packed)
+            source_counts.setdefault(source, {"new": 0})["new"] += 1
+            self.queue.put(Proxy(proxy, source=source).to_json)
+            self.count += 1
+            counts["new"] += 1
+        self.source_handler.incrMany(source_counts)
+
+    def tune(self):
+        """
+        校验结束后, 按本次采集各代理源新增的可用代理数调整采集间隔, 最短为采集函数声明的interval
+        :return:
+        """
+        if not self.sources:
+            return
+        stats = self.source_handler.getAll()
+        passed = dict((source, stats.get(source, dict()).get("passed", 0) - self._passed.get(source, 0))
+                      for source in self.sources)
+        intervals = self.source_handler.tune(passed, self.__intervals(self.sources), self._start)
+        for source in self.sources:
+            self.log.info("ProxyFetch - {}: {} new valid proxies, next fetch in {}s".format(
+                source, passed[source], intervals[source]))
 
 
 def runFetcher():
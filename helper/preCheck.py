@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     preCheck
+   Description :   TCP连接预检, 在完整校验前快速剔除未监听端口的代理
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: TCP连接预检
+                   2026/10/18: 支持IPv6代理
+                   2026/10/18: out_queue已满时暂存本地, 不阻塞事件循环
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import errno
+import socket
+from time import time
+from threading import Thread
+
+from collections import deque
+
+from util.six import Empty, Full
+from util.proxyCodec import splitProxy
+from helper.proxy import Proxy
+from handler.logHandler import LogHandler
+from handler.configHandler import ConfigHandler
+from util.concurrencyController import fdLimit
+from helper.check import updateProxyStatus
+
+try:
+    import selectors
+except ImportError:  # PY2
+    selectors = None
+
+_CONNECTING = (0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))
+
+
+def preCheckConcurrency():
+    """
+    预检并发数, 不超过文件描述符上限的1/4
+    :return:
+    """
+    concurrency = ConfigHandler().preCheckConcurrency
+    limit = fdLimit()
+    return min(concurrency, max(10, limit // 4)) if limit else concurrency
+
+
+class TcpPreChecker(Thread):
+    """
+    单线程非阻塞connect, 同时进行大量TCP连接预检:
+        连接成功的代理记录connect_time后放入out_queue等待完整校验;
+        连接失败或超时的代理直接按校验失败处理.
+    out_queue已满时连接成功的代理暂存在本地backlog中, 积压期间不再发起新连接.
+    """
+
+    def __init__(self, check_type, in_queue, out_queue, writer, producer=None):
+        Thread.__init__(self, name="pre_check")
+        self.type = check_type
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.writer = writer
+        self.producer = producer
+        self.log = LogHandler("checker")
+        self.timeout = ConfigHandler().preCheckTimeout
+        self.concurrency = preCheckConcurrency()
+
+    def run(self):
+        self.log.info("ProxyCheck - {}  : start, concurrency {}".format(self.name, self.concurrency))
+        selector = selectors.DefaultSelector()
+        backlog = deque()
+        exhausted = False
+        passed, failed = 0, 0
+        while not exhausted or selector.get_map() or backlog:
+            # 没有进行中的连接时才允许短暂等待out_queue空位, 否则不阻塞
+            self.__drain(backlog, wait=not selector.get_map())
+            # 补充连接直到达到并发上限, backlog积压时暂停
+            while not backlog and not exhausted and len(selector.get_map()) < self.concurrency:
+                try:
+                    # 没有进行中的连接时阻塞等待producer
+                    proxy_json = self.in_queue.get(block=self.__producerAlive() and not selector.get_map(),
+                                                   timeout=0.1)
+                except Empty:
+                    exhausted = not self.__producerAlive() and self.in_queue.empty()
+                    break
+                proxy = Proxy.createFromJson(proxy_json)
+                sock = self.__connect(proxy.proxy)
+                if sock is None:
+                    failed += 1
+                    self.__fail(proxy)
+                else:
+                    selector.register(sock, selectors.EVENT_WRITE, (proxy, time()))
+                self.in_queue.task_done()
+
+            if not selector.get_map():
+                continue
+            events = selector.select(timeout=0.1)
+            now = time()
+            done = dict((key.fd, (key, key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0))
+                        for key, _ in events)
+            for key in list(selector.get_map().values()):
+                if key.fd not in done and now - key.data[1] > self.timeout:
+                    done[key.fd] = (key, False)
+            for key, connected in done.values():
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+                proxy, start = key.data
+                if connected:
+                    passed += 1
+                    proxy.connect_time = int((now - start) * 1000)
+                    backlog.append(proxy.to_json)
+                else:
+                    failed += 1
+                    self.__fail(proxy)
+        selector.close()
+        self.log.info("ProxyCheck - {}  : complete, pass {} fail {}".format(self.name, passed, failed))
+
+    def __drain(self, backlog, wait=False):
+        """
+        将backlog中的代理转入out_queue, 队列已满时停止
+        :param backlog: 本地暂存队列
+        :param wait: 是否允许为首个代理等待0.1秒
+        :return:
+        """
+        while backlog:
+            try:
+                if wait:
+                    self.out_queue.put(backlog[0], timeout=0.1)
+                    wait = False
+                else:
+                    self.out_queue.put_nowait(backlog[0])
+            except Full:
+                return
+            backlog.popleft()
+
+    def __producerAlive(self):
+        return self.producer is not None and self.producer.is_alive()
+
+    def __fail(self, proxy):
+        self.writer.add(updateProxyStatus(proxy, False), self.name)
+
+    @staticmethod
+    def __connect(proxy):
+        try:
+            host, port = splitProxy(proxy)
+            sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+        except (ValueError, socket.error):
+            return None
+        try:
+            code = sock.connect_ex((host, port))
+        except (ValueError, OverflowError, socket.error):
+            code = -1
+        if code not in _CONNECTING:
+            sock.close()
+            return None
+        return sock
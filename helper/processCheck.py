@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     processCheck
+   Description :   多进程分片校验
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 多进程分片校验
+                   2026/10/18: 子进程全部退出后继续取出并丢弃剩余代理
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import multiprocessing
+from threading import Thread
+
+from util.six import Empty, Queue, Full
+from handler.logHandler import LogHandler
+from helper.preCheck import preCheckConcurrency
+from helper.check import runLocalChecker
+
+try:
+    # 调度线程运行时fork可能复制到被其他线程持有的锁, 子进程使用spawn启动
+    _mp = multiprocessing.get_context("spawn")
+except AttributeError:  # PY2
+    _mp = multiprocessing
+
+
+class ShardFeeder(Thread):
+    """
+    子进程内的转发线程, 将进程间队列中的代理转入本进程的校验队列, 收到None时结束
+    """
+
+    def __init__(self, shard_queue, queue):
+        Thread.__init__(self, name="shard_feeder")
+        self.shard_queue = shard_queue
+        self.queue = queue
+
+    def run(self):
+        while True:
+            proxy_json = self.shard_queue.get()
+            if proxy_json is None:
+                break
+            self.queue.put(proxy_json)
+
+
+def _checkWorker(tp, shard_queue, result_queue, index):
+    """
+    子进程入口, 以单进程方式校验分配到的代理, 结束时返回校验结果数
+    :param tp: raw/use
+    :param shard_queue: 进程间代理队列
+    :param result_queue: 进程间结果队列
+    :param index: 进程序号
+    :return:
+    """
+    queue = Queue(maxsize=preCheckConcurrency() * 2)
+    feeder = ShardFeeder(shard_queue, queue)
+    feeder.start()
+    try:
+        passed, failed = runLocalChecker(tp, queue, feeder)
+    finally:
+        feeder.join()
+    result_queue.put((index, passed, failed))
+
+
+def runShardedChecker(tp, queue, producer, processes):
+    """
+    将queue中的代理分发到多个子进程校验
+    :param tp: raw/use
+    :param queue: Proxy Queue
+    :param producer: 仍在向queue放入代理的线程, 为None时queue已包含全部代理
+    :param processes: 子进程数
+    :return: (通过数, 失败数)
+    """
+    log = LogHandler("checker")
+    shard_queue = _mp.Queue(maxsize=preCheckConcurrency() * 2)
+    result_queue = _mp.Queue()
+    workers = list()
+    for index in range(processes):
+        worker = _mp.Process(target=_checkWorker, args=(tp, shard_queue, result_queue, index),
+                             name="checker_%s" % str(index).zfill(2))
+        worker.daemon = True
+        worker.start()
+        workers.append(worker)
+    log.info("ProxyCheck - shard  : start {} processes".format(processes))
+
+    dispatched = dropped = 0
+    while (producer is not None and producer.is_alive()) or not queue.empty():
+        try:
+            proxy_json = queue.get(timeout=1)
+        except Empty:
+            continue
+        # 子进程全部退出后继续取出并丢弃, 避免producer在有界队列上阻塞
+        if dropped or not __dispatch(shard_queue, proxy_json, workers):
+            if not dropped:
+                log.error("ProxyCheck - shard  : all processes exited, drop remaining proxies")
+            dropped += 1
+        else:
+            dispatched += 1
+        queue.task_done()
+    for _ in workers:
+        __dispatch(shard_queue, None, workers)
+
+    results = list()
+    while len(results) < len(workers):
+        try:
+            results.append(result_queue.get(timeout=1))
+        except Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+    for worker in workers:
+        worker.join()
+    # 子进程异常退出时队列中可能残留代理, 不再等待写入以免阻塞退出
+    shard_queue.cancel_join_thread()
+    # 子进程退出前写入的结果
+    while len(results) < len(workers):
+        try:
+            results.append(result_queue.get(timeout=0.1))
+        except Empty:
+            break
+
+    passed = sum(_[1] for _ in results)
+    failed = sum(_[2] for _ in results)
+    log.info("ProxyCheck - shard  : complete, dispatch {} drop {} pass {} fail {}, {}/{} processes reported".format(
+        dispatched, dropped, passed, failed, len(results), len(workers)))
+    return passed, failed
+
+
+def __dispatch(shard_queue, item, workers):
+    """
+    放入进程间队列, 队列满时等待, 子进程全部退出时放弃
+    :return: True/False
+    """
+    while True:
+        try:
+            shard_queue.put(item, timeout=1)
+            return True
+        except Full:
+            if not any(worker.is_alive() for worker in workers):
+                return False
@@ -8,17 +8,27 @@
 -------------------------------------------------
    Change Activity:
                    2019/7/11: 代理对象类型封装
+                   2026/10/18: 新增延迟属性
+                   2026/10/18: 新增检测间隔属性
+                   2026/10/18: 新增匿名度类型
+                   2026/10/18: 新增最近检测结果窗口及健康度
+                   2026/10/18: 新增入池时间
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
 import json
 
+# 代理匿名度: 透明/匿名/高匿
+PROXY_TYPES = ("transparent", "anonymous", "elite")
+
 
 class Proxy(object):
 
     def __init__(self, proxy, fail_count=0, region="", proxy_type="",
-                 source="", check_count=0, last_status="", last_time=""):
+                 source="", check_count=0, last_status="", last_time="",
+                 latency=None, connect_time=None, ttfb=None, check_interval=None, next_check=None,
+                 history=0, history_size=0, latency_history=None, add_time=None):
         self._proxy = proxy
         self._fail_count = fail_count
         self._region = region
@@ -27,6 +37,15 @@ class Proxy(object):
         self._check_count = check_count
         self._last_status = last_status
         self._last_time = last_time
+        self._latency = latency
+        self._connect_time = connect_time
+        self._ttfb = ttfb
+        self._check_interval = check_interval
+        self._next_check = next_check
+        self._history = history
+        self._history_size = history_size
+        self._latency_history = latency_history or []
+        self._add_time = add_time
 
     @classmethod
     def createFromJson(cls, proxy_json):
@@ -43,7 +62,16 @@ class Proxy(object):
                    source=proxy_dict.get("source", ""),
                    check_count=proxy_dict.get("check_count", 0),
                    last_status=proxy_dict.get("last_status", ""),
-                   last_time=proxy_dict.get("last_time", "")
+                   last_time=proxy_dict.get("last_time", ""),
+                   latency=proxy_dict.get("latency"),
+                   connect_time=proxy_dict.get("connect_time"),
+                   ttfb=proxy_dict.get("ttfb"),
+                   check_interval=proxy_dict.get("check_interval"),
+                   next_check=proxy_dict.get("next_check"),
+                   history=proxy_dict.get("history", 0),
+                   history_size=proxy_dict.get("history_size", 0),
+                   latency_history=proxy_dict.get("latency_history"),
+                   add_time=proxy_dict.get("add_time")
                    )
 
     @property
@@ -63,7 +91,7 @@ class Proxy(object):
 
     @property
     def type(self):
-        """ 透明/匿名/高匿 """
+        """ 透明/匿名/高匿: transparent/anonymous/elite, 见PROXY_TYPES """
         return self._type
 
     @property
@@ -86,6 +114,85 @@ class Proxy(object):
         """ 最后一次检测时间 """
         return self._last_time
 
+    @property
+    def latency(self):
+        """ 平滑后的延迟(ms) """
+        return self._latency
+
+    @property
+    def connect_time(self):
+        """ 最后一次检测的连接耗时(ms) """
+        return self._connect_time
+
+    @property
+    def ttfb(self):
+        """ 最后一次检测的首字节耗时(ms) """
+        return self._ttfb
+
+    @property
+    def check_interval(self):
+        """ 检测间隔(秒), 稳定的代理间隔逐渐变长 """
+        return self._check_interval
+
+    @property
+    def next_check(self):
+        """ 下次检测时间(时间戳) """
+        return self._next_check
+
+    @property
+    def history(self):
+        """ 最近history_size次检测结果的位图, 最低位为最近一次, 1 -> 通过 """
+        return self._history
+
+    @property
+    def history_size(self):
+        """ history中记录的检测次数, 不超过PROXY_CHECK_COUNT """
+        return self._history_size
+
+    @property
+    def latency_history(self):
+        """ 最近通过的检测的首字节耗时(ms), 最后一项为最近一次 """
+        return self._latency_history
+
+    @property
+    def add_time(self):
+        """ 入池时间(时间戳) """
+        return self._add_time
+
+    @property
+    def window_fail_count(self):
+        """ 最近history_size次检测中的失败次数 """
+        return self._history_size - bin(self._history & ((1 << self._history_size) - 1)).count("1")
+
+    @property
+    def fail_rate(self):
+        """ 最近history_size次检测的失败率 """
+        return float(self.window_fail_count) / self._history_size if self._history_size else 0.0
+
+    @property
+    def health(self):
+        """ 健康度0~100: 最近检测的通过率, 按最近延迟的平均值折减(平均1秒时折半) """
+        if not self._history_size:
+            return 0
+        score = 100 * (1 - self.fail_rate)
+        if self._latency_history:
+            average = float(sum(self._latency_history)) / len(self._latency_history)
+            score *= 1000 / (1000 + average)
+        return int(round(score))
+
+    def record(self, status, ttfb, window):
+        """
+        记录一次检测结果
+        :param status: 检测结果 True/False
+        :param ttfb: 首字节耗时(ms), 未通过时为None
+        :param window: 保留最近的检测次数
+        :return:
+        """
+        self._history = ((self._history << 1) | int(bool(status))) & ((1 << window) - 1)
+        self._history_size = min(self._history_size + 1, window)
+        if ttfb is not None:
+            self._latency_history = (self._latency_history + [ttfb])[-window:]
+
     @property
     def to_dict(self):
         """ 属性字典 """
@@ -96,7 +203,17 @@ class Proxy(object):
                 "source": self._source,
                 "check_count": self.check_count,
                 "last_status": self.last_status,
-                "last_time": self.last_time}
+                "last_time": self.last_time,
+                "latency": self.latency,
+                "connect_time": self.connect_time,
+                "ttfb": self.ttfb,
+                "check_interval": self.check_interval,
+                "next_check": self.next_check,
+                "history": self.history,
+                "history_size": self.history_size,
+                "latency_history": self.latency_history,
+                "add_time": self.add_time,
+                "health": self.health}
 
     @property
     def to_json(self):
@@ -131,3 +248,27 @@ class Proxy(object):
     @last_time.setter
     def last_time(self, value):
         self._last_time = value
+
+    @latency.setter
+    def latency(self, value):
+        self._latency = value
+
+    @connect_time.setter
+    def connect_time(self, value):
+        self._connect_time = value
+
+    @ttfb.setter
+    def ttfb(self, value):
+        self._ttfb = value
+
+    @check_interval.setter
+    def check_interval(self, value):
+        self._check_interval = value
+
+    @next_check.setter
+    def next_check(self, value):
+        self._next_check = value
+
+    @add_time.setter
+    def add_time(self, value):
+        self._add_time = value
@@ -9,51 +9,214 @@
    Change Activity:
                    2019/08/05: proxyScheduler
                    2021/02/23: runProxyCheck时,剩余代理少于POOL_SIZE_MIN时执行抓取
+                   2026/10/18: 采集与校验流水线执行
+                   2026/10/18: 只检测已到检测时间的代理
+                   2026/10/18: 周期重叠保护及周期统计
+                   2026/10/18: 按各代理源产出调整其采集间隔
+                   2026/10/18: 各采集函数按各自的采集间隔执行
+                   2026/10/18: 周期保护按打包后的代理去重
+                   2026/10/18: 每次采集后按当前各采集函数的采集间隔重新设置采集任务间隔
+                   2026/10/18: 代理不足时的补充采集只采集已到采集时间的代理源
+                   2026/10/18: 恢复采集周期的互斥保护
+                   2026/10/18: 采集任务间隔按refreshFetchers加载的采集函数计算
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
+from time import time
+from threading import Lock
+
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.executors.pool import ProcessPoolExecutor
 
 from util.six import Queue
-from helper.proxy import Proxy
-from helper.fetch import runFetcher
+from util.proxyCodec import packProxy
+from helper.fetch import FetchProducer
+from fetcher.fetcherRegistry import refreshFetchers
 from helper.check import runChecker
 from handler.logHandler import LogHandler
 from handler.proxyHandler import ProxyHandler
 from handler.configHandler import ConfigHandler
 
 
-def _runProxyFetch():
-    proxy_queue = Queue()
-
-    for proxy in runFetcher():
-        proxy_queue.put(Proxy(proxy).to_json)
-
-    runChecker("raw", proxy_queue)
+class CycleGuard(object):
+    """
+    周期任务协调:
+        上一周期未结束时新周期开始记为一次重叠(overrun);
+        进行中的代理记录在in-flight集合中, 新周期只检测不在其中的代理;
+        每个周期结束时记录耗时及放入队列的代理数, 存放在运行统计 cycle_{name}_* 中.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.log = LogHandler("scheduler")
+        self._lock = Lock()
+        self._running = dict()
+        self._inflight = set()
+
+    def begin(self, cycle_id, exclusive=False):
+        """
+        开始一个周期
+        :param cycle_id: 周期标识
+        :param exclusive: 为True时, 已有周期进行中则不开始
+        :return: 是否开始
+        """
+        with self._lock:
+            running = len(self._running)
+            if not (exclusive and running):
+                self._running[cycle_id] = {"start": time(), "claimed": set(), "queued": 0}
+        if running:
+            self.log.warning("{} cycle overrun: {} cycle(s) still running{}".format(
+                self.name, running, ", skip" if exclusive else ""))
+            self.__stats({"overruns": 1}, incr=True)
+        if exclusive and running:
+            return False
+        self.__stats({"running": running + 1})
+        return True
+
+    def claim(self, cycle_id, proxies):
+        """
+        过滤掉其他周期进行中的代理, 其余代理记为本周期进行中
+        :param cycle_id: 周期标识
+        :param proxies: Proxy list
+        :return: Proxy list
+        """
+        with self._lock:
+            cycle = self._running[cycle_id]
+            claimed, keys = [], set()
+            for proxy in proxies:
+                key = packProxy(proxy.proxy) or proxy.proxy
+                if key not in self._inflight and key not in keys:
+                    claimed.append(proxy)
+                    keys.add(key)
+            self._inflight |= keys
+            cycle["claimed"] |= keys
+            cycle["queued"] += len(claimed)
+        if len(claimed) < len(proxies):
+            self.log.info("{} cycle: skip {} proxies in flight".format(self.name, len(proxies) - len(claimed)))
+        return claimed
+
+    def addQueued(self, cycle_id, count):
+        """
+        记录本周期放入队列的代理数
+        :param cycle_id: 周期标识
+        :param count:
+        :return:
+        """
+        with self._lock:
+            self._running[cycle_id]["queued"] += count
+
+    def end(self, cycle_id):
+        """
+        结束一个周期, 释放其进行中的代理并记录统计
+        :param cycle_id: 周期标识
+        :return:
+        """
+        with self._lock:
+            cycle = self._running.pop(cycle_id)
+            self._inflight -= cycle["claimed"]
+            running = len(self._running)
+        duration = int(time() - cycle["start"])
+        self.log.info("{} cycle: {} proxies queued, {}s".format(self.name, cycle["queued"], duration))
+        self.__stats({"duration": duration, "queued": cycle["queued"], "running": running})
+
+    def __stats(self, mapping, incr=False):
+        mapping = dict(("cycle_%s_%s" % (self.name, key), value) for key, value in mapping.items())
+        try:
+            if incr:
+                ProxyHandler().incrStats(mapping)
+            else:
+                ProxyHandler().updateStats(mapping)
+        except Exception as e:
+            self.log.error("{} cycle: update stats error: {}".format(self.name, e))
+
+
+# 采集任务的最短执行间隔(秒)
+FETCH_TICK_MIN = 30
+
+_fetch_cycle = CycleGuard("proxy_fetch")
+_check_cycle = CycleGuard("proxy_check")
+
+
+def _runProxyFetch(force=False):
+    """
+    :param force: 为True时采集全部代理源, 否则只采集已到采集时间的代理源
+    """
+    # 采集周期不并行, 上一次采集未结束时跳过本次; 采集任务与代理不足时的补充采集共用此保护
+    cycle_id = object()
+    if not _fetch_cycle.begin(cycle_id, exclusive=True):
+        return
+    try:
+        # 有界队列: 采集到即开始校验, 校验跟不上时采集阻塞等待
+        proxy_queue = Queue(maxsize=ConfigHandler().preCheckConcurrency * 2)
+        producer = FetchProducer(proxy_queue, force)
+        producer.start()
+
+        runChecker("raw", proxy_queue, producer)
+        producer.join()
+        _fetch_cycle.addQueued(cycle_id, producer.count)
+        producer.tune()
+    finally:
+        _fetch_cycle.end(cycle_id)
 
 
 def _runProxyCheck():
-    proxy_queue = Queue()
     proxy_handler = ProxyHandler()
     if proxy_handler.db.getCount() < proxy_handler.conf.poolSizeMin:
+        # 检测任务间隔较短, 只采集已到采集时间的代理源, 不绕过各代理源的采集间隔及熔断
         _runProxyFetch()
-    else:
-        for proxy in proxy_handler.getAll():
+        return
+
+    cycle_id = object()
+    _check_cycle.begin(cycle_id)
+    try:
+        proxy_queue = Queue()
+        for proxy in _check_cycle.claim(cycle_id, proxy_handler.getDue()):
             proxy_queue.put(proxy.to_json)
-        runChecker("use", proxy_queue)
+        if not proxy_queue.empty():
+            runChecker("use", proxy_queue)
+    finally:
+        _check_cycle.end(cycle_id)
+
+
+def _fetchTick():
+    """
+    采集任务执行间隔: 各采集函数采集间隔的最小值, 每次执行时只采集已到采集时间的代理源
+    :return: 秒
+    """
+    intervals = [spec.interval for _, spec in refreshFetchers() if spec is not None]
+    return max(FETCH_TICK_MIN, min(intervals)) if intervals else ConfigHandler().fetchInterval
+
+
+def _runScheduledFetch(scheduler):
+    """
+    定时采集, 采集后按当前配置重新计算采集任务间隔: PROXY_FETCHER/PROXY_SOURCES变化后各采集函数的采集间隔随之变化
+    :param scheduler:
+    :return:
+    """
+    try:
+        _runProxyFetch()
+    finally:
+        tick = _fetchTick()
+        job = scheduler.get_job("proxy_fetch")
+        if job is not None and job.trigger.interval.total_seconds() != tick:
+            LogHandler("scheduler").info("proxy_fetch interval changed to {}s".format(tick))
+            scheduler.reschedule_job("proxy_fetch", trigger="interval", seconds=tick)
 
 
 def runScheduler():
-    _runProxyFetch()
+    ProxyHandler().fillDue()
+    _runProxyFetch(force=True)
 
     timezone = ConfigHandler().timezone
     scheduler_log = LogHandler("scheduler")
     scheduler = BlockingScheduler(logger=scheduler_log, timezone=timezone)
 
-    scheduler.add_job(_runProxyFetch, 'interval', minutes=4, id="proxy_fetch", name="proxy采集")
-    scheduler.add_job(_runProxyCheck, 'interval', minutes=2, id="proxy_check", name="proxy检查")
+    # 采集周期不并行, 错过的执行合并为一次
+    scheduler.add_job(_runScheduledFetch, 'interval', seconds=_fetchTick(), args=[scheduler], id="proxy_fetch",
+                      name="proxy采集", max_instances=1, coalesce=True)
+    # 每次只检测已到期的代理, 以较短间隔执行使检测负载分布均匀
+    scheduler.add_job(_runProxyCheck, 'interval', seconds=30, id="proxy_check", name="proxy检查")
 
     executors = {
         'default': {'type': 'threadpool', 'max_workers': 20},
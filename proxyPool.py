@@ -8,6 +8,7 @@
 -------------------------------------------------
    Change Activity:
                    2020/6/19:
+                   2026/10/18: 新增region命令
 -------------------------------------------------
 """
 __author__ = 'JHao'
@@ -39,5 +40,14 @@ def server():
     startServer()
 
 
+@cli.command(name="region")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("index_path", type=click.Path(dir_okay=False))
+def region(csv_path, index_path):
+    """ 将IP段CSV文件编译为二进制索引, 用作REGION_DB """
+    from util.regionLookup import compileIndex
+    click.echo("compiled {} ranges into {}".format(compileIndex(csv_path, index_path), index_path))
+
+
 if __name__ == '__main__':
     cli()
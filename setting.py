@@ -44,6 +44,7 @@ TABLE_NAME = 'use_proxy'
 
 
 # ###### config the proxy fetch function ######
+# 可以是ProxyFetcher中的方法名, 外部包在 proxy_pool.fetchers 组下注册的entry point名称, 或 module:func 路径
 PROXY_FETCHER = [
     "freeProxy01",
     "freeProxy02",
@@ -58,12 +59,58 @@ PROXY_FETCHER = [
     "freeProxy14"
 ]
 
+# 声明式代理源, 定义后把name添加到PROXY_FETCHER中即可采集, 无需编写采集方法; 定义格式见 fetcher/sourceEngine.py 的 DeclarativeSource, 例如:
+# {"name": "mySource", "urls": "http://example.com/free/{page}", "pages": 1, "max_pages": 10, "rate_limit": 1,
+#  "extract": {"xpath": "//table//tr[td]", "fields": ["./td[1]/text()", "./td[2]/text()"]}}
+# 与内置代理源同名的定义只覆盖给出的项, 如 {"name": "freeProxy13", "max_pages": 20}
+PROXY_SOURCES = [
+]
+
+# 采集函数默认的采集间隔(秒), 采集函数可用@fetcher(interval=...)单独声明
+FETCH_INTERVAL = 240
+
+# 各采集函数并行执行, 单个采集函数默认的最长执行时间(秒), 超时后只保留已采集到的代理
+FETCH_TIMEOUT = 90
+
+# 代理源页面缓存有效期(秒), 有效期内页面未变化(304或内容相同)时跳过解析; 0 表示不缓存
+FETCH_CACHE_TTL = 1800
+
+# 代理源页面录制/回放: record 正常请求并把页面保存到FETCH_FIXTURE_DIR; replay 只从FETCH_FIXTURE_DIR读取页面, 不访问网络;
+# 为空则正常请求. 相对路径以项目根目录为起点
+FETCH_FIXTURE_MODE = ""
+FETCH_FIXTURE_DIR = "test/fixtures"
+
+# 代理源熔断: 同一host连续请求失败 BREAKER_THRESHOLD 次后, 冷却期(秒)内直接跳过该host的请求;
+# 未达到失败次数时, 失败后5秒内跳过该host的请求, 之后的请求再重试, 不在采集线程中等待;
+# 冷却期结束后放行一个探测请求, 探测失败冷却期加倍, 最长 BREAKER_COOLDOWN_MAX
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 300
+BREAKER_COOLDOWN_MAX = 3600
+
+# 已见代理集合: 放入过校验队列的代理在 SEEN_TTL~2*SEEN_TTL 秒内再次采集到时不再校验, 池中的代理始终不再校验;
+# 集合为按SEEN_TTL轮换的Bloom filter, 每代可容纳SEEN_CAPACITY个代理(误判率1%), 每代约占 SEEN_CAPACITY*1.2 字节内存;
+# 声明式代理源自适应分页时记录的近期代理同样按SEEN_TTL轮换, 每代最多SEEN_CAPACITY个
+SEEN_TTL = 3600
+SEEN_CAPACITY = 100000
+
+# 单个代理源最长采集间隔(秒): 采集后没有新增可用代理的代理源采集间隔加倍, 有新增时恢复为其声明的采集间隔
+SOURCE_INTERVAL_MAX = 3600
+
 # ############# proxy validator #################
 VERIFY_URL = "https://www.qq.com"
 
 # 代理验证时超时时间
 VERIFY_TIMEOUT = 10
 
+# TCP连接预检超时时间, 预检在完整校验前剔除未监听端口的代理
+PRE_CHECK_TIMEOUT = 3
+
+# 同时进行中的最大TCP连接预检数(不超过文件描述符上限的1/4)
+PRE_CHECK_CONCURRENCY = 2000
+
+# 代理延迟平滑系数, 新延迟 = 系数 * 本次延迟 + (1 - 系数) * 原延迟
+LATENCY_SMOOTHING = 0.3
+
 # 代理校验规则基于的最近校验次数
 PROXY_CHECK_COUNT = 10
 
@@ -76,6 +123,56 @@ MAX_FAIL_RATE = 0.1
 # proxyCheck时代理数量少于POOL_SIZE_MIN触发抓取
 POOL_SIZE_MIN = 20
 
+# 代理检测间隔上下限(秒): 检测通过时间隔翻倍, 直到CHECK_INTERVAL_MAX; 检测失败时重置为CHECK_INTERVAL_MIN
+CHECK_INTERVAL_MIN = 120
+
+CHECK_INTERVAL_MAX = 1800
+
+# 校验失败的采集代理进入隔离区, 隔离期内再次采集到时跳过校验;
+# 隔离时长从QUARANTINE_TTL_MIN开始, 每次失败翻倍, 最长QUARANTINE_TTL_MAX(秒)
+QUARANTINE_TTL_MIN = 600
+
+QUARANTINE_TTL_MAX = 86400
+
+# 匿名度检测使用的echo接口, 返回请求来源IP及请求头(格式同httpbin.org/get), 为空则不检测;
+# 可使用本项目api服务的 /echo/ 接口, 需保证代理可以访问到该地址
+ANONYMITY_URL = ""
+
+# 获取本机公网出口IP的echo接口(返回 {"origin": ip}), ANONYMITY_URL看到的来源为本地/内网地址时使用,
+# 用于识别转发了公网出口IP的透明代理; 为空则直接使用内网地址
+REAL_IP_URL = "https://httpbin.org/ip"
+
+# 本地IP段数据库, 代理入库时据此离线标注地区(region), 为空则不标注;
+# 支持CSV文件(每行: 起始IP,结束IP,地区)或由 python proxyPool.py region 编译的二进制索引
+REGION_DB = ""
+
+# ############# http client #################
+# 采集与校验共用的连接池大小: 缓存的host(代理)连接池数及每个连接池的最大连接数
+HTTP_POOL_SIZE = 100
+
+# 域名解析结果缓存时间(秒), 0为不缓存
+DNS_CACHE_TTL = 300
+
+# ############# proxy checker #################
+# 校验结果批量写入数据库: 累计DB_BATCH_SIZE条或距上次写入超过DB_FLUSH_INTERVAL秒时写入一次
+DB_BATCH_SIZE = 200
+
+DB_FLUSH_INTERVAL = 1
+
+# 代理校验模式: thread 多线程校验; async 基于asyncio的异步校验(需Python3)
+CHECK_MODE = "thread"
+
+# 校验并发数下限/上限, 运行时根据超时率、平均延迟及文件描述符余量在该区间内自动调整
+CHECK_CONCURRENCY_MIN = 20
+
+CHECK_CONCURRENCY_MAX = 500
+
+# async模式下运行同步validator的线程池大小
+ASYNC_EXECUTOR_WORKERS = 50
+
+# 校验进程数: 大于1时校验队列分发到多个子进程, 每个进程各自按上面的并发设置校验; 0表示CPU核数
+CHECK_PROCESSES = 1
+
 # ############# scheduler config #################
 
 # Set the timezone for the scheduler forcely (optional)
@@ -15,6 +15,19 @@ __author__ = 'JHao'
 from test import testConfigHandler
 from test import testLogHandler
 from test import testDbClient
+from test import testConcurrencyController
+from test import testValidators
+from test import testRegionLookup
+from test import testWebRequest
+from test import testCircuitBreaker
+from test import testFetcherRegistry
+from test import testBloomFilter
+from test import testProxyCodec
+from test import testSourceEngine
+from test import testProcessCheck
+from test import testProxyApi
+from test import testResultWriter
+from test import testProxyFetcher
 
 if __name__ == '__main__':
     print("ConfigHandler:")
@@ -25,3 +38,42 @@ if __name__ == '__main__':
 
     print("DbClient:")
     testDbClient.testDbClient()
+
+    print("ConcurrencyController:")
+    testConcurrencyController.testConcurrencyController()
+
+    print("Validators:")
+    testValidators.testValidators()
+
+    print("RegionLookup:")
+    testRegionLookup.testRegionLookup()
+
+    print("WebRequest:")
+    testWebRequest.testWebRequest()
+
+    print("CircuitBreaker:")
+    testCircuitBreaker.testCircuitBreaker()
+
+    print("FetcherRegistry:")
+    testFetcherRegistry.testFetcherRegistry()
+
+    print("BloomFilter:")
+    testBloomFilter.testBloomFilter()
+
+    print("ProxyCodec:")
+    testProxyCodec.testProxyCodec()
+
+    print("SourceEngine:")
+    testSourceEngine.testSourceEngine()
+
+    print("ProcessCheck:")
+    testProcessCheck.testProcessCheck()
+
+    print("ProxyApi:")
+    testProxyApi.testProxyApi()
+
+    print("ResultWriter:")
+    testResultWriter.testResultWriter()
+
+    print("ProxyFetcher:")
+    testProxyFetcher.testProxyFetcher()
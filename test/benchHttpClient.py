@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     benchHttpClient
+   Description :   校验请求micro-benchmark: requests.head 与 共用HttpClient 单次校验的CPU耗时和延迟
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import os
+import sys
+import time
+from threading import Thread
+
+# 以 python test/benchHttpClient.py 直接执行时, 把项目根目录加入sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from util.six import PY3
+from util.httpClient import verify_client
+
+if PY3:
+    from socketserver import ThreadingMixIn
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+else:
+    from SocketServer import ThreadingMixIn
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+_cpu_time = time.process_time if PY3 else time.clock
+
+VERIFY_URL = "http://www.example.com/"
+
+
+class _ProxyServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """ 模拟代理: 对任意HEAD请求返回200 """
+    protocol_version = "HTTP/1.1"
+    keep_alive = True
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        if not self.keep_alive:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _startProxy(keep_alive):
+    handler = type("Handler", (_ProxyHandler,), {"keep_alive": keep_alive})
+    server = _ProxyServer(("127.0.0.1", 0), handler)
+    thread = Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, "127.0.0.1:%s" % server.server_address[1]
+
+
+def _bench(head, proxy, count):
+    proxies = {"http": "http://%s" % proxy, "https": "https://%s" % proxy}
+    cpu, wall = _cpu_time(), time.time()
+    for _ in range(count):
+        assert head(VERIFY_URL, proxies=proxies, timeout=5, verify=False).status_code == 200
+    return (_cpu_time() - cpu) * 1000 / count, (time.time() - wall) * 1000 / count
+
+
+def benchHttpClient(count=500):
+    for keep_alive in (True, False):
+        server, proxy = _startProxy(keep_alive)
+        print("proxy keep-alive: %s, %s checks" % (keep_alive, count))
+        for name, head in (("requests.head", requests.head), ("verify_client.head", verify_client.head)):
+            cpu, latency = _bench(head, proxy, count)
+            print("    %-20s cpu %.3f ms/check, latency %.3f ms/check" % (name, cpu, latency))
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    benchHttpClient()
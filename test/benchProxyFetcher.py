@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     benchProxyFetcher
+   Description :   采集函数解析benchmark: 回放录制的代理源页面, 测量各采集函数的解析吞吐及每页CPU耗时
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import os
+import sys
+import time
+
+# 以 python test/benchProxyFetcher.py 直接执行时, 把项目根目录加入sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.six import PY3
+from util.webRequest import fixtures, resetPageStats, pageStats, RECORD, REPLAY
+from fetcher.fetcherRegistry import loadFetcher
+from handler.configHandler import ConfigHandler
+
+_cpu_time = time.process_time if PY3 else time.clock
+
+
+def recordProxyFetcher(directory=None):
+    """
+    访问代理源, 把各采集函数请求的页面录制到directory(默认FETCH_FIXTURE_DIR)
+    :param directory:
+    :return:
+    """
+    fixtures.use(RECORD, directory)
+    try:
+        for name in ConfigHandler().fetchers:
+            resetPageStats()
+            count = sum(1 for _ in loadFetcher(name)())
+            print("%-14s recorded %d pages, %d proxies" % (name, pageStats()[0], count))
+    finally:
+        fixtures.use(None)
+
+
+def _bench(spec, rounds):
+    resetPageStats()
+    cpu, wall, count = _cpu_time(), time.time(), 0
+    for _ in range(rounds):
+        count += sum(1 for _ in spec())
+    return pageStats()[0], count, _cpu_time() - cpu, time.time() - wall
+
+
+def benchProxyFetcher(rounds=20, directory=None):
+    """
+    回放录制的页面, 不访问网络; 首次回放读取页面文件, 不计入耗时
+    :param rounds: 每个采集函数的回放次数
+    :param directory: 页面目录, 默认FETCH_FIXTURE_DIR
+    :return:
+    """
+    fixtures.use(REPLAY, directory)
+    try:
+        print("replay %s, %s rounds" % (fixtures.directory, rounds))
+        for name in ConfigHandler().fetchers:
+            spec = loadFetcher(name)
+            if spec is None:
+                print("    %-14s not exists" % name)
+                continue
+            pages, count, _, _ = _bench(spec, 1)
+            if not pages:
+                print("    %-14s no recorded pages" % name)
+                continue
+            pages, count, cpu, wall = _bench(spec, rounds)
+            print("    %-14s %3d pages %5d proxies/round  %9.0f proxies/s  cpu %.3f ms/page"
+                  % (name, pages // rounds, count // rounds, count / wall if wall else 0, cpu * 1000 / pages))
+    finally:
+        fixtures.use(None)
+
+
+if __name__ == '__main__':
+    # python -m test.benchProxyFetcher [record]
+    if sys.argv[1:] == [RECORD]:
+        recordProxyFetcher()
+    benchProxyFetcher()
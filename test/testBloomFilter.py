@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testBloomFilter
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from util.bloomFilter import BloomFilter, RotatingBloomFilter
+
+
+def testBloomFilter():
+    """
+    test BloomFilter/RotatingBloomFilter
+    :return:
+    """
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add("10.0.%d.%d:8080" % (i // 256, i % 256))
+    assert all("10.0.%d.%d:8080" % (i // 256, i % 256) in bloom for i in range(10000))
+    false_positives = sum(1 for i in range(10000) if "10.1.%d.%d:8080" % (i // 256, i % 256) in bloom)
+    assert false_positives < 300, false_positives
+
+    seeded = list()
+    rotating = RotatingBloomFilter(1000, 3600, on_rotate=lambda b: (b.add("1.1.1.1:80"), seeded.append(b)))
+    rotating.add("2.2.2.2:80")
+    assert "2.2.2.2:80" in rotating and "1.1.1.1:80" in rotating and "3.3.3.3:80" not in rotating
+    # 轮换一次后仍可查到, 轮换两次后丢弃, 每次轮换重新加入on_rotate中的元素
+    for rotations, expected in ((1, True), (2, False)):
+        rotating._rotated_at = 0
+        assert ("2.2.2.2:80" in rotating) is expected
+        assert "1.1.1.1:80" in rotating and len(seeded) == rotations + 1
+
+    # on_rotate在锁外执行, 失败时保留原来的两代, 下次调用时重试
+    def failRotate(bloom):
+        assert not rotating._lock.locked()
+        raise IOError("db unavailable")
+    rotating.add("4.4.4.4:80")
+    rotating.on_rotate, rotating._rotated_at = failRotate, 0
+    try:
+        "4.4.4.4:80" in rotating
+        assert False
+    except IOError:
+        pass
+    assert rotating._rotated_at == 0 and len(seeded) == 3
+    rotating.on_rotate = lambda b: (b.add("1.1.1.1:80"), seeded.append(b))
+    assert "4.4.4.4:80" in rotating and "1.1.1.1:80" in rotating and rotating._rotated_at > 0
+    print("BloomFilter ok!")
+
+
+if __name__ == '__main__':
+    testBloomFilter()
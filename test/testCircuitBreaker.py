@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testCircuitBreaker
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from time import time
+
+from util.circuitBreaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def testCircuitBreaker():
+    """
+    test CircuitBreaker
+    :return:
+    """
+    breaker = CircuitBreaker("example.com", threshold=2, cooldown=60, cooldown_max=100)
+    assert breaker.allow()
+    # 未熔断时失败后记录重试时间, 到时间前跳过该host的请求
+    breaker.failure(retry_delay=60)
+    assert breaker.state == CLOSED and not breaker.allow() and breaker.status()["retry_at"] >= int(time()) + 59
+    breaker.retry_at = time()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    # 冷却期结束后只放行一个探测请求, 探测失败冷却期加倍
+    breaker.open_until = time()
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == OPEN and breaker.cooldown == 100
+    assert breaker.status()["open_until"] >= int(time()) + 99
+
+    # 探测成功后恢复
+    breaker.open_until = time()
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.status() == {"state": CLOSED, "failures": 0} and breaker.cooldown == 60
+    print("CircuitBreaker ok!")
+
+
+if __name__ == '__main__':
+    testCircuitBreaker()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testConcurrencyController
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from util.concurrencyController import ConcurrencyController
+
+
+def _runRound(controller, elapsed, status):
+    for _ in range(controller.limit):
+        assert controller.tryAcquire()
+    assert not controller.tryAcquire()
+    limit = None
+    for _ in range(controller.limit):
+        limit = controller.release(elapsed, status) or limit
+    return limit
+
+
+def testConcurrencyController():
+    controller = ConcurrencyController(floor=10, ceiling=100, timeout=5)
+    assert controller.limit == 10
+
+    # 慢启动: 无拥塞时翻倍, 不超过ceiling
+    assert _runRound(controller, 0.5, True) == 20
+    assert _runRound(controller, 0.5, True) == 40
+    assert _runRound(controller, 0.5, True) == 80
+    assert _runRound(controller, 0.5, True) == 100
+    assert _runRound(controller, 0.5, True) is None
+
+    # 延迟明显升高视为拥塞, 乘性减少
+    assert _runRound(controller, 2, True) == 70
+
+    # 之后加性增加
+    assert _runRound(controller, 0.5, True) == 80
+
+    # 超时率突增视为拥塞, 不低于floor
+    for _ in range(10):
+        _runRound(controller, 5, False)
+    assert controller.limit == 10
+    assert controller.in_flight == 0
+    print("ConcurrencyController ok!")
+
+
+if __name__ == '__main__':
+    testConcurrencyController()
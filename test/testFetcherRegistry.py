@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testFetcherRegistry
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from fetcher.fetcherRegistry import fetcher, loadFetcher
+
+
+@fetcher(name="sampleFetcher", interval=600, pages=3, timeout=10, concurrency=2)
+def sampleFetcher(page_count=1):
+    for page in range(page_count):
+        yield "127.0.0.%d:80" % page
+
+
+def plainFetcher():
+    yield "127.0.0.1:8080"
+
+
+def testFetcherRegistry():
+    """
+    test fetcher registry
+    :return:
+    """
+    spec = loadFetcher("sampleFetcher")
+    assert (spec.interval, spec.pages, spec.timeout) == (600, 3, 10)
+    assert list(spec()) == ["127.0.0.0:80", "127.0.0.1:80", "127.0.0.2:80"]
+    # 按路径加载时沿用@fetcher声明的参数
+    assert loadFetcher("test.testFetcherRegistry:sampleFetcher").interval == 600
+    assert spec.acquire() and spec.acquire() and not spec.acquire()
+    spec.release()
+    assert spec.acquire()
+    spec.release()
+    spec.release()
+
+    plain = loadFetcher("test.testFetcherRegistry.plainFetcher")
+    assert list(plain()) == ["127.0.0.1:8080"] and plain.pages is None and plain.concurrency == 1
+    assert (loadFetcher("freeProxy13").pages, loadFetcher("freeProxy13").func.max_pages) == (2, 10)
+    assert loadFetcher("notExists") is None and loadFetcher("test.testFetcherRegistry:notExists") is None
+    print("FetcherRegistry ok!")
+
+
+if __name__ == '__main__':
+    testFetcherRegistry()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testProcessCheck
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from threading import Thread
+
+from util.six import Queue
+from helper import processCheck
+
+
+def _exitWorker(tp, shard_queue, result_queue, index):
+    """ 不处理任何代理直接退出的子进程 """
+    return
+
+
+def testProcessCheck():
+    """
+    test runShardedChecker: 子进程全部提前退出时, 剩余代理被丢弃, producer不会阻塞
+    :return:
+    """
+    check_worker, pre_check = processCheck._checkWorker, processCheck.preCheckConcurrency
+    processCheck._checkWorker, processCheck.preCheckConcurrency = _exitWorker, lambda: 2
+    try:
+        queue = Queue(maxsize=4)
+        producer = Thread(target=lambda: [queue.put('{"proxy": "127.0.0.1:%d"}' % port) for port in range(1, 51)])
+        producer.daemon = True
+        producer.start()
+        result = list()
+        checker = Thread(target=lambda: result.append(processCheck.runShardedChecker("raw", queue, producer, 2)))
+        checker.daemon = True
+        checker.start()
+        checker.join(60)
+        assert not checker.is_alive() and not producer.is_alive()
+        assert result == [(0, 0)] and queue.empty()
+    finally:
+        processCheck._checkWorker, processCheck.preCheckConcurrency = check_worker, pre_check
+    print("ProcessCheck ok!")
+
+
+if __name__ == '__main__':
+    testProcessCheck()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testProxyApi
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from api import proxyApi
+
+
+class _RecordHandler(object):
+    """ 记录get参数, 不访问数据库 """
+
+    def __init__(self):
+        self.calls = list()
+
+    def get(self, **kwargs):
+        self.calls.append(kwargs)
+        return None
+
+
+def testProxyApi():
+    handler, proxyApi.proxy_handler = proxyApi.proxy_handler, _RecordHandler()
+    try:
+        client = proxyApi.app.test_client()
+        # fastest不是正数时返回400, 不查询数据库
+        for value in ("0", "-1"):
+            response = client.get("/get/?fastest=%s" % value)
+            assert response.status_code == 400, value
+            assert response.get_json()["code"] == 0
+        assert proxyApi.proxy_handler.calls == []
+
+        response = client.get("/get/?fastest=3&type=elite")
+        assert response.status_code == 200
+        assert proxyApi.proxy_handler.calls == [{"max_latency": None, "fastest": 3, "proxy_type": "elite"}]
+    finally:
+        proxyApi.proxy_handler = handler
+    print("ProxyApi ok!")
+
+
+if __name__ == '__main__':
+    testProxyApi()
@@ -8,6 +8,7 @@
 -------------------------------------------------
    Change Activity:
                    2019/8/8:
+                   2026/10/18: 最近检测结果窗口
 -------------------------------------------------
 """
 __author__ = 'JHao'
@@ -29,6 +30,19 @@ def testProxyClass():
 
     print(Proxy.createFromJson(proxy_str).to_dict)
 
+    # 最近检测结果窗口
+    for status, ttfb in [(True, 100), (True, 300), (False, None), (True, 200)]:
+        proxy.record(status, ttfb, 3)
+    assert proxy.history == 0b101 and proxy.history_size == 3
+    assert proxy.latency_history == [100, 300, 200]
+    assert proxy.window_fail_count == 1
+    assert abs(proxy.fail_rate - 1.0 / 3) < 1e-9
+    assert proxy.health == 56
+    proxy.add_time = 1792281600
+    proxy = Proxy.createFromJson(proxy.to_json)
+    assert proxy.history == 0b101 and proxy.window_fail_count == 1
+    assert proxy.source == "test" and proxy.add_time == 1792281600
+
 
 if __name__ == '__main__':
     testProxyClass()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testProxyCodec
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from util.proxyCodec import packProxy, unpackProxy, packedHost, splitProxy
+
+
+def testProxyCodec():
+    """
+    test packProxy/unpackProxy
+    :return:
+    """
+    assert packProxy("1.2.3.4:8080") == (0x01020304 << 16) | 8080
+    assert packedHost(packProxy("1.2.3.4:8080")) == 0x01020304
+    for proxy in ("1.2.3.4:8080", "255.255.255.255:65535", "0.0.0.0:1", "[2001:db8::1]:3128"):
+        assert unpackProxy(packProxy(proxy)) == proxy, proxy
+    assert packedHost(packProxy("[2001:db8::1]:3128")) is None
+    for proxy in ("1.2.3.4", "1.2.3.256:80", "01.2.3.4:80", "1.2.3.4:0", "1.2.3.4:65536",
+                  "1.2.3:80", "2001:db8::1:80", "[1.2.3.4]:80", "a.b.c.d:80", "1.2.3.4:+80", " 1.2.3.4:80"):
+        assert packProxy(proxy) is None, proxy
+
+    assert splitProxy("1.2.3.4:8080") == ("1.2.3.4", 8080)
+    assert splitProxy("[2001:db8::1]:3128") == ("2001:db8::1", 3128)
+    print("ProxyCodec ok!")
+
+
+if __name__ == '__main__':
+    testProxyCodec()
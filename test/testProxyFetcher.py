@@ -8,25 +8,45 @@
 -------------------------------------------------
    Change Activity:
                    2020/6/23:
+                   2026/10/18: 回放test/fixtures中录制的页面, 不访问网络
+                   2026/10/18: ProxyFetcher静态方法
 -------------------------------------------------
 """
 __author__ = 'JHao'
 
+from util.proxyCodec import packProxy
+from util.webRequest import fixtures, REPLAY
+from fetcher.fetcherRegistry import loadFetcher
 from fetcher.proxyFetcher import ProxyFetcher
-from handler.configHandler import ConfigHandler
+
+# test/fixtures中各内置代理源录制页面的代理数, 重新录制页面后需同步更新
+FIXTURE_COUNTS = {
+    "freeProxy01": 40,
+    "freeProxy02": 60,
+    "freeProxy03": 15,
+    "freeProxy04": 20,
+    "freeProxy05": 48,
+    "freeProxy06": 25,
+    "freeProxy07": 30,
+    "freeProxy09": 30,
+    "freeProxy13": 50,
+    "freeProxy14": 80,
+}
 
 
 def testProxyFetcher():
-    conf = ConfigHandler()
-    proxy_getter_functions = conf.fetchers
-    proxy_counter = {_: 0 for _ in proxy_getter_functions}
-    for proxyGetter in proxy_getter_functions:
-        for proxy in getattr(ProxyFetcher, proxyGetter.strip())():
-            if proxy:
-                print('{func}: fetch proxy {proxy}'.format(func=proxyGetter, proxy=proxy))
-                proxy_counter[proxyGetter] = proxy_counter.get(proxyGetter) + 1
-    for key, value in proxy_counter.items():
-        print(key, value)
+    fixtures.use(REPLAY, "test/fixtures")
+    try:
+        for name, expected in sorted(FIXTURE_COUNTS.items()):
+            proxies = list(loadFetcher(name)())
+            invalid = [proxy for proxy in proxies if packProxy(proxy) is None]
+            assert not invalid, (name, invalid[:3])
+            assert len(set(proxies)) == expected, (name, len(set(proxies)), expected)
+        # 声明式代理源保留的静态方法与注册的采集函数结果相同
+        assert sorted(ProxyFetcher.freeProxy07()) == sorted(loadFetcher("freeProxy07")())
+    finally:
+        fixtures.use(None)
+    print("ProxyFetcher ok!")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testRegionLookup
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import io
+import os
+import shutil
+import tempfile
+
+from util.regionLookup import RegionDatabase, compileIndex
+
+CSV = u"""# 起始IP,结束IP,地区
+1.0.1.0,1.0.3.255,中国|福建
+1.0.0.0,1.0.0.255,澳大利亚
+3758096128,3758096383,澳大利亚
+"""
+
+
+def testRegionLookup():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        csv_path = os.path.join(tmp_dir, "region.csv")
+        index_path = os.path.join(tmp_dir, "region.idx")
+        with io.open(csv_path, "w", encoding="utf-8") as f:
+            f.write(CSV)
+        assert compileIndex(csv_path, index_path) == 3
+
+        for path in (csv_path, index_path):
+            database = RegionDatabase(path)
+            assert len(database) == 3
+            assert database.lookup("1.0.0.0") == u"澳大利亚"
+            assert database.lookup("1.0.2.100") == u"中国|福建"
+            assert database.lookup("1.0.3.255") == u"中国|福建"
+            assert database.lookup("223.255.255.9") == u"澳大利亚"
+            assert database.lookup("1.0.4.0") == ""
+            assert database.lookup("0.255.255.255") == ""
+            assert database.lookup("not an ip") == ""
+            database = None
+    finally:
+        shutil.rmtree(tmp_dir)
+    print("region lookup ok!")
+
+
+if __name__ == '__main__':
+    testRegionLookup()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testResultWriter
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import gc
+
+from helper.proxy import Proxy
+from helper.check import ResultWriter, updateProxyStatus
+
+
+class _MemoryHandler(object):
+    """ 代替ProxyHandler的写入方法, available为False时写入失败 """
+
+    def __init__(self):
+        self.available = False
+        self.proxies = dict()
+
+    def putMany(self, proxies):
+        if not self.available:
+            raise IOError("db unavailable")
+        self.proxies.update((proxy.proxy, proxy) for proxy in proxies)
+
+    def deleteMany(self, proxies):
+        if not self.available:
+            raise IOError("db unavailable")
+
+    def incrStats(self, mapping):
+        if not self.available:
+            raise IOError("db unavailable")
+
+
+def _closeFailed(handler):
+    writer = ResultWriter("use")
+    writer.proxy_handler = handler
+    writer.close_retries, writer.close_backoff = 1, 0.01
+    writer.add(updateProxyStatus(Proxy("1.1.1.1:80"), True, {"ttfb": 10}), "test")
+    assert writer.close() is False
+
+
+def testResultWriter():
+    handler = _MemoryHandler()
+    # close失败后调用方不再持有writer, 未写入的结果仍保留到closeAll时写入
+    _closeFailed(handler)
+    gc.collect()
+    assert len(ResultWriter._unflushed) == 1
+    handler.available = True
+    ResultWriter.closeAll()
+    assert list(handler.proxies) == ["1.1.1.1:80"]
+    assert not ResultWriter._unflushed and not list(ResultWriter._writers)
+
+    # validator返回的未知字段不写入Proxy
+    proxy = updateProxyStatus(Proxy("1.1.1.2:80"), True, {"ttfb": 20, "type": "elite", "fail_count": 99, "foo": 1})
+    assert proxy.ttfb == 20 and proxy.type == "elite" and proxy.fail_count == 0 and not hasattr(proxy, "foo")
+    print("ResultWriter ok!")
+
+
+if __name__ == '__main__':
+    testResultWriter()
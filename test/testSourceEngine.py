@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testSourceEngine
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import json
+import time
+import shutil
+import tempfile
+from threading import Thread
+
+from requests.models import Response
+
+from util.webRequest import FixtureStore, fixtures, resetPageStats, pageStats, REPLAY
+from fetcher.sourceEngine import registerSource, loadSource, compileExtractor
+from fetcher.fetcherRegistry import loadFetcher
+from handler.configHandler import ConfigHandler
+
+TABLE = ("<table><thead><tr><th>IP</th><th>PORT</th></tr></thead><tbody>"
+         "<tr><td>1.1.1.%d</td><td>80</td></tr><tr><td>1.1.2.%d</td><td> 8080 </td></tr></tbody></table>")
+
+
+def _response(content):
+    response = Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response._content = content.encode("utf-8")
+    return response
+
+
+def testSourceEngine():
+    """
+    test DeclarativeSource
+    :return:
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        store = FixtureStore()
+        store.use(REPLAY, directory)
+        for page in (1, 2, 3):
+            store.save("http://example.com/table/%d" % page, _response(TABLE % (page, page)))
+        store.save("http://example.com/text", _response("2.2.2.2:3128<br>2.2.2.3:3129<br>x.x.x.x:1"))
+        store.save("http://example.com/api", _response(json.dumps(
+            {"data": {"list": [{"ip": "3.3.3.3", "port": 80}, {"ip": "3.3.3.4", "port": 81}]}})))
+        fixtures.use(REPLAY, directory)
+
+        # 各页面并发请求, 页面请求计数累加到调用方线程
+        registerSource({"name": "sampleTable", "urls": "http://example.com/table/{page}", "pages": 2,
+                        "extract": {"xpath": "//table//tr[td]", "fields": ["./td[1]/text()", "./td[2]/text()"]}})
+        spec = loadFetcher("sampleTable")
+        assert spec.pages == 2
+        resetPageStats()
+        assert sorted(spec()) == ["1.1.1.1:80", "1.1.1.2:80", "1.1.2.1:8080", "1.1.2.2:8080"]
+        assert pageStats() == (2, 0)
+        assert len(list(spec.func(page_count=3))) == 6
+
+        registerSource({"name": "sampleText", "urls": ["http://example.com/text"],
+                        "extract": {"regex": r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d+)"}})
+        assert list(loadFetcher("sampleText")()) == ["2.2.2.2:3128", "2.2.2.3:3129"]
+
+        registerSource({"name": "sampleJson", "urls": "http://example.com/api",
+                        "extract": {"json": "data.list", "fields": ["ip", "port"]}})
+        assert list(loadFetcher("sampleJson")()) == ["3.3.3.3:80", "3.3.3.4:81"]
+
+        # 上一次请求结束到下一次请求开始的间隔不小于rate_limit, 回放时不限制
+        source = registerSource({"name": "sampleLimited", "urls": "http://example.com/table/{page}", "pages": 3,
+                                 "rate_limit": 0.1, "extract": {"regex": r"\d+\.\d+\.\d+\.\d+"}})
+        start = time.time()
+        assert len(list(source())) == 6 and time.time() - start < 0.1
+        fixtures.use("")
+        start = time.time()
+        for _ in range(3):
+            with source.throttle():
+                time.sleep(0.05)
+        assert time.time() - start >= 0.35
+        # 并发的请求同样依次执行
+        spans = list()
+
+        def limited():
+            with source.throttle():
+                begin = time.time()
+                time.sleep(0.05)
+                spans.append((begin, time.time()))
+        threads = [Thread(target=limited) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        spans.sort()
+        assert all(later[0] - earlier[1] >= 0.1 for earlier, later in zip(spans, spans[1:]))
+
+        # 最后一页新代理比例低于min_new_ratio时停止: 第4页与第3页相同
+        for page in (1, 2, 3, 4, 5):
+            store.save("http://example.com/deep/%d" % page, _response(TABLE % (min(page, 3), min(page, 3))))
+        for page in (1, 2, 3, 4):
+            store.save("http://example.com/other/%d" % page, _response(TABLE % (100 + page, 100 + page)))
+        fixtures.use(REPLAY, directory)
+        source = registerSource({"name": "sampleDeep", "urls": "http://example.com/deep/{page}", "pages": 1,
+                                 "max_pages": 5, "extract": {"regex": r"(\d+\.\d+\.\d+\.\d+)</td><td>\s*(\d+)"}})
+        assert len(list(source())) == 8 and source.depth == {"http://example.com/deep/{page}": 4}
+        # 再次采集时第1页均已采集过, 只采集最少页数
+        assert len(list(source())) == 2 and source.depth == {"http://example.com/deep/{page}": 1}
+        # 多个url各自决定采集深度
+        source = registerSource({"name": "sampleDeep2", "pages": 2, "max_pages": 4, "workers": 2,
+                                 "urls": ["http://example.com/deep/{page}", "http://example.com/other/{page}"],
+                                 "extract": {"regex": r"(\d+\.\d+\.\d+\.\d+)</td><td>\s*(\d+)"}})
+        resetPageStats()
+        assert len(list(source())) == 16 and pageStats() == (8, 0)
+        assert source.depth == {"http://example.com/deep/{page}": 4, "http://example.com/other/{page}": 4}
+
+        # 已采集代理按packProxy压缩存储, 每代满SEEN_CAPACITY个时提前轮换
+        conf = ConfigHandler()
+        capacity = conf.seenCapacity
+        conf.seenCapacity = 4
+        try:
+            assert source.newRatio(["10.0.0.%d:80" % i for i in range(4)] + ["bad proxy"]) == 1.0
+            assert len(source._seen) == 1 and len(source._seen_previous) == 4
+            assert all(isinstance(key, int) for key in source._seen_previous) and "bad proxy" in source._seen
+            assert source.newRatio(["10.0.0.1:80", "10.0.0.9:80"]) == 0.5
+        finally:
+            conf.seenCapacity = capacity
+
+        # PROXY_SOURCES中与内置代理源同名的定义只覆盖给出的项
+        builtin = loadFetcher("freeProxy13").func
+        source = loadSource({"name": "freeProxy13", "max_pages": 3})
+        assert source.max_pages == 3 and source.urls == builtin.urls and loadFetcher("freeProxy13").func is source
+        assert loadSource({"name": "freeProxy13", "max_pages": 3}) is source
+        assert loadSource({"name": "freeProxy13"}).max_pages == 10
+
+        for rule in ({}, {"xpath": "//table["}):
+            try:
+                compileExtractor(rule)
+                assert False, rule
+            except ValueError:
+                pass
+        print("SourceEngine ok!")
+    finally:
+        fixtures.use(None)
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    testSourceEngine()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testValidators
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+                   2026/10/18: 异步HEAD请求支持IPv6代理
+                   2026/10/18: 本地echo接口下识别透明代理
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import json
+import socket
+from threading import Thread
+
+from util.six import PY3, urlparse
+from util import validators as validatorModule
+from util.validators import validators, validator, formatValidator, timeOutValidator, ValidatorRecorder, \
+    classifyAnonymity, realIp
+from handler.configHandler import ConfigHandler
+
+
+def testValidators():
+    # 按cost从小到大执行
+    costs = [func.cost for func in validators]
+    assert costs == sorted(costs)
+    assert validators[0] is formatValidator
+
+    @validator(cost=0, ttl=60)
+    def cheapValidator(proxy):
+        return proxy.startswith("1.")
+
+    try:
+        assert validators[0] is cheapValidator
+
+        recorder = ValidatorRecorder()
+        assert recorder.lookup(cheapValidator, "1.1.1.1:80") is recorder.MISS
+        recorder.record(cheapValidator, "1.1.1.1:80", True, 0.01)
+        recorder.record(cheapValidator, "2.2.2.2:80", False, 0.02)
+        # 缓存的结果(包括不通过的结果)直接返回
+        assert recorder.lookup(cheapValidator, "1.1.1.1:80") is True
+        assert recorder.lookup(cheapValidator, "2.2.2.2:80") is False
+        # 未设置ttl的validator不缓存
+        recorder.record(timeOutValidator, "1.1.1.1:80", {"ttfb": 100}, 0.1)
+        assert recorder.lookup(timeOutValidator, "1.1.1.1:80") is recorder.MISS
+
+        stats = recorder.drain()
+        assert stats["validator_cheapValidator_calls"] == 2
+        assert stats["validator_cheapValidator_cache_hits"] == 2
+        assert stats["validator_cheapValidator_rejects"] == 2
+        assert stats["validator_cheapValidator_time_ms"] == 30
+        assert recorder.drain() == {}
+    finally:
+        validators.remove(cheapValidator)
+
+    # 匿名度
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"X-Forwarded-For": "9.9.9.9"}}, "9.9.9.9") == "transparent"
+    assert classifyAnonymity({"origin": "9.9.9.9", "headers": {}}, "9.9.9.9") == "transparent"
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"Via": "1.1 squid"}}, "9.9.9.9") == "anonymous"
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"Host": "x"}}, "9.9.9.9") == "elite"
+    # 按完整IP比较
+    assert classifyAnonymity({"origin": "11.2.3.45", "headers": {}}, "1.2.3.4") == "elite"
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"X-Forwarded-For": "11.2.3.45, 5.5.5.5"}},
+                             "1.2.3.4") == "anonymous"
+    assert classifyAnonymity({"origin": "1.2.3.4, 5.5.5.5", "headers": {}}, "1.2.3.4") == "transparent"
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"Forwarded": "for=1.2.3.4;proto=http"}},
+                             "1.2.3.4") == "transparent"
+    assert classifyAnonymity({"origin": "5.5.5.5", "headers": {"Forwarded": 'for="[::1]:80"'}}, "::1") == "transparent"
+
+    # ANONYMITY_URL为本地echo时看到的是内网来源, 出口IP改由REAL_IP_URL获取, 转发了出口IP的代理判为透明代理
+    conf = ConfigHandler()
+    anonymity_url, real_ip_url = conf.anonymityUrl, conf.realIpUrl
+    local_echo = _echoServer({"origin": "127.0.0.1", "headers": {}})
+    public_echo = _echoServer({"origin": "9.9.9.9"})
+    conf.anonymityUrl = "http://127.0.0.1:%d/echo/" % local_echo.getsockname()[1]
+    conf.realIpUrl = "http://127.0.0.1:%d/ip" % public_echo.getsockname()[1]
+    validatorModule._real_ip.update(ip=None, expire=0)
+    try:
+        assert realIp() == "9.9.9.9"
+        echo = {"origin": "192.168.1.10", "headers": {"X-Forwarded-For": "9.9.9.9"}}
+        assert classifyAnonymity(echo, realIp()) == "transparent"
+    finally:
+        conf.anonymityUrl, conf.realIpUrl = anonymity_url, real_ip_url
+        validatorModule._real_ip.update(ip=None, expire=0)
+        local_echo.close()
+        public_echo.close()
+    assert validatorModule._isLocalIp("10.1.2.3") and validatorModule._isLocalIp("172.31.0.1")
+    assert validatorModule._isLocalIp("::1") and validatorModule._isLocalIp("fd00::1")
+    assert not validatorModule._isLocalIp("172.32.0.1") and not validatorModule._isLocalIp("2001:db8::1")
+
+    # 异步校验经IPv4/IPv6代理发送HEAD请求
+    if PY3:
+        import asyncio
+        from util.asyncValidators import _head
+
+        families = [(socket.AF_INET, "127.0.0.1", "127.0.0.1:%d")]
+        if socket.has_ipv6:
+            families.append((socket.AF_INET6, "::1", "[::1]:%d"))
+        for family, host, proxy in families:
+            server = socket.socket(family, socket.SOCK_STREAM)
+            server.bind((host, 0))
+            server.listen(1)
+            thread = Thread(target=_serveHead, args=(server,))
+            thread.daemon = True
+            thread.start()
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                status, _ = loop.run_until_complete(
+                    _head(proxy % server.getsockname()[1], urlparse("http://example.com/")))
+            finally:
+                loop.close()
+                server.close()
+            assert status == 200, (proxy, status)
+    print("validators ok!")
+
+
+def _echoServer(body):
+    # 模拟echo接口: 对每个请求返回固定的json
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(5)
+    content = json.dumps(body).encode("utf-8")
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.error:
+                return
+            data = b""
+            while b"\r\n\r\n" not in data:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                         b"Content-Length: " + str(len(content)).encode() + b"\r\n\r\n" + content)
+            conn.close()
+    thread = Thread(target=serve)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def _serveHead(server):
+    # 模拟代理: 读完请求头后返回200
+    conn, _ = server.accept()
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = conn.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+    conn.close()
+
+
+if __name__ == '__main__':
+    testValidators()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     testWebRequest
+   Description :
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18:
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import shutil
+import tempfile
+
+from requests.models import Response
+
+from util.webRequest import PageCache, FixtureStore, WebRequest, fixtures, resetPageStats, pageStats, REPLAY
+
+
+def _response(status_code, content=b"", headers=None):
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
+def testWebRequest():
+    """
+    test PageCache/FixtureStore
+    :return:
+    """
+    cache = PageCache()
+    url = "http://example.com/proxy"
+    assert cache.conditionalHeader(url, 60) == {}
+    assert not cache.update(url, _response(200, b"page1", {"ETag": '"v1"'}), 60)
+    assert cache.conditionalHeader(url, 60) == {"If-None-Match": '"v1"'}
+    # 304 及内容相同均视为未变化
+    assert cache.update(url, _response(304), 60)
+    assert cache.update(url, _response(200, b"page1"), 60)
+    assert not cache.update(url, _response(200, b"page2", {"Last-Modified": "Sun, 18 Oct 2026 00:00:00 GMT"}), 60)
+    assert cache.conditionalHeader(url, 60) == {"If-Modified-Since": "Sun, 18 Oct 2026 00:00:00 GMT"}
+    # 请求失败不影响缓存
+    assert not cache.update(url, _response(503), 60)
+    assert cache.update(url, _response(200, b"page2"), 60)
+    # 缓存过期后不再发送条件请求, 也不视为未变化
+    assert cache.conditionalHeader(url, -1) == {}
+    assert not cache.update(url, _response(304), -1)
+    print("PageCache ok!")
+
+    directory = tempfile.mkdtemp()
+    try:
+        url = "http://example.com:8080/free?page=1"
+        page = b"<table><tr><td>1.2.3.4</td><td>80</td></tr></table>"
+        store = FixtureStore()
+        store.use(REPLAY, directory)
+        store.save(url, _response(200, page, {"Content-Type": "text/html", "Content-Encoding": "gzip"}))
+        # 回放不访问网络, 结果与录制时一致; 未录制的url返回空响应
+        fixtures.use(REPLAY, directory)
+        resetPageStats()
+        request = WebRequest().get("http://example.com:8080/free", params={"page": 1})
+        assert request.replayed and request.response.content == page
+        assert request.response.headers.get("Content-Type") == "text/html"
+        assert "Content-Encoding" not in request.response.headers
+        assert request.tree.xpath("//td/text()") == ["1.2.3.4", "80"]
+        request = WebRequest().get("http://example.com:8080/free?page=2")
+        assert request.replayed and not request.response.content
+        assert pageStats() == (1, 0)
+        print("FixtureStore ok!")
+    finally:
+        fixtures.use(None)
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    testWebRequest()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     asyncValidators
+   Description :   validator的asyncio实现, 仅async校验模式下加载(需Python3)
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: timeOutValidator异步实现
+                   2026/10/18: 支持IPv6代理
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import ssl
+import socket
+import asyncio
+
+from util.six import urlparse
+from util.proxyCodec import splitProxy
+from util.validators import asyncValidator, timeOutValidator, conf
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.1; WOW64; rv:34.0) Gecko/20100101 Firefox/34.0',
+           'Accept': '*/*',
+           'Connection': 'close',
+           'Accept-Language': 'zh-CN,zh;q=0.8'}
+
+# 与timeOutValidator的verify=False保持一致, 不校验证书
+_ssl_context = ssl.create_default_context()
+_ssl_context.check_hostname = False
+_ssl_context.verify_mode = ssl.CERT_NONE
+
+
+async def _readHeader(loop, sock):
+    """
+    读取响应头, 返回状态码
+    :param loop: event loop
+    :param sock: non-blocking socket
+    :return: status code
+    """
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = await loop.sock_recv(sock, 4096)
+        if not chunk:
+            break
+        data += chunk
+    status_line = data.split(b"\r\n", 1)[0].split()
+    return int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+
+
+async def _head(proxy, url):
+    """
+    通过代理向url发送HEAD请求, https经CONNECT隧道后再握手
+    :param proxy: ip:port 或 [ipv6]:port
+    :param url: urlparse result
+    :return: status code, ttfb (ms)
+    """
+    loop = asyncio.get_event_loop()
+    host, port = splitProxy(proxy)
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    writer = None
+    try:
+        start = loop.time()
+        await loop.sock_connect(sock, (host, int(port)))
+        if url.scheme == "https":
+            target = "%s:%s" % (url.hostname, url.port or 443)
+            await loop.sock_sendall(sock, ("CONNECT {0} HTTP/1.1\r\nHost: {0}\r\n\r\n".format(target)).encode())
+            if await _readHeader(loop, sock) != 200:
+                return 0, None
+            reader, writer = await asyncio.open_connection(sock=sock, ssl=_ssl_context,
+                                                           server_hostname=url.hostname)
+            path = url.path or "/"
+            if url.query:
+                path = "%s?%s" % (path, url.query)
+        else:
+            reader, writer = await asyncio.open_connection(sock=sock)
+            path = url.geturl()
+        lines = ["HEAD %s HTTP/1.1" % path, "Host: %s" % url.netloc]
+        lines.extend("%s: %s" % (key, value) for key, value in HEADERS.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        status_line = (await reader.readline()).split()
+        ttfb = loop.time() - start
+        status = int(status_line[1]) if len(status_line) > 1 and status_line[1].isdigit() else 0
+        return status, int(ttfb * 1000)
+    finally:
+        # socket交给transport后由writer负责关闭
+        if writer:
+            writer.close()
+        else:
+            sock.close()
+
+
+@asyncValidator(timeOutValidator)
+async def asyncTimeOutValidator(proxy):
+    """
+    检测超时, timeOutValidator的asyncio实现
+    :param proxy:
+    :return:
+    """
+    try:
+        status, ttfb = await asyncio.wait_for(_head(proxy, urlparse(conf.verifyUrl)), timeout=conf.verifyTimeout)
+        if status == 200:
+            return {"ttfb": ttfb}
+    except Exception as e:
+        pass
+    return False
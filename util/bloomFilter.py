@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     bloomFilter
+   Description :   Bloom filter及按时间轮换的Bloom filter
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: Bloom filter
+                   2026/10/18: 支持整数及bytes元素
+                   2026/10/18: 轮换时在锁外填充新的当前代, 填充成功后再替换
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import math
+import struct
+from time import time
+from hashlib import md5
+from threading import Lock, Condition
+
+_UINT64X2 = struct.Struct("<QQ")
+_UINT64 = struct.Struct("<Q")
+
+
+class BloomFilter(object):
+    """
+    Bloom filter: capacity个元素时误判率约为error_rate, 不会漏判;
+    位数组大小 m = -n*ln(p)/ln(2)^2, 哈希次数 k = m/n*ln(2), 由一次md5摘要双重哈希得到k个位置;
+    元素可以是字符串、bytes或64位以内的非负整数
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(1, int(capacity))
+        self.size = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, int(round(float(self.size) / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __positions(self, key):
+        if isinstance(key, bytes):
+            data = key
+        elif isinstance(key, int) or type(key).__name__ == "long":
+            data = _UINT64.pack(key)
+        else:
+            data = key.encode("utf-8")
+        h1, h2 = _UINT64X2.unpack(md5(data).digest())
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self.__positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+
+class RotatingBloomFilter(object):
+    """
+    按时间轮换的Bloom filter, 内存占用固定, 每代元素超过capacity时误判率会升高:
+        新元素加入当前代, 查询时检查当前代和上一代;
+        每隔ttl秒当前代变为上一代, 上一代丢弃, 元素在加入后ttl~2*ttl秒内可查到;
+        轮换时先创建新的一代并调用on_rotate(filter)补充需要长期保留的元素, 成功后才替换当前代;
+        on_rotate在锁外由一个线程执行, 期间其他线程继续使用原来的两代, 抛出异常时不轮换, 下次调用时重试.
+    """
+
+    def __init__(self, capacity, ttl, error_rate=0.01, on_rotate=None):
+        """
+        :param capacity: 每代容量
+        :param ttl: 轮换间隔(秒)
+        :param error_rate: 每代达到容量时的误判率
+        :param on_rotate: 轮换时的回调, 参数为新的一代
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.error_rate = error_rate
+        self.on_rotate = on_rotate
+        self._lock = Lock()
+        self._cond = Condition(self._lock)
+        self._current = None
+        self._previous = None
+        self._rotated_at = 0
+        self._rotating = False
+
+    def __rotate(self):
+        with self._cond:
+            # 第一代填充完成前没有可用的filter, 需等待
+            while self._current is None and self._rotating:
+                self._cond.wait()
+            if self._rotating or (self._current is not None and time() - self._rotated_at < self.ttl):
+                return
+            self._rotating = True
+        bloom, seeded = BloomFilter(self.capacity, self.error_rate), False
+        try:
+            if self.on_rotate is not None:
+                self.on_rotate(bloom)
+            seeded = True
+        finally:
+            with self._cond:
+                if seeded:
+                    self._previous, self._current = self._current, bloom
+                    self._rotated_at = time()
+                self._rotating = False
+                self._cond.notify_all()
+
+    def add(self, key):
+        self.__rotate()
+        with self._lock:
+            self._current.add(key)
+
+    def __contains__(self, key):
+        self.__rotate()
+        with self._lock:
+            return key in self._current or (self._previous is not None and key in self._previous)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     circuitBreaker
+   Description :   代理源请求熔断, 按host记录连续失败, 失败过多的代理源在冷却期内直接跳过
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 代理源熔断
+                   2026/10/18: 失败后记录下次重试时间, 不再阻塞等待重试
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+from time import time
+from threading import Lock
+
+from handler.configHandler import ConfigHandler
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker(object):
+    """
+    单个host的熔断器:
+        closed: 正常请求, 失败后retry_delay秒内的请求直接跳过, 到时间后再重试; 连续失败threshold次后进入open;
+        open: 冷却期内的请求直接跳过, 冷却期结束后进入half_open;
+        half_open: 只放行一个探测请求, 成功则恢复closed, 失败则重新open且冷却期加倍(不超过cooldown_max).
+    """
+
+    def __init__(self, host, threshold, cooldown, cooldown_max):
+        self.host = host
+        self.threshold = max(1, int(threshold))
+        self.base_cooldown = cooldown
+        self.cooldown_max = max(cooldown, cooldown_max)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0
+        # closed状态下失败后的下次重试时间
+        self.retry_at = 0
+        self._probing = False
+        self._lock = Lock()
+
+    def allow(self):
+        """
+        是否允许发起请求, closed状态下未到重试时间时不允许, open冷却期结束后第一个调用者作为half_open探测请求
+        :return: True/False
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return time() >= self.retry_at
+            if self.state == OPEN and time() >= self.open_until:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.retry_at = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def failure(self, retry_delay=0):
+        """
+        记录一次失败
+        :param retry_delay: 未熔断时, retry_delay秒后才允许重试, 期间该host的请求直接跳过
+        :return:
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.cooldown_max)
+                self.__open()
+            elif self.state == CLOSED:
+                if self.failures >= self.threshold:
+                    self.__open()
+                else:
+                    self.retry_at = max(self.retry_at, time() + retry_delay)
+
+    def __open(self):
+        self.state = OPEN
+        self.open_until = time() + self.cooldown
+        self.retry_at = 0
+        self._probing = False
+
+    def status(self):
+        """
+        熔断器状态
+        :return: dict
+        """
+        with self._lock:
+            status = {"state": self.state, "failures": self.failures}
+            if self.state != CLOSED:
+                status["open_until"] = int(self.open_until)
+            elif self.retry_at > time():
+                status["retry_at"] = int(self.retry_at)
+            return status
+
+
+class CircuitBreakerRegistry(object):
+    """ 按host管理熔断器 """
+
+    def __init__(self):
+        self.__breakers = dict()
+        self.__lock = Lock()
+
+    def get(self, host):
+        with self.__lock:
+            breaker = self.__breakers.get(host)
+            if breaker is None:
+                conf = ConfigHandler()
+                breaker = CircuitBreaker(host, conf.breakerThreshold, conf.breakerCooldown, conf.breakerCooldownMax)
+                self.__breakers[host] = breaker
+            return breaker
+
+    def status(self):
+        """
+        各host熔断器状态
+        :return: {host: status}
+        """
+        with self.__lock:
+            breakers = list(self.__breakers.values())
+        return dict((breaker.host, breaker.status()) for breaker in breakers)
+
+    def clear(self):
+        with self.__lock:
+            self.__breakers.clear()
+
+
+breakers = CircuitBreakerRegistry()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     concurrencyController
+   Description :   校验并发数自适应控制(AIMD)
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 校验并发数自适应控制
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import os
+from threading import Condition
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def fdLimit():
+    """
+    当前进程可打开的文件描述符上限, 无法获取时返回None
+    :return:
+    """
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return soft if soft > 0 else None
+
+
+def fdHeadroom():
+    """
+    当前进程剩余可用文件描述符比例, 无法获取时返回None
+    :return: 0~1 or None
+    """
+    soft = fdLimit()
+    if soft is None or not os.path.isdir("/proc/self/fd"):
+        return None
+    return 1 - float(len(os.listdir("/proc/self/fd"))) / soft
+
+
+class ConcurrencyController(object):
+    """
+    AIMD并发控制:
+        每完成一轮(当前并发数个)校验统计一次超时率与平均延迟;
+        超时率或平均延迟明显高于基线、或文件描述符余量不足时并发数乘性减少;
+        否则加性增加, 首次拥塞前按慢启动翻倍增长;
+        并发数始终在[floor, ceiling]区间内.
+    """
+
+    increase_step = 10
+    decrease_factor = 0.7
+    timeout_tolerance = 0.15
+    latency_tolerance = 2.0
+    min_fd_headroom = 0.2
+
+    def __init__(self, floor, ceiling, timeout):
+        """
+        :param floor: 最小并发数
+        :param ceiling: 最大并发数
+        :param timeout: 校验超时时间(秒), 失败且耗时达到该值的校验计为超时
+        """
+        self.floor = max(1, int(floor))
+        self.ceiling = max(self.floor, int(ceiling))
+        self.timeout = float(timeout)
+        self._limit = self.floor
+        self._in_flight = 0
+        self._slow_start = True
+        self._samples = []
+        self._base_timeout_rate = None
+        self._base_latency = None
+        self._cond = Condition()
+
+    @property
+    def limit(self):
+        """ 当前并发数 """
+        return self._limit
+
+    @property
+    def in_flight(self):
+        """ 进行中的校验数 """
+        return self._in_flight
+
+    def acquire(self):
+        """
+        阻塞直到进行中的校验数低于当前并发数
+        :return:
+        """
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def tryAcquire(self):
+        """
+        非阻塞获取校验名额
+        :return: True/False
+        """
+        with self._cond:
+            if self._in_flight >= self._limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, elapsed=None, status=True):
+        """
+        归还校验名额并记录本次校验结果
+        :param elapsed: 校验耗时(秒), None表示未进行校验
+        :param status: 校验是否通过
+        :return: 并发数有变化时返回新的并发数, 否则返回None
+        """
+        with self._cond:
+            self._in_flight -= 1
+            changed = None
+            if elapsed is not None:
+                self._samples.append((elapsed, not status and elapsed >= self.timeout))
+            if len(self._samples) >= max(10, self._limit):
+                changed = self.__adjust()
+            self._cond.notify_all()
+            return changed
+
+    def __adjust(self):
+        samples, self._samples = self._samples, []
+        timeout_rate = float(sum(1 for _, timeout in samples if timeout)) / len(samples)
+        latencies = [elapsed for elapsed, timeout in samples if not timeout]
+        latency = sum(latencies) / len(latencies) if latencies else None
+
+        congested = False
+        headroom = fdHeadroom()
+        if headroom is not None and headroom < self.min_fd_headroom:
+            congested = True
+        if self._base_timeout_rate is not None and timeout_rate > self._base_timeout_rate + self.timeout_tolerance:
+            congested = True
+        if latency and self._base_latency and latency > self._base_latency * self.latency_tolerance:
+            congested = True
+
+        old_limit = self._limit
+        if congested:
+            self._slow_start = False
+            self._limit = max(self.floor, int(self._limit * self.decrease_factor))
+        else:
+            # 基线只由未拥塞的轮次更新, 避免拥塞时基线被拉高
+            self._base_timeout_rate = timeout_rate if self._base_timeout_rate is None \
+                else 0.8 * self._base_timeout_rate + 0.2 * timeout_rate
+            if latency:
+                self._base_latency = latency if self._base_latency is None \
+                    else 0.8 * self._base_latency + 0.2 * latency
+            if self._slow_start:
+                self._limit = min(self.ceiling, self._limit * 2)
+            else:
+                self._limit = min(self.ceiling, self._limit + self.increase_step)
+        return self._limit if self._limit != old_limit else None
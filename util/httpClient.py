@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     httpClient
+   Description :   采集与校验共用的HTTP客户端
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 连接池复用、DNS缓存、TLS context复用
+                   2026/10/18: DNS缓存只用于HttpClient的连接, 不再替换socket.getaddrinfo
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import ssl
+import socket
+from time import time
+from threading import Lock, local
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3._collections import RecentlyUsedContainer
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.packages.urllib3.util.connection import allowed_gai_family
+
+from handler.configHandler import ConfigHandler
+
+requests.packages.urllib3.disable_warnings()
+
+conf = ConfigHandler()
+
+
+class DnsCache(object):
+    """
+    域名解析结果缓存, IP地址不缓存; 只用于HttpClient建立的连接, 不影响进程内其他的域名解析
+    """
+
+    max_size = 1024
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._cache = dict()
+        self._lock = Lock()
+        self._getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(self, host, port, *args, **kwargs):
+        if not host or self.__isIp(host):
+            return self._getaddrinfo(host, port, *args, **kwargs)
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        now = time()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        result = self._getaddrinfo(host, port, *args, **kwargs)
+        with self._lock:
+            if len(self._cache) >= self.max_size:
+                self._cache.clear()
+            self._cache[key] = (now + self.ttl, result)
+        return result
+
+    def resolve(self, host, port):
+        """
+        解析域名, 用于建立连接
+        :param host:
+        :param port:
+        :return: 解析结果中的第一个地址, host为IP或解析失败时返回None
+        """
+        if not host or self.__isIp(host):
+            return None
+        try:
+            result = self.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.error:
+            return None
+        return result[0][4][0] if result else None
+
+    @staticmethod
+    def __isIp(host):
+        if isinstance(host, bytes):
+            host = host.decode("idna")
+        for family in (socket.AF_INET, socket.AF_INET6):
+            try:
+                socket.inet_pton(family, host)
+                return True
+            except (socket.error, ValueError):
+                continue
+        return False
+
+
+def _newConn(conn, connection_cls):
+    # 连接建立期间把要解析的域名换成缓存的地址, Host头及TLS的SNI仍使用原域名
+    dns_host = conn._dns_host
+    address = conn.dns_cache.resolve(dns_host, conn.port)
+    if address is None:
+        return connection_cls._new_conn(conn)
+    conn._dns_host = address
+    try:
+        return connection_cls._new_conn(conn)
+    finally:
+        conn._dns_host = dns_host
+
+
+class CachedDnsHTTPConnection(HTTPConnection):
+    dns_cache = None
+
+    def _new_conn(self):
+        return _newConn(self, HTTPConnection)
+
+
+class CachedDnsHTTPSConnection(HTTPSConnection):
+    dns_cache = None
+
+    def _new_conn(self):
+        return _newConn(self, HTTPSConnection)
+
+
+def cachedDnsPoolClasses(dns_cache):
+    """
+    使用dns_cache解析域名的连接池类
+    :param dns_cache: DnsCache
+    :return: {scheme: ConnectionPool class}, 用作PoolManager.pool_classes_by_scheme
+    """
+    http_connection = type("CachedDnsHTTPConnection", (CachedDnsHTTPConnection,), {"dns_cache": dns_cache})
+    https_connection = type("CachedDnsHTTPSConnection", (CachedDnsHTTPSConnection,), {"dns_cache": dns_cache})
+    return {"http": type("CachedDnsHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http_connection}),
+            "https": type("CachedDnsHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": https_connection})}
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    连接池有上限的HTTPAdapter:
+        requests按代理缓存ProxyManager且没有上限, 校验大量代理时会持续增长, 这里改为LRU, 淘汰时关闭其连接;
+        指定ssl_context时所有连接复用同一TLS context;
+        指定dns_cache时连接(包括经http代理的连接)使用缓存的域名解析结果, 只连接解析结果中的第一个地址.
+    """
+
+    def __init__(self, pool_size, ssl_context=None, dns_cache=None):
+        # HTTPAdapter.__init__中会调用init_poolmanager
+        self.ssl_context = ssl_context
+        self.pool_classes = cachedDnsPoolClasses(dns_cache) if dns_cache is not None else None
+        self._proxy_lock = Lock()
+        HTTPAdapter.__init__(self, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.proxy_manager = RecentlyUsedContainer(pool_size, dispose_func=lambda manager: manager.clear())
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.ssl_context is not None:
+            kwargs["ssl_context"] = self.ssl_context
+        HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+        if self.pool_classes is not None:
+            self.poolmanager.pool_classes_by_scheme = self.pool_classes
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if self.ssl_context is not None:
+            proxy_kwargs["ssl_context"] = self.ssl_context
+        with self._proxy_lock:
+            manager = HTTPAdapter.proxy_manager_for(self, proxy, **proxy_kwargs)
+        # socks代理使用自己的连接池类
+        if self.pool_classes is not None and not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = self.pool_classes
+        return manager
+
+    def close(self):
+        self.poolmanager.clear()
+        self.proxy_manager.clear()
+
+
+class HttpClient(object):
+    """
+    线程安全的HTTP客户端: 每个线程使用各自的Session(cookie等状态不共享), 所有线程共用同一个PooledAdapter
+    """
+
+    def __init__(self, verify=True, trust_env=True, dns_cache=None):
+        """
+        :param verify: 是否校验证书, 不校验时所有连接复用同一个不校验证书的TLS context
+        :param trust_env: 是否读取环境变量中的代理等设置
+        :param dns_cache: DnsCache, 为None时不缓存域名解析结果
+        """
+        self.verify = verify
+        self.trust_env = trust_env
+        ssl_context = None
+        if not verify:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        self.adapter = PooledAdapter(conf.httpPoolSize, ssl_context, dns_cache)
+        self._local = local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.verify = self.verify
+            session.trust_env = self.trust_env
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def head(self, url, **kwargs):
+        # 与requests.head一致, 默认不跟随跳转
+        kwargs.setdefault("allow_redirects", False)
+        return self.request("HEAD", url, **kwargs)
+
+
+# 采集与校验共用的DNS缓存
+dns_cache = DnsCache(conf.dnsCacheTtl) if conf.dnsCacheTtl > 0 else None
+# 采集使用, 与requests.get行为一致
+web_client = HttpClient(dns_cache=dns_cache)
+# 校验使用, 代理由参数指定且不校验证书
+verify_client = HttpClient(verify=False, trust_env=False, dns_cache=dns_cache)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     proxyCodec
+   Description :   ip:port与紧凑表示之间的转换
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: ip:port紧凑表示
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import socket
+import struct
+
+# IPv4 ip:port 打包为48位整数 (ip << 16) | port; IPv6 [ip]:port 打包为18字节 ip(16) + port(2)
+_IPV4 = struct.Struct("!I")
+_PORT = struct.Struct("!H")
+IPV6_SIZE = 18
+
+
+def _inetPton(family, host):
+    if hasattr(socket, "inet_pton"):
+        return socket.inet_pton(family, host)
+    # Windows Python2没有inet_pton, 只支持IPv4
+    parts = host.split(".")
+    if family != socket.AF_INET or len(parts) != 4 or \
+            not all(part.isdigit() and len(part) <= 3 and int(part) <= 255 for part in parts):
+        raise ValueError(host)
+    return struct.pack("4B", *map(int, parts))
+
+
+def packProxy(proxy):
+    """
+    解析ip:port, 严格校验格式: IPv4为点分十进制(不允许前导0), IPv6需用[]括起, 端口1~65535
+    :param proxy: ip:port 或 [ipv6]:port
+    :return: IPv4返回int, IPv6返回18字节bytes, 格式不正确返回None
+    """
+    host, sep, port = proxy.rpartition(":")
+    if not sep or not port.isdigit() or len(port) > 5:
+        return None
+    port = int(port)
+    if not 0 < port < 65536:
+        return None
+    try:
+        if host.startswith("[") and host.endswith("]"):
+            return _inetPton(socket.AF_INET6, host[1:-1]) + _PORT.pack(port)
+        return _IPV4.unpack(_inetPton(socket.AF_INET, host))[0] << 16 | port
+    except (socket.error, ValueError):
+        return None
+
+
+def unpackProxy(packed):
+    """
+    packProxy的逆操作
+    :param packed: int 或 18字节bytes
+    :return: ip:port 或 [ipv6]:port
+    """
+    if isinstance(packed, bytes) and len(packed) == IPV6_SIZE:
+        return "[%s]:%d" % (socket.inet_ntop(socket.AF_INET6, packed[:16]), _PORT.unpack(packed[16:])[0])
+    return "%s:%d" % (socket.inet_ntoa(_IPV4.pack(packed >> 16)), packed & 0xFFFF)
+
+
+def splitProxy(proxy):
+    """
+    拆分ip:port, IPv6地址去掉[]
+    :param proxy: ip:port 或 [ipv6]:port
+    :return: (host, port)
+    """
+    host, _, port = proxy.rpartition(":")
+    if host.startswith("[") and host.endswith("]"):
+        host = host[1:-1]
+    return host, int(port)
+
+
+def packedHost(packed):
+    """
+    打包后代理的IPv4地址整数
+    :param packed:
+    :return: int, IPv6返回None
+    """
+    return None if isinstance(packed, bytes) else packed >> 16
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+-------------------------------------------------
+   File Name：     regionLookup
+   Description :   基于本地IP段数据库的离线地区查询
+   Author :        JHao
+   date：          2026/10/18
+-------------------------------------------------
+   Change Activity:
+                   2026/10/18: 离线地区查询
+                   2026/10/18: 使用proxyCodec解析代理地址
+-------------------------------------------------
+"""
+__author__ = 'JHao'
+
+import io
+import mmap
+import socket
+import struct
+from array import array
+from bisect import bisect_right
+from threading import Lock
+
+from util.six import PY3
+from util.proxyCodec import packProxy, packedHost
+from handler.logHandler import LogHandler
+from handler.configHandler import ConfigHandler
+
+INDEX_MAGIC = b"PPRG"
+# magic, 段数, 地区名字节数
+_HEADER = struct.Struct("<4sII")
+
+
+def ipToInt(ip):
+    """
+    IPv4地址转为整数
+    :param ip: 点分十进制或整数字符串
+    :return: int
+    """
+    ip = ip.strip()
+    if ip.isdigit():
+        return int(ip)
+    return struct.unpack("!I", socket.inet_aton(ip))[0]
+
+
+def _readCsv(csv_path):
+    """
+    读取IP段CSV文件, 每行 起始IP,结束IP,地区, #开头为注释
+    :param csv_path:
+    :return: 按起始IP排序的 [(start, end, region)]
+    """
+    ranges = list()
+    with io.open(csv_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            start, end, region = line.split(",", 2)
+            ranges.append((ipToInt(start), ipToInt(end), region.strip()))
+    ranges.sort()
+    return ranges
+
+
+def compileIndex(csv_path, index_path):
+    """
+    将IP段CSV文件编译为二进制索引, 大型数据库可通过mmap加载, 无需在内存中解析
+    索引格式: 头部 | 起始IP uint32[n] | 结束IP uint32[n] | 地区序号 uint32[n] | 地区名(换行分隔), 整数为本机字节序
+    :param csv_path: CSV文件
+    :param index_path: 索引文件
+    :return: 段数
+    """
+    ranges = _readCsv(csv_path)
+    regions, region_ids = list(), dict()
+    starts, ends, ids = array("I"), array("I"), array("I")
+    for start, end, region in ranges:
+        if region not in region_ids:
+            region_ids[region] = len(regions)
+            regions.append(region)
+        starts.append(start)
+        ends.append(end)
+        ids.append(region_ids[region])
+    names = "\n".join(regions).encode("utf-8")
+    with open(index_path, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, len(ranges), len(names)))
+        for values in (starts, ends, ids):
+            f.write(values.tobytes() if PY3 else values.tostring())
+        f.write(names)
+    return len(ranges)
+
+
+class RegionDatabase(object):
+    """
+    IP段地区数据库:
+        CSV文件加载为按起始IP排序的整数数组, 查询时二分查找;
+        compileIndex生成的二进制索引通过mmap加载, 直接在映射的内存上二分查找.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = None
+        with open(path, "rb") as f:
+            is_index = f.read(len(INDEX_MAGIC)) == INDEX_MAGIC
+        if is_index:
+            self.__loadIndex(path)
+        else:
+            self.__loadCsv(path)
+
+    def __loadCsv(self, path):
+        self.regions, region_ids = list(), dict()
+        self.starts, self.ends, self.ids = array("I"), array("I"), array("I")
+        for start, end, region in _readCsv(path):
+            if region not in region_ids:
+                region_ids[region] = len(self.regions)
+                self.regions.append(region)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.ids.append(region_ids[region])
+
+    def __loadIndex(self, path):
+        with open(path, "rb") as f:
+            _, count, names_size = _HEADER.unpack(f.read(_HEADER.size))
+            size = array("I").itemsize * count
+            if PY3:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                view = memoryview(self._mmap)
+                offset = _HEADER.size
+                self.starts = view[offset:offset + size].cast("I")
+                self.ends = view[offset + size:offset + size * 2].cast("I")
+                self.ids = view[offset + size * 2:offset + size * 3].cast("I")
+                names = bytes(view[offset + size * 3:offset + size * 3 + names_size])
+            else:
+                self.starts, self.ends, self.ids = array("I"), array("I"), array("I")
+                for values in (self.starts, self.ends, self.ids):
+                    values.fromfile(f, count)
+                names = f.read(names_size)
+        self.regions = names.decode("utf-8").split("\n") if names else []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lookup(self, ip):
+        """
+        查询IP所属地区
+        :param ip: IPv4地址
+        :return: 地区, 未找到返回""
+        """
+        try:
+            value = ipToInt(ip)
+        except (socket.error, ValueError):
+            return ""
+        return self.lookupInt(value)
+
+    def lookupInt(self, value):
+        """
+        按整数形式的IPv4地址查询所属地区
+        :param value: int
+        :return: 地区, 未找到返回""
+        """
+        index = bisect_right(self.starts, value) - 1
+        if index >= 0 and value <= self.ends[index]:
+            return self.regions[self.ids[index]]
+        return ""
+
+
+_database = None
+_database_lock = Lock()
+
+
+def lookupRegion(proxy):
+    """
+    查询代理所属地区, 未配置REGION_DB或非IPv4代理时返回""
+    :param proxy: ip:port
+    :return: 地区
+    """
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                path = ConfigHandler().regionDb
+                database = False
+                if path:
+                    try:
+                        database = RegionDatabase(path)
+                        LogHandler("checker").info("RegionLookup - load {} ranges from {}".format(len(database),
+                                                                                                 path))
+                    except Exception as e:
+                        LogHandler("checker").error("RegionLookup - load {} error: {}".format(path, e))
+                _database = database
+    if not _database:
+        return ""
+    packed = packProxy(proxy)
+    host = packedHost(packed) if packed is not None else None
+    return _database.lookupInt(host) if host is not None else ""
@@ -35,9 +35,15 @@ else:
     reload_six = reload
 
 if PY3:
-    from queue import Empty, Queue
+    from queue import Empty, Full, Queue
 else:
-    from Queue import Empty, Queue
+    from Queue import Empty, Full, Queue
+
+if PY3:
+    from asyncio import iscoroutinefunction
+else:
+    def iscoroutinefunction(func):
+        return False
 
 
 def withMetaclass(meta, *bases):
@@ -1,31 +1,132 @@
 # -*- coding: utf-8 -*-
 
-import requests
-from re import findall
+from time import time
+from threading import Lock, Event
+from collections import defaultdict
+from util.httpClient import verify_client
+from util.proxyCodec import packProxy
+from helper.proxy import PROXY_TYPES
 from handler.configHandler import ConfigHandler
 
 conf = ConfigHandler()
+
+# validator返回值为真即视为通过; 返回dict时其中的已知检测数据(helper/check.py METRIC_ATTRS: ttfb单位ms, type匿名度)会更新到代理属性
+# 执行validator前已经过TCP连接预检(helper/preCheck.py), connect_time由预检记录
+# validators按cost从小到大排列, 依次执行, 任一validator不通过即停止
 validators = []
 
+DEFAULT_COST = 100
+
+
+def validator(func=None, cost=DEFAULT_COST, ttl=0):
+    """
+    注册validator, 可直接用作装饰器, 也可指定参数 @validator(cost=1000)
+    validator可以是普通函数, 也可以是async函数(需Python3)
+    :param func: validator函数
+    :param cost: 相对开销, 开销小的先执行
+    :param ttl: 结果缓存时间(秒), 同一ip:port在ttl内直接使用上次结果, 0为不缓存
+    :return:
+    """
+
+    def decorator(f):
+        f.cost = cost
+        f.ttl = ttl
+        validators.append(f)
+        validators.sort(key=lambda v: v.cost)
+        return f
+
+    return decorator(func) if callable(func) else decorator
+
+
+class ValidatorRecorder(object):
+    """
+    validator结果缓存及计数, 计数包括: 执行次数(calls)、缓存命中次数(cache_hits)、不通过次数(rejects)、执行耗时(time_ms)
+    """
+
+    MISS = object()
+    max_cache_size = 65536
+
+    def __init__(self):
+        self._cache = dict()
+        self._counters = defaultdict(float)
+        self._lock = Lock()
+
+    def lookup(self, func, proxy):
+        """
+        查询缓存的validator结果
+        :param func: validator
+        :param proxy: ip:port
+        :return: 缓存的结果, 未缓存或已过期返回MISS
+        """
+        if not getattr(func, "ttl", 0):
+            return self.MISS
+        with self._lock:
+            cached = self._cache.get((func.__name__, proxy))
+            if cached is None or cached[0] <= time():
+                return self.MISS
+            self._counters["validator_%s_cache_hits" % func.__name__] += 1
+            if not cached[1]:
+                self._counters["validator_%s_rejects" % func.__name__] += 1
+            return cached[1]
 
-def validator(func):
-    validators.append(func)
-    return func
+    def record(self, func, proxy, result, elapsed):
+        """
+        记录validator执行结果
+        :param func: validator
+        :param proxy: ip:port
+        :param result: validator返回值
+        :param elapsed: 执行耗时(秒)
+        :return:
+        """
+        name = func.__name__
+        with self._lock:
+            self._counters["validator_%s_calls" % name] += 1
+            self._counters["validator_%s_time_ms" % name] += elapsed * 1000
+            if not result:
+                self._counters["validator_%s_rejects" % name] += 1
+            if getattr(func, "ttl", 0):
+                if len(self._cache) >= self.max_cache_size:
+                    self._cache.clear()
+                self._cache[(name, proxy)] = (time() + func.ttl, result)
 
+    def drain(self):
+        """
+        取出并清零计数
+        :return: dict {field: count}
+        """
+        with self._lock:
+            counters, self._counters = self._counters, defaultdict(float)
+        return dict((key, int(value)) for key, value in counters.items() if int(value))
 
-@validator
+
+recorder = ValidatorRecorder()
+
+
+def asyncValidator(sync_func):
+    """
+    为已注册的同步validator提供asyncio实现, async校验模式下替代同步函数执行
+    :param sync_func: 已注册的同步validator
+    :return:
+    """
+
+    def decorator(func):
+        sync_func.async_func = func
+        return func
+
+    return decorator
+
+
+@validator(cost=1, ttl=86400)
 def formatValidator(proxy):
     """
-    检查代理格式
+    检查代理格式, ip:port 或 [ipv6]:port
     :param proxy:
     :return:
     """
-    verify_regex = r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d{1,5}"
-    _proxy = findall(verify_regex, proxy)
-    return True if len(_proxy) == 1 and _proxy[0] == proxy else False
+    return packProxy(proxy) is not None
 
 
-@validator
+@validator(cost=100)
 def timeOutValidator(proxy):
     """
     检测超时
@@ -39,18 +140,146 @@ def timeOutValidator(proxy):
                'Connection': 'keep-alive',
                'Accept-Language': 'zh-CN,zh;q=0.8'}
     try:
-        r = requests.head(conf.verifyUrl, headers=headers, proxies=proxies, timeout=conf.verifyTimeout, verify=False)
+        r = verify_client.head(conf.verifyUrl, headers=headers, proxies=proxies, timeout=conf.verifyTimeout)
         if r.status_code == 200:
-            return True
+            return {"ttfb": int(r.elapsed.total_seconds() * 1000)}
     except Exception as e:
         pass
     return False
 
 
-@validator
+# 代理可能添加的转发头, 出现任一即不是高匿代理
+PROXY_HEADERS = ("via", "x-forwarded-for", "forwarded", "x-real-ip", "client-ip", "x-client-ip",
+                 "proxy-connection", "x-proxy-id")
+
+_real_ip = {"ip": None, "expire": 0, "refreshing": None}
+_real_ip_lock = Lock()
+
+
+def _isLocalIp(ip):
+    """
+    是否为回环、内网或链路本地地址
+    :param ip: IPv4或IPv6地址
+    :return: bool
+    """
+    packed = packProxy(("[%s]:1" if ":" in ip else "%s:1") % ip)
+    if packed is None:
+        return False
+    if isinstance(packed, int):
+        first, second = packed >> 40, packed >> 32 & 0xff
+        return first in (10, 127) or (first, second) in ((169, 254), (192, 168)) or \
+            (first == 172 and 16 <= second < 32) or (first == 100 and 64 <= second < 128)
+    packed = bytearray(packed[:16])
+    return packed == bytearray(15) + bytearray([1]) or packed[0] & 0xfe == 0xfc or \
+        (packed[0] == 0xfe and packed[1] & 0xc0 == 0x80)
+
+
+def _echoOrigin(url):
+    """
+    不经代理访问echo接口, 取请求来源IP
+    :param url: 返回 {"origin": ip} 的接口
+    :return: ip
+    """
+    r = verify_client.get(url, timeout=conf.verifyTimeout)
+    return r.json()["origin"].split(",")[0].strip()
+
+
+def realIp():
+    """
+    不经代理访问ANONYMITY_URL获取本机出口IP, 缓存1小时;
+    ANONYMITY_URL为本地/内网服务(如本项目的/echo/)时看到的是内网地址, 改由REAL_IP_URL获取公网出口IP;
+    由一个线程在锁外请求, 请求期间其他线程等待其结果
+    :return: ip, 获取失败返回None
+    """
+    with _real_ip_lock:
+        refreshing = _real_ip["refreshing"]
+        if refreshing is None:
+            if _real_ip["expire"] >= time():
+                return _real_ip["ip"]
+            refreshing = _real_ip["refreshing"] = Event()
+        else:
+            refreshing, waiting = None, refreshing
+    if refreshing is None:
+        waiting.wait(conf.verifyTimeout * 2 + 1)
+        return _real_ip["ip"]
+    ip, ttl = None, 60
+    try:
+        ip = _echoOrigin(conf.anonymityUrl)
+        if _isLocalIp(ip) and conf.realIpUrl:
+            ip = _echoOrigin(conf.realIpUrl)
+        ttl = 3600
+    except Exception as e:
+        ip = None
+    with _real_ip_lock:
+        _real_ip.update(ip=ip, expire=time() + ttl, refreshing=None)
+    refreshing.set()
+    return ip
+
+
+def _headerIps(value):
+    """
+    取出origin或转发头中的各个IP, 如 "1.1.1.1, 2.2.2.2"、"for=1.1.1.1;proto=http"、"for=\"[::1]:80\""
+    :param value: 头部的值
+    :return: set
+    """
+    ips = set()
+    for part in value.replace(";", ",").split(","):
+        part = part.strip()
+        if "=" in part:
+            key, part = part.split("=", 1)
+            if key.strip().lower() != "for":
+                continue
+        part = part.strip().strip('"')
+        if part.startswith("["):
+            part = part[1:].split("]", 1)[0]
+        elif part.count(":") == 1:
+            part = part.split(":", 1)[0]
+        if part:
+            ips.add(part)
+    return ips
+
+
+def classifyAnonymity(echo, real_ip):
+    """
+    根据echo接口收到的请求判断代理匿名度
+    :param echo: echo接口返回 {"origin": ip, "headers": {}}
+    :param real_ip: 本机出口IP
+    :return: transparent/anonymous/elite
+    """
+    transparent, anonymous, elite = PROXY_TYPES
+    headers = dict((key.lower(), value) for key, value in echo.get("headers", {}).items())
+    if real_ip in _headerIps(echo.get("origin", "")) or \
+            any(real_ip in _headerIps(headers.get(key, "")) for key in PROXY_HEADERS):
+        return transparent
+    if any(key in headers for key in PROXY_HEADERS):
+        return anonymous
+    return elite
+
+
+@validator(cost=500, ttl=3600)
+def anonymityValidator(proxy):
+    """
+    检测匿名度, 通过代理访问ANONYMITY_URL, 根据转发头判断; 未配置ANONYMITY_URL或检测失败时不影响校验结果
+    :param proxy:
+    :return:
+    """
+    if not conf.anonymityUrl:
+        return True
+    real_ip = realIp()
+    if not real_ip:
+        return True
+    proxies = {"http": "http://{proxy}".format(proxy=proxy), "https": "https://{proxy}".format(proxy=proxy)}
+    try:
+        r = verify_client.get(conf.anonymityUrl, proxies=proxies, timeout=conf.verifyTimeout)
+        return {"type": classifyAnonymity(r.json(), real_ip)}
+    except Exception as e:
+        return True
+
+
+@validator(cost=1000)
 def customValidator(proxy):
     """
-    自定义validator函数，校验代理是否可用
+    自定义validator函数，校验代理是否可用; 访问目标站点等开销较大的校验应设置较大的cost, 只对已通过其他校验的代理执行
     :param proxy:
     :return:
     """
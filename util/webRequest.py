@@ -8,27 +8,252 @@
 -------------------------------------------------
    Change Activity:
                    2017/7/31:
+                   2026/10/18: 使用共用的HTTP客户端复用连接
+                   2026/10/18: 条件请求及页面内容摘要缓存, 页面未变化时跳过解析
+                   2026/10/18: 按host熔断, 重试不再固定sleep
+                   2026/10/18: 代理源页面录制/回放
+                   2026/10/18: 共用logger, 页面请求计数可跨线程累加
+                   2026/10/18: 请求失败后不阻塞重试, 由熔断器记录重试时间
 -------------------------------------------------
 """
 __author__ = 'J_hao'
 
-from requests.models import Response
+from requests.models import Response, PreparedRequest
+from threading import Lock, local
+from hashlib import md5
 from lxml import etree
-import requests
 import random
+import json
 import time
+import os
 
 from handler.logHandler import LogHandler
+from handler.configHandler import ConfigHandler
+from util.httpClient import web_client
+from util.circuitBreaker import breakers
+from util.six import urlparse
 
-requests.packages.urllib3.disable_warnings()
+
+class PageCache(object):
+    """
+    代理源页面缓存, 按url记录ETag/Last-Modified及页面内容摘要:
+        缓存有效期内请求同一url时带上If-None-Match/If-Modified-Since;
+        返回304或页面内容摘要与上次相同时认为页面未变化;
+        缓存超过有效期后重新完整请求并解析一次, 避免页面长期被当作未变化.
+    """
+
+    def __init__(self):
+        self.__pages = dict()
+        self.__lock = Lock()
+
+    def conditionalHeader(self, key, ttl):
+        """
+        条件请求头, url无有效缓存时返回空dict
+        :param key: url
+        :param ttl: 缓存有效期(秒)
+        :return: dict
+        """
+        with self.__lock:
+            page = self.__pages.get(key)
+        if not page or time.time() - page["time"] > ttl:
+            return dict()
+        header = dict()
+        if page["etag"]:
+            header["If-None-Match"] = page["etag"]
+        if page["last_modified"]:
+            header["If-Modified-Since"] = page["last_modified"]
+        return header
+
+    def update(self, key, response, ttl):
+        """
+        根据响应更新缓存
+        :param key: url
+        :param response: requests Response
+        :param ttl: 缓存有效期(秒)
+        :return: 页面未变化返回True
+        """
+        now = time.time()
+        with self.__lock:
+            page = self.__pages.get(key)
+            if page and now - page["time"] > ttl:
+                page = None
+            if response.status_code == 304:
+                return page is not None
+            if response.status_code != 200:
+                return False
+            digest = md5(response.content).hexdigest()
+            if page and page["digest"] == digest:
+                return True
+            # 页面有变化, 缓存时间从本次完整解析开始计算
+            self.__pages[key] = {"etag": response.headers.get("ETag"),
+                                 "last_modified": response.headers.get("Last-Modified"),
+                                 "digest": digest,
+                                 "time": now}
+            for expired in [k for k, v in self.__pages.items() if now - v["time"] > ttl]:
+                del self.__pages[expired]
+            return False
+
+    def clear(self):
+        with self.__lock:
+            self.__pages.clear()
+
+
+page_cache = PageCache()
+
+ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class FixtureStore(object):
+    """
+    代理源页面录制/回放, 用于离线测试采集函数及测量解析性能:
+        record: 正常请求, 返回200的页面按url保存为 {目录}/{host}/{url摘要}.json(url、状态码、响应头) 及 .body(页面原文);
+        replay: 按url读取保存的页面, 不访问网络, 未录制的url返回空响应; 读取过的页面保留在内存中.
+    录制时不发送条件请求, 保证保存的是完整页面; 回放时不使用页面缓存及熔断, 同一组页面每次回放的解析结果相同.
+    """
+
+    # 页面原文已解压, 不保存这些响应头
+    skip_headers = ("content-encoding", "content-length", "transfer-encoding")
+
+    def __init__(self):
+        self.__mode = None
+        self.__directory = None
+        self.__pages = dict()
+        self.__lock = Lock()
+
+    def use(self, mode, directory=None):
+        """
+        指定录制/回放模式及目录, 覆盖FETCH_FIXTURE_MODE/FETCH_FIXTURE_DIR
+        :param mode: record/replay, 空字符串表示正常请求, None表示恢复使用配置
+        :param directory: 页面保存目录
+        :return:
+        """
+        with self.__lock:
+            self.__mode = mode
+            self.__directory = directory
+            self.__pages.clear()
+
+    @property
+    def mode(self):
+        return self.__mode if self.__mode is not None else ConfigHandler().fetchFixtureMode
+
+    @property
+    def directory(self):
+        return os.path.join(ROOT_PATH, self.__directory or ConfigHandler().fetchFixtureDir)
+
+    def __path(self, key):
+        host = urlparse(key).netloc.replace(":", "_") or "_"
+        digest = md5(key if isinstance(key, bytes) else key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, host, digest)
+
+    def save(self, key, response):
+        """
+        保存页面
+        :param key: url
+        :param response: requests Response
+        :return:
+        """
+        path = self.__path(key)
+        meta = {"url": key,
+                "status_code": response.status_code,
+                "encoding": response.encoding,
+                "headers": dict((k, v) for k, v in response.headers.items() if k.lower() not in self.skip_headers)}
+        with self.__lock:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path + ".json", "wb") as f:
+                f.write(json.dumps(meta, indent=1, sort_keys=True).encode("utf-8"))
+            with open(path + ".body", "wb") as f:
+                f.write(response.content)
+            self.__pages[path] = (meta, response.content)
+
+    def load(self, key):
+        """
+        读取页面
+        :param key: url
+        :return: requests Response, 未录制返回None
+        """
+        path = self.__path(key)
+        with self.__lock:
+            page = self.__pages.get(path)
+            if page is None:
+                if not os.path.exists(path + ".json"):
+                    return None
+                with open(path + ".json", "rb") as f:
+                    meta = json.loads(f.read().decode("utf-8"))
+                with open(path + ".body", "rb") as f:
+                    page = self.__pages[path] = (meta, f.read())
+        meta, content = page
+        response = Response()
+        response.status_code = meta["status_code"]
+        response.encoding = meta["encoding"]
+        response.headers.update(meta["headers"])
+        response.url = meta["url"]
+        response._content = content
+        return response
+
+
+fixtures = FixtureStore()
+
+# 各采集线程的页面请求计数: [请求页面数, 未变化页面数]
+_page_stats = local()
+
+
+def resetPageStats():
+    """
+    清零当前线程的页面请求计数
+    :return:
+    """
+    _page_stats.counts = [0, 0]
+
+
+def pageStats():
+    """
+    当前线程的页面请求计数
+    :return: (请求页面数, 未变化页面数)
+    """
+    counts = getattr(_page_stats, "counts", None) or [0, 0]
+    return counts[0], counts[1]
+
+
+def mergePageStats(pages, unchanged):
+    """
+    把其他线程的页面请求计数累加到当前线程
+    :param pages: 请求页面数
+    :param unchanged: 未变化页面数
+    :return:
+    """
+    counts = getattr(_page_stats, "counts", None)
+    if counts is None:
+        counts = _page_stats.counts = [0, 0]
+    counts[0] += pages
+    counts[1] += unchanged
+
+
+def _countPage(unchanged):
+    counts = getattr(_page_stats, "counts", None)
+    if counts is None:
+        counts = _page_stats.counts = [0, 0]
+    counts[0] += 1
+    if unchanged:
+        counts[1] += 1
 
 
 class WebRequest(object):
     name = "web_request"
+    # 各实例共用, 避免每次请求都创建logger
+    log = LogHandler(name, file=False)
 
     def __init__(self, *args, **kwargs):
-        self.log = LogHandler(self.name, file=False)
         self.response = Response()
+        # 页面与上次请求相同(304或内容摘要一致), tree/text返回空内容, 调用方无需再解析
+        self.unchanged = False
+        # 代理源熔断中, 未发起请求
+        self.skipped = False
+        # 页面来自录制文件, 未访问网络
+        self.replayed = False
 
     @property
     def user_agent(self):
@@ -64,33 +289,72 @@ class WebRequest(object):
         get method
         :param url: target url
         :param header: headers
-        :param retry_time: retry time
-        :param retry_interval: retry interval
+        :param retry_time: 保留参数, 失败后不在本次调用内重试
+        :param retry_interval: 失败后该host的请求跳过retry_interval秒, 之后的请求(如下一个采集周期)再重试
         :param timeout: network timeout
         :return:
         """
         headers = self.header
         if header and isinstance(header, dict):
             headers.update(header)
-        while True:
-            try:
-                self.response = requests.get(url, headers=headers, timeout=timeout, *args, **kwargs)
-                return self
-            except Exception as e:
-                self.log.error("requests: %s error: %s" % (url, str(e)))
-                retry_time -= 1
-                if retry_time <= 0:
-                    resp = Response()
-                    resp.status_code = 200
-                    return self
-                self.log.info("retry %s second after" % retry_interval)
-                time.sleep(retry_interval)
+        key = self.__cacheKey(url, kwargs.get("params"))
+        mode = fixtures.mode
+        if mode == REPLAY:
+            return self.__replay(url, key)
+        ttl = 0 if mode == RECORD else ConfigHandler().fetchCacheTtl
+        if ttl > 0:
+            headers.update(page_cache.conditionalHeader(key, ttl))
+        breaker = breakers.get(urlparse(url).netloc)
+        if not breaker.allow():
+            self.skipped = True
+            self.log.warning("requests: %s skipped, %s" % (url, breaker.state))
+            return self
+        try:
+            self.response = web_client.get(url, headers=headers, timeout=timeout, *args, **kwargs)
+        except Exception as e:
+            # 不在采集线程中等待重试, 由熔断器记录重试时间, 到时间前该host的请求直接跳过
+            self.log.error("requests: %s error: %s, retry after %ss" % (url, str(e), retry_interval))
+            breaker.failure(retry_interval)
+            return self
+        if self.response.status_code >= 500:
+            breaker.failure(retry_interval)
+        else:
+            breaker.success()
+        if mode == RECORD and self.response.status_code == 200:
+            fixtures.save(key, self.response)
+        self.unchanged = ttl > 0 and page_cache.update(key, self.response, ttl)
+        _countPage(self.unchanged)
+        if self.unchanged:
+            self.log.info("requests: %s not modified" % url)
+        return self
+
+    def __replay(self, url, key):
+        self.replayed = True
+        response = fixtures.load(key)
+        if response is None:
+            self.log.error("requests: %s not recorded" % url)
+            return self
+        self.response = response
+        _countPage(False)
+        return self
+
+    @staticmethod
+    def __cacheKey(url, params):
+        if not params:
+            return url
+        request = PreparedRequest()
+        request.prepare_url(url, params)
+        return request.url
 
     @property
     def tree(self):
+        if self.unchanged or not self.response.content:
+            return etree.HTML("<html></html>")
         return etree.HTML(self.response.content)
 
     @property
     def text(self):
+        if self.unchanged:
+            return ""
         return self.response.text
 